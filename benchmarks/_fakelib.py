@@ -0,0 +1,100 @@
+"""Helpers for running benchmarks against the fake libipmimonitoring.
+
+The fake library in fakelib/ is compiled on demand into build/ and
+preloaded with RTLD_GLOBAL.  It has the same soname as the real
+library, so the ffi.dlopen("libipmimonitoring.so.6") in wrapper.py
+resolves to it without having to set LD_LIBRARY_PATH.
+"""
+
+import os
+import sys
+import ctypes
+import contextlib
+import subprocess
+import importlib.util
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FAKELIB_DIR = os.path.join(HERE, 'fakelib')
+BUILD_DIR = os.path.join(HERE, 'build')
+SONAME = 'libipmimonitoring.so.6'
+
+sys.path.insert(0, os.path.join(os.path.dirname(HERE), 'src'))
+
+def build_fakelib():
+    """Compile the fake library if it is missing or out of date.
+
+    Returns:
+        str: Path to the shared library
+    """
+
+    os.makedirs(BUILD_DIR, exist_ok = True)
+    src = os.path.join(FAKELIB_DIR, 'fake_ipmimonitoring.c')
+    hdr = os.path.join(FAKELIB_DIR, 'ipmi_monitoring.h')
+    lib = os.path.join(BUILD_DIR, SONAME)
+
+    mtime = max(os.path.getmtime(src), os.path.getmtime(hdr))
+    if not os.path.exists(lib) or os.path.getmtime(lib) < mtime:
+        subprocess.check_call([
+            'cc', '-O2', '-shared', '-fPIC', '-Wall',
+            '-Wl,-soname,' + SONAME,
+            '-I', FAKELIB_DIR,
+            '-o', lib, src,
+        ])
+
+    link = os.path.join(BUILD_DIR, 'libipmimonitoring.so')
+    if not os.path.exists(link):
+        os.symlink(SONAME, link)
+
+    return lib
+
+def load_fakelib():
+    """Build and preload the fake library.
+
+    LD_LIBRARY_PATH is also set, so that processes which are started
+    from scratch, such as spawn and forkserver workers, find it too.
+    """
+
+    ctypes.CDLL(build_fakelib(), mode = ctypes.RTLD_GLOBAL)
+
+    paths = os.environ.get('LD_LIBRARY_PATH', '').split(os.pathsep)
+    if BUILD_DIR not in paths:
+        os.environ['LD_LIBRARY_PATH'] = os.pathsep.join([ BUILD_DIR ] + [ p for p in paths if p ])
+
+def build_api_module():
+    """Build the API mode extension against the fake library.
+
+    Returns:
+        module: The compiled extension, with ffi and lib attributes
+    """
+
+    load_fakelib()
+
+    from ipmimonitoring._build_ffi import make_ffibuilder
+
+    builder = make_ffibuilder(include_dirs = [ FAKELIB_DIR ],
+                              library_dirs = [ BUILD_DIR ],
+                              runtime_library_dirs = [ BUILD_DIR ])
+    path = builder.compile(tmpdir = os.path.join(BUILD_DIR, 'api'))
+
+    spec = importlib.util.spec_from_file_location('_ipmimonitoring_cffi', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+@contextlib.contextmanager
+def api_bindings(api):
+    """Temporarily make wrapper.py use the given API mode extension.
+
+    Args:
+        api: Module returned by build_api_module
+    """
+
+    from ipmimonitoring import wrapper
+
+    saved = wrapper.ffi, wrapper._api_lib, wrapper._lib, wrapper._sensor_callback_ptr
+    wrapper.ffi, wrapper._api_lib, wrapper._lib, wrapper._sensor_callback_ptr = api.ffi, api.lib, None, None
+    try:
+        yield
+
+    finally:
+        wrapper.ffi, wrapper._api_lib, wrapper._lib, wrapper._sensor_callback_ptr = saved
@@ -0,0 +1,59 @@
+#! /usr/bin/python3
+"""Compare per-record decoding cost of the ABI and API mode bindings.
+
+Runs full sensor sweeps against the fake libipmimonitoring with the
+ABI mode (dlopen) bindings, with the API mode extension built by
+_build_ffi.py calling the library once per field, and with the API
+mode extension extracting the whole sweep in a single call, and prints
+the time per decoded record.
+
+    python benchmarks/bench_api_mode.py [sensors] [sweeps]
+"""
+
+import os
+import sys
+import time
+
+from _fakelib import load_fakelib, build_api_module, api_bindings
+
+def bench(sweeps, batched = True):
+    from ipmimonitoring import IpmiMonitoringContext
+
+    ctx = IpmiMonitoringContext()
+    if not batched:
+        ctx._read_records = None
+    list(ctx.read_sensors())
+
+    count = 0
+    t0 = time.perf_counter()
+    for _ in range(sweeps):
+        for record in ctx.read_sensors():
+            count += 1
+    t1 = time.perf_counter()
+    return (t1 - t0) / count
+
+def main():
+    sensors = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    sweeps = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    os.environ['FAKE_IPMI_SENSORS'] = str(sensors)
+
+    load_fakelib()
+    api = build_api_module()
+
+    from ipmimonitoring import wrapper
+
+    if wrapper._api_lib is not None:
+        print("note: the package already uses the API mode extension")
+
+    abi = bench(sweeps)
+    with api_bindings(api):
+        fields = bench(sweeps, batched = False)
+        batched = bench(sweeps)
+
+    print(f"{sensors} sensors x {sweeps} sweeps")
+    print(f"ABI mode:         {abi * 1e6:8.2f} us/record")
+    print(f"API mode:         {fields * 1e6:8.2f} us/record  ({abi / fields:.2f}x)")
+    print(f"API mode batched: {batched * 1e6:8.2f} us/record  ({abi / batched:.2f}x)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+#! /usr/bin/python3
+"""Measure the cost of creating IpmiMonitoringContext objects.
+
+Creates and drops a number of contexts against the fake
+libipmimonitoring and compares that with the old behaviour of doing a
+dlopen and ipmi_monitoring_init for every context.
+
+    python benchmarks/bench_context_create.py [contexts]
+"""
+
+import sys
+import time
+
+from _fakelib import load_fakelib
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    load_fakelib()
+
+    from ipmimonitoring import wrapper
+    from ipmimonitoring import IpmiMonitoringContext
+
+    # What every context used to do before creating its ctx
+    t0 = time.perf_counter()
+    for _ in range(count):
+        lib = wrapper.ffi.dlopen(wrapper.LIBRARY_NAME)
+        errnum = wrapper.ffi.new("int *")
+        lib.ipmi_monitoring_init(0, errnum)
+        ctx = IpmiMonitoringContext()
+        del ctx
+    t1 = time.perf_counter()
+    old = (t1 - t0) / count
+
+    t0 = time.perf_counter()
+    for _ in range(count):
+        ctx = IpmiMonitoringContext()
+        del ctx
+    t1 = time.perf_counter()
+    new = (t1 - t0) / count
+
+    print(f"{count} contexts")
+    print(f"dlopen and init per context: {old * 1e6:8.2f} us/context")
+    print(f"shared library handle:       {new * 1e6:8.2f} us/context")
+    print(f"speedup:                     {old / new:8.2f}x")
+
+if __name__ == '__main__':
+    main()
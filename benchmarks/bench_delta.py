@@ -0,0 +1,64 @@
+#! /usr/bin/python3
+"""Measure how much a DeltaFilter cuts the output of repeated sweeps.
+
+Runs full sensor sweeps against the fake libipmimonitoring and passes
+them through DeltaFilters with different deadbands.  Prints the
+fraction of the records and of the JSON bytes which are emitted, and
+the time the filter takes per record.
+
+    python benchmarks/bench_delta.py [sensors] [sweeps]
+"""
+
+import os
+import sys
+import json
+import time
+
+from _fakelib import load_fakelib
+
+def json_size(records):
+    return len(json.dumps([ (r.record_id, r.sensor_name, r.sensor_state.name,
+                             r.sensor_reading, r.sensor_bitmask) for r in records ]))
+
+def main():
+    sensors = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    sweeps = int(sys.argv[2]) if len(sys.argv) > 2 else 600
+    os.environ['FAKE_IPMI_SENSORS'] = str(sensors)
+
+    load_fakelib()
+
+    from ipmimonitoring import IpmiMonitoringContext, IpmiMonitoringSensorUnits as U
+    from ipmimonitoring.delta import Deadband, DeltaFilter
+
+    ctx = IpmiMonitoringContext(hostname = 'bmc1')
+    data = [ ctx.read_sensors(snapshot = True) for _ in range(sweeps) ]
+    full = sum(json_size(sweep) for sweep in data)
+
+    configs = [
+        ("no deadband", {}),
+        ("C:1 V:0.05 RPM:10%", {
+            U.CELSIUS: Deadband(absolute = 1.0),
+            U.VOLTS: Deadband(absolute = 0.05),
+            U.RPM: Deadband(relative = 0.10),
+        }),
+        ("C:1 V:0.05 RPM:1000", {
+            U.CELSIUS: Deadband(absolute = 1.0),
+            U.VOLTS: Deadband(absolute = 0.05),
+            U.RPM: Deadband(absolute = 1000),
+        }),
+    ]
+
+    print(f"{sensors} sensors x {sweeps} sweeps, keyframe every 60 sweeps")
+    for label, deadbands in configs:
+        delta = DeltaFilter(deadbands, keyframe_every = 60)
+        t0 = time.perf_counter()
+        out = [ delta.update(sweep) for sweep in data ]
+        t1 = time.perf_counter()
+
+        size = sum(json_size(sweep) for sweep in out)
+        print(f"{label:20s}: {delta.stats.ratio * 100:6.2f}% of records, "
+              f"{size / full * 100:6.2f}% of bytes, "
+              f"{(t1 - t0) / delta.stats.records_in * 1e6:.2f} us/record")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+#! /usr/bin/python3
+"""Measure fleet polling throughput with simulated BMC latency.
+
+Sweeps a fleet of fake hosts with FleetPoller at different levels of
+concurrency.  The fake libipmimonitoring sleeps for the given latency
+on every query to simulate the round trip to a BMC, so sequential
+polling is bound by latency while the thread pool overlaps the waits.
+
+    python benchmarks/bench_fleet.py [hosts] [latency_ms]
+"""
+
+import os
+import sys
+
+def main():
+    hosts = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    latency_ms = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    # The fake library reads its behaviour from the environment
+    os.environ['FAKE_IPMI_LATENCY_MS'] = str(latency_ms)
+    os.environ.setdefault('FAKE_IPMI_SENSORS', '50')
+
+    from _fakelib import load_fakelib
+
+    load_fakelib()
+
+    from ipmimonitoring.fleet import FleetPoller
+
+    # A few hosts which fail, to include the error path
+    fleet = [ (f"bmc{i:04d}" if i % 50 else f"down{i:04d}", None) for i in range(hosts) ]
+
+    print(f"{hosts} hosts, {latency_ms} ms simulated latency, "
+          f"{os.environ['FAKE_IPMI_SENSORS']} sensors per host")
+    print(f"{'threads':>8} {'wall':>8} {'hosts/s':>9} {'p50':>8} {'p95':>8} {'failed':>7}")
+
+    for concurrency in (1, 8, 32, 128):
+        # Sequential polling of the whole fleet takes too long
+        subset = fleet if concurrency > 1 else fleet[:max(1, hosts // 10)]
+        with FleetPoller(subset, concurrency = concurrency) as poller:
+            poller.sweep()
+            s = poller.stats
+        print(f"{concurrency:8d} {s.wall_time:7.2f}s {s.hosts / s.wall_time:9.1f} "
+              f"{s.p50_time * 1e3:6.1f}ms {s.p95_time * 1e3:6.1f}ms {s.failed:7d}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+#! /usr/bin/python3
+"""Compare fleet polling with threads and with worker processes.
+
+Without simulated latency a sweep of the fake library is bound by
+decoding the records in Python, so a single process is limited to one
+core.  This compares FleetPoller in one process with
+ProcessFleetPoller using an increasing number of worker processes,
+up to the number of CPUs.  The worker processes can only pay off with
+more than one CPU.
+
+    python benchmarks/bench_fleet_processes.py [hosts] [max_processes]
+"""
+
+import os
+import sys
+import multiprocessing
+
+def main():
+    hosts = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    max_processes = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+
+    os.environ.setdefault('FAKE_IPMI_SENSORS', '300')
+
+    from _fakelib import load_fakelib
+
+    load_fakelib()
+
+    from ipmimonitoring.fleet import FleetPoller, ProcessFleetPoller
+
+    fleet = [ (f"bmc{i:04d}", None) for i in range(hosts) ]
+
+    # The workers inherit the preloaded fake library
+    mp_context = multiprocessing.get_context('fork')
+
+    print(f"{hosts} hosts, {os.environ['FAKE_IPMI_SENSORS']} sensors per host, "
+          f"{os.cpu_count()} CPUs")
+    print(f"{'mode':>12} {'wall':>8} {'hosts/s':>9} {'records/s':>11}")
+
+    def report(name, stats):
+        print(f"{name:>12} {stats.wall_time:7.2f}s {stats.hosts / stats.wall_time:9.1f} "
+              f"{stats.records / stats.wall_time:11.0f}")
+
+    with FleetPoller(fleet, concurrency = 8) as poller:
+        poller.sweep()
+        report("threads", poller.stats)
+
+    processes = 1
+    while processes <= max_processes:
+        with ProcessFleetPoller(fleet, processes = processes, mp_context = mp_context) as poller:
+            # The first sweep starts the workers
+            poller.sweep()
+            poller.sweep()
+            report(f"{processes} procs", poller.stats)
+        processes *= 2
+
+if __name__ == '__main__':
+    main()
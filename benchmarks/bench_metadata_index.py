@@ -0,0 +1,62 @@
+#! /usr/bin/python3
+"""Measure sweeps with and without the sensor metadata index.
+
+Runs full sensor sweeps against the fake libipmimonitoring with an SDR
+cache directory, once reading every field of every record and once
+with a SensorMetadataIndex so that only the state, reading and bitmask
+are read for known sensors.  Checks that both give the same records
+and prints the time per record for the ABI mode bindings and the
+batched API mode extension.
+
+    python benchmarks/bench_metadata_index.py [sensors] [sweeps]
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+from _fakelib import load_fakelib, build_api_module, api_bindings
+
+def bench(sweeps, sdr_cache_directory, index):
+    from ipmimonitoring import IpmiMonitoringContext
+
+    ctx = IpmiMonitoringContext(hostname = 'bmc1', sdr_cache_directory = sdr_cache_directory,
+                                metadata_index = index)
+    first = ctx.read_sensors(snapshot = True)
+
+    count = 0
+    t0 = time.perf_counter()
+    for _ in range(sweeps):
+        for record in ctx.read_sensors():
+            count += 1
+    t1 = time.perf_counter()
+    return (t1 - t0) / count, first, ctx.read_sensors(snapshot = True)
+
+def compare(sweeps, sdr_cache_directory, label):
+    from ipmimonitoring.sensorindex import SensorMetadataIndex
+
+    plain, first, last = bench(sweeps, sdr_cache_directory, None)
+    index = SensorMetadataIndex(sdr_cache_directory)
+    indexed, ifirst, ilast = bench(sweeps, sdr_cache_directory, index)
+
+    assert list(first) == list(ifirst) and list(last) == list(ilast), "records differ"
+    print(f"{label}: {plain * 1e6:8.2f} -> {indexed * 1e6:8.2f} us/record  "
+          f"({plain / indexed:.2f}x)")
+
+def main():
+    sensors = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    sweeps = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    os.environ['FAKE_IPMI_SENSORS'] = str(sensors)
+
+    load_fakelib()
+    api = build_api_module()
+
+    print(f"{sensors} sensors x {sweeps} sweeps")
+    with tempfile.TemporaryDirectory() as sdr_cache_directory:
+        compare(sweeps, sdr_cache_directory, "ABI mode        ")
+        with api_bindings(api):
+            compare(sweeps, sdr_cache_directory, "API mode batched")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#! /usr/bin/python3
+"""Compare memory use and construction time of sensor records.
+
+Compares IpmiMonitoringSensorData, which uses __slots__, with the
+plain dataclass it replaced.  Does not need libipmimonitoring.
+
+    python benchmarks/bench_records.py [records]
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+
+import _fakelib  # noqa: F401, puts src on sys.path
+
+from ipmimonitoring import *
+
+@dataclass
+class DictSensorData:
+    """The old dataclass based record, for comparison"""
+
+    record_id : int
+    event_reading_type_code : int
+    sensor_number :int
+    sensor_name : str
+    sensor_type : IpmiMonitoringSensorType
+    sensor_state : IpmiMonitoringState
+    sensor_reading_type : IpmiMonitoringSensorReadingType
+    sensor_reading : object
+    sensor_units : IpmiMonitoringSensorUnits
+    sensor_bitmask_type : IpmiMonitoringSensorBitmaskType
+    sensor_bitmask : int
+    sensor_bitmask_strings : list
+
+def make(cls, count):
+    name = "CPU0_TEMP"
+    strings = [ "OK" ]
+    return [ cls(
+        record_id = i,
+        event_reading_type_code = 1,
+        sensor_number = i & 0xff,
+        sensor_name = name,
+        sensor_type = IpmiMonitoringSensorType.TEMPERATURE,
+        sensor_state = IpmiMonitoringState.NOMINAL,
+        sensor_reading_type = IpmiMonitoringSensorReadingType.DOUBLE,
+        sensor_reading = 42.5,
+        sensor_units = IpmiMonitoringSensorUnits.CELSIUS,
+        sensor_bitmask_type = IpmiMonitoringSensorBitmaskType.THRESHOLD,
+        sensor_bitmask = 0xc0,
+        sensor_bitmask_strings = strings) for i in range(count) ]
+
+def bench(cls, count):
+    gc.disable()
+    try:
+        t0 = time.perf_counter()
+        records = make(cls, count)
+        t1 = time.perf_counter()
+        del records
+
+    finally:
+        gc.enable()
+
+    tracemalloc.start()
+    records = make(cls, count)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+
+    return (t1 - t0) / count, size / count
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    old_time, old_size = bench(DictSensorData, count)
+    new_time, new_size = bench(IpmiMonitoringSensorData, count)
+
+    print(f"{count} records")
+    print(f"dataclass:         {old_time * 1e9:8.1f} ns/record {old_size:8.1f} bytes/record")
+    print(f"slotted dataclass: {new_time * 1e9:8.1f} ns/record {new_size:8.1f} bytes/record")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+#! /usr/bin/python3
+"""Measure the cost of reading the System Event Log.
+
+Reads a synthetic SEL from the fake libipmimonitoring and reports the
+time per SEL record, both in ABI mode and, if the extension can be
+built, in API mode.
+
+    python benchmarks/bench_sel.py [entries] [repeat]
+"""
+
+import os
+import sys
+import time
+
+def main():
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    # The fake library reads the size of the SEL from the environment
+    os.environ['FAKE_IPMI_SEL'] = str(entries)
+
+    from _fakelib import load_fakelib, build_api_module, api_bindings
+
+    load_fakelib()
+
+    from ipmimonitoring import IpmiMonitoringContext
+
+    def run():
+        ctx = IpmiMonitoringContext()
+        best = None
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            records = ctx.read_sel()
+            t1 = time.perf_counter()
+            assert len(records) == entries
+            if best is None or t1 - t0 < best:
+                best = t1 - t0
+        return best / entries
+
+    print(f"{entries} SEL entries, best of {repeat}")
+
+    t = run()
+    print(f"ABI mode: {t * 1e6:8.2f} us/record")
+
+    try:
+        api = build_api_module()
+    except Exception as e:
+        print(f"API mode: not available ({e})")
+        return
+
+    with api_bindings(api):
+        t = run()
+    print(f"API mode: {t * 1e6:8.2f} us/record")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+#! /usr/bin/python3
+"""Compare throughput of back-to-back sweeps on one context.
+
+Alternates between two hosts on a single IpmiMonitoringContext against
+the fake libipmimonitoring, once consuming the lazy generator returned
+by read_sensors() and once using snapshot mode.  The two modes are
+run alternately a few times and the best rate of each is printed, so
+that noise from other processes does not favour one of them.
+
+    python benchmarks/bench_sweeps.py [sensors] [sweeps]
+"""
+
+import os
+import sys
+import time
+
+from _fakelib import load_fakelib
+
+def bench(ctx, sweeps, snapshot):
+    hosts = [ 'host1', 'host2' ]
+    count = 0
+    t0 = time.perf_counter()
+    for i in range(sweeps):
+        ctx.hostname = hosts[i % len(hosts)]
+        if snapshot:
+            records = ctx.read_sensors(snapshot = True)
+        else:
+            records = list(ctx.read_sensors())
+        count += len(records)
+    t1 = time.perf_counter()
+    return sweeps / (t1 - t0), count / (t1 - t0)
+
+def main():
+    sensors = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    sweeps = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    os.environ['FAKE_IPMI_SENSORS'] = str(sensors)
+
+    load_fakelib()
+
+    from ipmimonitoring import IpmiMonitoringContext
+
+    ctx = IpmiMonitoringContext()
+    bench(ctx, 10, False)
+
+    best = {}
+    for _ in range(5):
+        for name, snapshot in (('lazy', False), ('snapshot', True)):
+            best[name] = max(best.get(name, (0, 0)), bench(ctx, sweeps, snapshot))
+
+    print(f"{sensors} sensors x {sweeps} sweeps, best of 5")
+    for name, (rate, records) in best.items():
+        print(f"{name:8}: {rate:8.1f} sweeps/s {records:10.0f} records/s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+#! /usr/bin/python3
+"""Measure a TransitionDetector on flapping sensors.
+
+Reads sweeps from the fake libipmimonitoring, whose temperature and
+power supply sensors flip out of NOMINAL for single sweeps now and
+then, and feeds them to TransitionDetectors as if they came from many
+hosts.  Prints the number of raw state changes and of reported
+transitions, the time per record and the memory used per sensor.
+
+    python benchmarks/bench_transitions.py [hosts] [sweeps]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from _fakelib import load_fakelib
+
+def main():
+    hosts = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    sweeps = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    load_fakelib()
+
+    from ipmimonitoring import IpmiMonitoringContext, IpmiMonitoringSweep
+    from ipmimonitoring.transitions import TransitionDetector
+
+    ctx = IpmiMonitoringContext(hostname = 'bmc1')
+    data = [ ctx.read_sensors(snapshot = True) for _ in range(sweeps) ]
+    hostnames = [ f"bmc{i}" for i in range(hosts) ]
+
+    print(f"{hosts} hosts x {len(data[0])} sensors x {sweeps} sweeps")
+    for confirm, window in [ (1, 1), (2, 3), (3, 5) ]:
+        detector = TransitionDetector(confirm = confirm, window = window)
+        t0 = time.perf_counter()
+        for i, sweep in enumerate(data):
+            for hostname in hostnames:
+                detector.update(IpmiMonitoringSweep(hostname, sweep.records, i))
+        t1 = time.perf_counter()
+
+        stats = detector.stats
+        print(f"{confirm} of {window}: {stats.changes:7d} changes, "
+              f"{stats.transitions:7d} transitions, "
+              f"{(t1 - t0) / stats.records * 1e6:.2f} us/record")
+
+    # Memory is measured separately since tracing slows down the sweeps
+    tracemalloc.start()
+    detector = TransitionDetector(confirm = 3, window = 5)
+    for hostname in hostnames:
+        detector.update(IpmiMonitoringSweep(hostname, data[0].records, 0))
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{memory / len(detector):.0f} bytes/sensor")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,905 @@
+/* Fake libipmimonitoring used by the benchmarks.
+ *
+ * Implements the subset of the libipmimonitoring API used by the
+ * Python bindings on top of synthetic sensor and SEL data, so that the
+ * Python side can be measured without a BMC.  Behaviour is controlled
+ * with environment variables which are read on every call:
+ *
+ *   FAKE_IPMI_SENSORS     number of sensors per sweep (default 300)
+ *   FAKE_IPMI_SEL         number of SEL entries (default 0)
+ *   FAKE_IPMI_SEL_FIRST   record ID of the first SEL entry (default 1)
+ *   FAKE_IPMI_LATENCY_MS  simulated BMC round trip per query (default 0)
+ *   FAKE_IPMI_HANG_MS     time a "hang*" host blocks (default 60000)
+ *   FAKE_IPMI_SDR_MS      time to download the SDR repository when the
+ *                         SDR cache is created (default 0)
+ *
+ * If an SDR cache directory has been set, the SDR cache file of a host
+ * is written the first time the host is read, or again when the
+ * REREAD_SDR_CACHE flag is given, using the same file layout as
+ * freeipmi with a full sensor record for every threshold sensor and a
+ * compact sensor record for every discrete sensor.
+ *
+ * Hostnames starting with "down" fail with a connection timeout,
+ * "busy" with BMC busy, "badauth" with an invalid password and
+ * "hang" block for FAKE_IPMI_HANG_MS before timing out.
+ */
+
+#define _GNU_SOURCE
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <time.h>
+#include <unistd.h>
+
+#include "ipmi_monitoring.h"
+
+#define ERR_SUCCESS 0
+#define ERR_PARAMETERS 3
+#define ERR_SDR_CACHE_FILESYSTEM 11
+#define ERR_SEL_RECORDS_LIST_END 15
+#define ERR_SEL_RECORD_DATA_NOT_AVAILABLE 16
+#define ERR_SENSOR_READINGS_LIST_END 18
+#define ERR_CONNECTION_TIMEOUT 19
+#define ERR_SESSION_TIMEOUT 20
+#define ERR_PASSWORD_INVALID 22
+#define ERR_CALLBACK_ERROR 30
+#define ERR_BMC_BUSY 31
+#define ERR_OUT_OF_MEMORY 32
+
+static char *errmsgs[] = {
+    "success", "ctx null", "ctx invalid", "invalid parameters",
+    "permission denied", "library uninitialized",
+    "sel config file does not exist", "sel config file parse error",
+    "sensor config file does not exist", "sensor config file parse error",
+    "sdr cache permission denied", "sdr cache filesystem error",
+    "hostname invalid", "sensor not found", "no sel records",
+    "sel records list end", "sel record data not available",
+    "no sensor readings", "sensor readings list end",
+    "connection timeout", "session timeout", "username invalid",
+    "password invalid", "password verification timeout", "k_g invalid",
+    "privilege level insufficient", "privilege level cannot be obtained",
+    "authentication type unavailable", "ipmi 2.0 unavailable",
+    "cipher suite id unavailable", "callback error", "BMC busy",
+    "out of memory", "ipmi error", "system error", "internal error",
+    "errnum out of range",
+};
+
+struct fake_sensor {
+    int record_id;
+    int sensor_number;
+    int sensor_type;
+    char name[32];
+    int state;
+    int units;
+    int reading_type;
+    union {
+        unsigned char u8;
+        unsigned int u32;
+        double d;
+    } reading;
+    int has_reading;
+    int bitmask_type;
+    int bitmask;
+    char **bitmask_strings;
+    int event_reading_type_code;
+};
+
+struct fake_sel {
+    int record_id;
+    int record_type_class;
+    int sel_state;
+    unsigned int timestamp;
+    int sensor_type;
+    int sensor_number;
+    char name[32];
+    int event_direction;
+    int event_offset;
+    int manufacturer_id;
+    unsigned char oem_data[6];
+};
+
+struct ipmi_monitoring_ctx {
+    int errnum;
+    unsigned int sweep;
+    struct fake_sensor *sensors;
+    int sensor_count;
+    int sensor_pos;
+    struct fake_sel *sel;
+    int sel_count;
+    int sel_pos;
+    char sdr_cache_directory[256];
+    char sdr_cache_filenames[256];
+};
+
+#define REREAD_SDR_CACHE 0x1
+
+static char *ok_strings[] = { "OK", NULL };
+static char *upper_nc_strings[] = { "At or above (>=) upper non-critical threshold", NULL };
+static char *presence_strings[] = { "Presence detected", NULL };
+static char *ps_strings[] = { "Presence detected", "Power Supply input lost (AC/DC)", NULL };
+
+static int getenv_int(const char *name, int def)
+{
+    char *s = getenv(name);
+    return s ? atoi(s) : def;
+}
+
+static void sleep_ms(int ms)
+{
+    struct timespec ts;
+
+    if (ms <= 0)
+        return;
+    ts.tv_sec = ms / 1000;
+    ts.tv_nsec = (ms % 1000) * 1000000L;
+    nanosleep(&ts, NULL);
+}
+
+/* Simulate the network round trip and the failure modes selected by hostname */
+static int fake_connect(ipmi_monitoring_ctx_t c, const char *hostname)
+{
+    sleep_ms(getenv_int("FAKE_IPMI_LATENCY_MS", 0));
+
+    if (!hostname)
+        return 0;
+
+    if (!strncmp(hostname, "down", 4)) {
+        c->errnum = ERR_CONNECTION_TIMEOUT;
+        return -1;
+    }
+    if (!strncmp(hostname, "busy", 4)) {
+        c->errnum = ERR_BMC_BUSY;
+        return -1;
+    }
+    if (!strncmp(hostname, "badauth", 7)) {
+        c->errnum = ERR_PASSWORD_INVALID;
+        return -1;
+    }
+    if (!strncmp(hostname, "hang", 4)) {
+        sleep_ms(getenv_int("FAKE_IPMI_HANG_MS", 60000));
+        c->errnum = ERR_SESSION_TIMEOUT;
+        return -1;
+    }
+    return 0;
+}
+
+static void make_sensor(struct fake_sensor *s, int i, unsigned int sweep)
+{
+    memset(s, 0, sizeof(*s));
+    s->record_id = i + 1;
+    s->sensor_number = i & 0xff;
+    s->state = 0;
+    s->has_reading = 1;
+    s->bitmask_type = 0x00;     /* threshold */
+    s->bitmask = 0xc0;
+    s->bitmask_strings = ok_strings;
+    s->event_reading_type_code = 0x01;
+    s->reading_type = 0x02;     /* double */
+
+    switch (i % 5) {
+    case 0:
+        s->sensor_type = 0x01;
+        s->units = 0x01;
+        snprintf(s->name, sizeof(s->name), "CPU%d_TEMP", i / 5);
+        s->reading.d = 40.0 + i % 10 + ((sweep + i) % 3) * 0.5;
+        if ((sweep + i) % 97 == 0) {
+            s->state = 1;
+            s->bitmask = 0xc8;
+            s->bitmask_strings = upper_nc_strings;
+            s->reading.d += 40.0;
+        }
+        break;
+    case 1:
+        s->sensor_type = 0x02;
+        s->units = 0x03;
+        snprintf(s->name, sizeof(s->name), "P_%dV", i / 5);
+        s->reading.d = 12.0 + ((sweep + i) % 2) * 0.01;
+        break;
+    case 2:
+        s->sensor_type = 0x04;
+        s->units = 0x05;
+        snprintf(s->name, sizeof(s->name), "FAN%d", i / 5);
+        s->reading.d = 2400.0 + ((sweep * 7 + i) % 20) * 50.0;
+        break;
+    case 3:
+        s->sensor_type = 0x08;
+        s->units = 0x00;
+        snprintf(s->name, sizeof(s->name), "PS%d_Status", i / 5);
+        s->reading_type = 0xff;
+        s->has_reading = 0;
+        s->bitmask_type = 0x0f;
+        s->bitmask = 0x01;
+        s->bitmask_strings = presence_strings;
+        s->event_reading_type_code = 0x6f;
+        if ((sweep + i) % 89 == 0) {
+            s->state = 2;
+            s->bitmask = 0x09;
+            s->bitmask_strings = ps_strings;
+        }
+        break;
+    default:
+        s->sensor_type = 0x07;
+        s->units = 0x00;
+        snprintf(s->name, sizeof(s->name), "CPU%d_Status", i / 5);
+        s->reading_type = 0x00;
+        s->reading.u8 = 1;
+        s->bitmask_type = 0x0e;
+        s->bitmask = 0x80;
+        s->bitmask_strings = presence_strings;
+        s->event_reading_type_code = 0x6f;
+        break;
+    }
+}
+
+static void make_sel(struct fake_sel *s, int record_id)
+{
+    memset(s, 0, sizeof(*s));
+    s->record_id = record_id;
+    s->timestamp = 1700000000u + (unsigned int)record_id * 60u;
+    s->sensor_number = record_id & 0xff;
+    s->event_direction = record_id % 2;
+    if (record_id % 10 == 0) {
+        s->record_type_class = 0x01;  /* timestamped OEM */
+        s->sel_state = 0x00;
+        s->manufacturer_id = 0x2a7c;
+        memcpy(s->oem_data, "\x01\x02\x03\x04\x05\x06", 6);
+        s->sensor_type = -1;
+        snprintf(s->name, sizeof(s->name), "%s", "");
+    } else {
+        s->record_type_class = 0x00;  /* system event */
+        s->sel_state = record_id % 7 == 0 ? 0x01 : 0x00;
+        s->manufacturer_id = -1;
+        s->sensor_type = record_id % 3 == 0 ? 0x08 : 0x01;
+        s->event_offset = record_id % 3 == 0 ? 0x00 : 0x07;
+        snprintf(s->name, sizeof(s->name), record_id % 3 == 0 ? "PS%d_Status" : "CPU%d_TEMP",
+                 record_id % 4);
+    }
+}
+
+int ipmi_monitoring_init(unsigned int flags, int *errnum)
+{
+    (void)flags;
+    if (errnum)
+        *errnum = ERR_SUCCESS;
+    return 0;
+}
+
+ipmi_monitoring_ctx_t ipmi_monitoring_ctx_create(void)
+{
+    return calloc(1, sizeof(struct ipmi_monitoring_ctx));
+}
+
+void ipmi_monitoring_ctx_destroy(ipmi_monitoring_ctx_t c)
+{
+    if (!c)
+        return;
+    free(c->sensors);
+    free(c->sel);
+    free(c);
+}
+
+int ipmi_monitoring_ctx_errnum(ipmi_monitoring_ctx_t c)
+{
+    return c ? c->errnum : 1;
+}
+
+char *ipmi_monitoring_ctx_strerror(int errnum)
+{
+    if (errnum < 0 || errnum > 36)
+        errnum = 36;
+    return errmsgs[errnum];
+}
+
+char *ipmi_monitoring_ctx_errormsg(ipmi_monitoring_ctx_t c)
+{
+    return ipmi_monitoring_ctx_strerror(ipmi_monitoring_ctx_errnum(c));
+}
+
+int ipmi_monitoring_ctx_sel_config_file(ipmi_monitoring_ctx_t c, const char *sel_config_file)
+{
+    (void)c; (void)sel_config_file;
+    return 0;
+}
+
+int ipmi_monitoring_ctx_sensor_config_file(ipmi_monitoring_ctx_t c, const char *sensor_config_file)
+{
+    (void)c; (void)sensor_config_file;
+    return 0;
+}
+
+int ipmi_monitoring_ctx_sdr_cache_directory(ipmi_monitoring_ctx_t c, const char *dir)
+{
+    snprintf(c->sdr_cache_directory, sizeof(c->sdr_cache_directory), "%s", dir ? dir : "");
+    return 0;
+}
+
+int ipmi_monitoring_ctx_sdr_cache_filenames(ipmi_monitoring_ctx_t c, const char *format)
+{
+    if (format && !strstr(format, "%H")) {
+        c->errnum = ERR_PARAMETERS;
+        return -1;
+    }
+    snprintf(c->sdr_cache_filenames, sizeof(c->sdr_cache_filenames), "%s", format ? format : "");
+    return 0;
+}
+
+/* SDR cache */
+
+/* Expand an SDR cache filename format, %L is the local and %H the remote hostname */
+static void sdr_cache_path(ipmi_monitoring_ctx_t c, const char *hostname, char *path, size_t len)
+{
+    const char *format = c->sdr_cache_filenames[0] ? c->sdr_cache_filenames : "sdr-cache-%L.%H";
+    char local[256];
+    size_t n;
+
+    if (gethostname(local, sizeof(local)) < 0)
+        strcpy(local, "localhost");
+    local[sizeof(local) - 1] = 0;
+    local[strcspn(local, ".")] = 0;
+
+    n = snprintf(path, len, "%s/", c->sdr_cache_directory);
+    for (; *format && n < len - 1; format++) {
+        const char *s = NULL;
+
+        if (format[0] == '%' && format[1] == 'L')
+            s = local;
+        else if (format[0] == '%' && format[1] == 'H')
+            s = hostname ? hostname : "localhost";
+        else if (format[0] == '%' && format[1] == '%')
+            s = "%";
+
+        if (s) {
+            n += snprintf(path + n, len - n, "%s", s);
+            format++;
+        } else
+            path[n++] = *format;
+    }
+    path[n < len ? n : len - 1] = 0;
+}
+
+static void put_le16(unsigned char *p, unsigned int v)
+{
+    p[0] = v & 0xff;
+    p[1] = (v >> 8) & 0xff;
+}
+
+static void put_le32(unsigned char *p, unsigned int v)
+{
+    put_le16(p, v & 0xffff);
+    put_le16(p + 2, v >> 16);
+}
+
+/* Build the SDR record for a sensor, return its length */
+static int make_sdr_record(const struct fake_sensor *s, int i, unsigned char *r)
+{
+    int len = strlen(s->name);
+    int pos;
+
+    memset(r, 0, 64);
+    put_le16(r, s->record_id);
+    r[2] = 0x51;                    /* SDR version */
+    r[5] = 0x20;                    /* owned by the BMC */
+    r[7] = s->sensor_number;
+    r[10] = 0x7f;                   /* scanning and events enabled */
+    r[12] = s->sensor_type;
+    r[13] = s->event_reading_type_code;
+
+    if (s->bitmask_type == 0x00) {
+        /* Full sensor record */
+        r[3] = 0x01;
+        r[11] = 0x14;               /* thresholds and hysteresis readable */
+        r[18] = 0x3f;               /* all thresholds readable */
+        r[24] = 1;                  /* M */
+        switch (i % 5) {
+        case 0:
+            r[8] = 0x03;            /* processor */
+            r[9] = i / 5;
+            r[21] = 1;              /* degrees C */
+            r[36] = 105; r[37] = 95; r[38] = 85;
+            r[39] = 0; r[40] = 5; r[41] = 10;
+            break;
+        case 1:
+            r[8] = 0x07;            /* system board */
+            r[9] = i / 5;
+            r[21] = 4;              /* volts */
+            r[29] = 0xe0;           /* R exponent -2 */
+            r[24] = 10;             /* 0.1 V per count */
+            r[36] = 140; r[37] = 132; r[38] = 126;
+            r[39] = 100; r[40] = 108; r[41] = 114;
+            break;
+        default:
+            r[8] = 0x1d;            /* fan */
+            r[9] = i / 5;
+            r[21] = 18;             /* RPM */
+            r[24] = 50;             /* 50 RPM per count */
+            r[36] = 255; r[37] = 250; r[38] = 240;
+            r[39] = 0; r[40] = 10; r[41] = 16;
+            break;
+        }
+        r[42] = 2;                  /* hysteresis */
+        r[43] = 2;
+        r[47] = 0xc0 | len;
+        memcpy(r + 48, s->name, len);
+        pos = 48 + len;
+    } else {
+        /* Compact sensor record */
+        r[3] = 0x02;
+        r[8] = i % 5 == 3 ? 0x0a : 0x03;   /* power supply or processor */
+        r[9] = i / 5;
+        r[31] = 0xc0 | len;
+        memcpy(r + 32, s->name, len);
+        pos = 32 + len;
+    }
+
+    r[4] = pos - 5;
+    return pos;
+}
+
+/* Write the SDR cache file for a host, as if downloaded from the BMC */
+static int write_sdr_cache(const char *path)
+{
+    int n = getenv_int("FAKE_IPMI_SENSORS", 300);
+    unsigned char header[21], r[64];
+    char tmp[600];
+    FILE *f;
+    int i;
+
+    sleep_ms(getenv_int("FAKE_IPMI_SDR_MS", 0));
+
+    snprintf(tmp, sizeof(tmp), "%s.%d.tmp", path, (int)getpid());
+    f = fopen(tmp, "wb");
+    if (!f)
+        return -1;
+
+    /* Magic, file version, SDR version, record count, free space,
+     * most recent addition and erase timestamps */
+    memcpy(header, "\x7a\xb8\x2e\x90", 4);
+    put_le32(header + 4, 0x00000012);
+    header[8] = 0x51;
+    put_le16(header + 9, n);
+    put_le16(header + 11, 0xfffe);
+    put_le32(header + 13, 1700000000u);
+    put_le32(header + 17, 0);
+    fwrite(header, sizeof(header), 1, f);
+
+    for (i = 0; i < n; i++) {
+        struct fake_sensor s;
+
+        make_sensor(&s, i, 0);
+        fwrite(r, make_sdr_record(&s, i, r), 1, f);
+    }
+
+    if (fclose(f) != 0 || rename(tmp, path) < 0) {
+        unlink(tmp);
+        return -1;
+    }
+    return 0;
+}
+
+/* Create the SDR cache of a host if needed */
+static int sdr_cache(ipmi_monitoring_ctx_t c, const char *hostname, unsigned int flags)
+{
+    char path[512];
+
+    if (!c->sdr_cache_directory[0])
+        return 0;
+
+    sdr_cache_path(c, hostname, path, sizeof(path));
+    if (!(flags & REREAD_SDR_CACHE) && access(path, R_OK) == 0)
+        return 0;
+
+    if (write_sdr_cache(path) < 0) {
+        c->errnum = ERR_SDR_CACHE_FILESYSTEM;
+        return -1;
+    }
+    return 0;
+}
+
+/* Sensors */
+
+static int contains(unsigned int *values, unsigned int len, unsigned int value)
+{
+    unsigned int i;
+
+    if (!values || !len)
+        return 1;
+    for (i = 0; i < len; i++)
+        if (values[i] == value)
+            return 1;
+    return 0;
+}
+
+static int sensor_readings(ipmi_monitoring_ctx_t c, const char *hostname,
+                           unsigned int flags, unsigned int *record_ids, unsigned int record_ids_len,
+                           unsigned int *sensor_types, unsigned int sensor_types_len,
+                           Ipmi_Monitoring_Callback callback, void *callback_data)
+{
+    int n = getenv_int("FAKE_IPMI_SENSORS", 300);
+    int i;
+
+    ipmi_monitoring_sensor_iterator_destroy(c);
+    c->errnum = ERR_SUCCESS;
+
+    if (fake_connect(c, hostname) < 0)
+        return -1;
+
+    if (sdr_cache(c, hostname, flags) < 0)
+        return -1;
+
+    c->sensors = calloc(n ? n : 1, sizeof(struct fake_sensor));
+    if (!c->sensors) {
+        c->errnum = ERR_OUT_OF_MEMORY;
+        return -1;
+    }
+
+    for (i = 0; i < n; i++) {
+        struct fake_sensor *s = &c->sensors[c->sensor_count];
+
+        make_sensor(s, i, c->sweep);
+        if (!contains(record_ids, record_ids_len, s->record_id))
+            continue;
+        if (!contains(sensor_types, sensor_types_len, s->sensor_type))
+            continue;
+
+        c->sensor_count++;
+        if (callback) {
+            c->sensor_pos = c->sensor_count - 1;
+            if (callback(c, callback_data) < 0) {
+                ipmi_monitoring_sensor_iterator_destroy(c);
+                c->errnum = ERR_CALLBACK_ERROR;
+                return -1;
+            }
+        }
+    }
+
+    c->sweep++;
+    c->sensor_pos = 0;
+    return c->sensor_count;
+}
+
+int ipmi_monitoring_sensor_readings_by_record_id(ipmi_monitoring_ctx_t c, const char *hostname,
+                                                 struct ipmi_monitoring_ipmi_config *config,
+                                                 unsigned int sensor_reading_flags,
+                                                 unsigned int *record_ids,
+                                                 unsigned int record_ids_len,
+                                                 Ipmi_Monitoring_Callback callback,
+                                                 void *callback_data)
+{
+    (void)config;
+    return sensor_readings(c, hostname, sensor_reading_flags, record_ids, record_ids_len, NULL, 0,
+                           callback, callback_data);
+}
+
+int ipmi_monitoring_sensor_readings_by_sensor_type(ipmi_monitoring_ctx_t c, const char *hostname,
+                                                   struct ipmi_monitoring_ipmi_config *config,
+                                                   unsigned int sensor_reading_flags,
+                                                   unsigned int *sensor_types,
+                                                   unsigned int sensor_types_len,
+                                                   Ipmi_Monitoring_Callback callback,
+                                                   void *callback_data)
+{
+    (void)config;
+    return sensor_readings(c, hostname, sensor_reading_flags, NULL, 0, sensor_types, sensor_types_len,
+                           callback, callback_data);
+}
+
+int ipmi_monitoring_sensor_iterator_first(ipmi_monitoring_ctx_t c)
+{
+    c->sensor_pos = 0;
+    return c->sensor_count > 0;
+}
+
+int ipmi_monitoring_sensor_iterator_next(ipmi_monitoring_ctx_t c)
+{
+    if (c->sensor_pos < c->sensor_count)
+        c->sensor_pos++;
+    return c->sensor_pos < c->sensor_count;
+}
+
+void ipmi_monitoring_sensor_iterator_destroy(ipmi_monitoring_ctx_t c)
+{
+    free(c->sensors);
+    c->sensors = NULL;
+    c->sensor_count = 0;
+    c->sensor_pos = 0;
+}
+
+static struct fake_sensor *cur_sensor(ipmi_monitoring_ctx_t c)
+{
+    if (c->sensor_pos >= c->sensor_count) {
+        c->errnum = ERR_SENSOR_READINGS_LIST_END;
+        return NULL;
+    }
+    return &c->sensors[c->sensor_pos];
+}
+
+#define SENSOR_INT_FIELD(func, field)                   \
+    int func(ipmi_monitoring_ctx_t c)                   \
+    {                                                   \
+        struct fake_sensor *s = cur_sensor(c);          \
+        return s ? s->field : -1;                       \
+    }
+
+SENSOR_INT_FIELD(ipmi_monitoring_sensor_read_record_id, record_id)
+SENSOR_INT_FIELD(ipmi_monitoring_sensor_read_sensor_number, sensor_number)
+SENSOR_INT_FIELD(ipmi_monitoring_sensor_read_sensor_type, sensor_type)
+SENSOR_INT_FIELD(ipmi_monitoring_sensor_read_sensor_state, state)
+SENSOR_INT_FIELD(ipmi_monitoring_sensor_read_sensor_units, units)
+SENSOR_INT_FIELD(ipmi_monitoring_sensor_read_sensor_reading_type, reading_type)
+SENSOR_INT_FIELD(ipmi_monitoring_sensor_read_sensor_bitmask_type, bitmask_type)
+SENSOR_INT_FIELD(ipmi_monitoring_sensor_read_sensor_bitmask, bitmask)
+SENSOR_INT_FIELD(ipmi_monitoring_sensor_read_event_reading_type_code, event_reading_type_code)
+
+char *ipmi_monitoring_sensor_read_sensor_name(ipmi_monitoring_ctx_t c)
+{
+    struct fake_sensor *s = cur_sensor(c);
+    return s ? s->name : NULL;
+}
+
+void *ipmi_monitoring_sensor_read_sensor_reading(ipmi_monitoring_ctx_t c)
+{
+    struct fake_sensor *s = cur_sensor(c);
+    return s && s->has_reading ? (void *)&s->reading : NULL;
+}
+
+char **ipmi_monitoring_sensor_read_sensor_bitmask_strings(ipmi_monitoring_ctx_t c)
+{
+    struct fake_sensor *s = cur_sensor(c);
+    return s ? s->bitmask_strings : NULL;
+}
+
+/* SEL */
+
+static int parse_date(const char *s, unsigned int *t)
+{
+    struct tm tm;
+
+    memset(&tm, 0, sizeof(tm));
+    if (!strptime(s, "%m/%d/%Y", &tm))
+        return -1;
+    *t = (unsigned int)timegm(&tm);
+    return 0;
+}
+
+static int sel_records(ipmi_monitoring_ctx_t c, const char *hostname,
+                       unsigned int *record_ids, unsigned int record_ids_len,
+                       unsigned int *sensor_types, unsigned int sensor_types_len,
+                       const char *date_begin, const char *date_end,
+                       Ipmi_Monitoring_Callback callback, void *callback_data)
+{
+    int n = getenv_int("FAKE_IPMI_SEL", 0);
+    int first = getenv_int("FAKE_IPMI_SEL_FIRST", 1);
+    unsigned int begin = 0, end = 0xffffffffu;
+    int i;
+
+    ipmi_monitoring_sel_iterator_destroy(c);
+    c->errnum = ERR_SUCCESS;
+
+    if ((date_begin && parse_date(date_begin, &begin) < 0)
+        || (date_end && parse_date(date_end, &end) < 0)) {
+        c->errnum = ERR_PARAMETERS;
+        return -1;
+    }
+    if (date_end)
+        end += 86399;
+
+    if (fake_connect(c, hostname) < 0)
+        return -1;
+
+    c->sel = calloc(n ? n : 1, sizeof(struct fake_sel));
+    if (!c->sel) {
+        c->errnum = ERR_OUT_OF_MEMORY;
+        return -1;
+    }
+
+    for (i = 0; i < n; i++) {
+        struct fake_sel *s = &c->sel[c->sel_count];
+
+        make_sel(s, first + i);
+        if (!contains(record_ids, record_ids_len, s->record_id))
+            continue;
+        if (!contains(sensor_types, sensor_types_len, s->sensor_type))
+            continue;
+        if (s->timestamp < begin || s->timestamp > end)
+            continue;
+
+        c->sel_count++;
+        if (callback) {
+            c->sel_pos = c->sel_count - 1;
+            if (callback(c, callback_data) < 0) {
+                ipmi_monitoring_sel_iterator_destroy(c);
+                c->errnum = ERR_CALLBACK_ERROR;
+                return -1;
+            }
+        }
+    }
+
+    c->sel_pos = 0;
+    return c->sel_count;
+}
+
+int ipmi_monitoring_sel_by_record_id(ipmi_monitoring_ctx_t c, const char *hostname,
+                                     struct ipmi_monitoring_ipmi_config *config,
+                                     unsigned int sel_flags, unsigned int *record_ids,
+                                     unsigned int record_ids_len, Ipmi_Monitoring_Callback callback,
+                                     void *callback_data)
+{
+    (void)config; (void)sel_flags;
+    return sel_records(c, hostname, record_ids, record_ids_len, NULL, 0, NULL, NULL,
+                       callback, callback_data);
+}
+
+int ipmi_monitoring_sel_by_sensor_type(ipmi_monitoring_ctx_t c, const char *hostname,
+                                       struct ipmi_monitoring_ipmi_config *config,
+                                       unsigned int sel_flags, unsigned int *sensor_types,
+                                       unsigned int sensor_types_len, Ipmi_Monitoring_Callback callback,
+                                       void *callback_data)
+{
+    (void)config; (void)sel_flags;
+    return sel_records(c, hostname, NULL, 0, sensor_types, sensor_types_len, NULL, NULL,
+                       callback, callback_data);
+}
+
+int ipmi_monitoring_sel_by_date_range(ipmi_monitoring_ctx_t c, const char *hostname,
+                                      struct ipmi_monitoring_ipmi_config *config,
+                                      unsigned int sel_flags, const char *date_begin,
+                                      const char *date_end, Ipmi_Monitoring_Callback callback,
+                                      void *callback_data)
+{
+    (void)config; (void)sel_flags;
+    return sel_records(c, hostname, NULL, 0, NULL, 0, date_begin, date_end,
+                       callback, callback_data);
+}
+
+int ipmi_monitoring_sel_iterator_first(ipmi_monitoring_ctx_t c)
+{
+    c->sel_pos = 0;
+    return c->sel_count > 0;
+}
+
+int ipmi_monitoring_sel_iterator_next(ipmi_monitoring_ctx_t c)
+{
+    if (c->sel_pos < c->sel_count)
+        c->sel_pos++;
+    return c->sel_pos < c->sel_count;
+}
+
+void ipmi_monitoring_sel_iterator_destroy(ipmi_monitoring_ctx_t c)
+{
+    free(c->sel);
+    c->sel = NULL;
+    c->sel_count = 0;
+    c->sel_pos = 0;
+}
+
+static struct fake_sel *cur_sel(ipmi_monitoring_ctx_t c)
+{
+    if (c->sel_pos >= c->sel_count) {
+        c->errnum = ERR_SEL_RECORDS_LIST_END;
+        return NULL;
+    }
+    return &c->sel[c->sel_pos];
+}
+
+/* Fields which are only available for system event records */
+#define SEL_SYSTEM_FIELD(func, expr)                            \
+    int func(ipmi_monitoring_ctx_t c)                           \
+    {                                                           \
+        struct fake_sel *s = cur_sel(c);                        \
+        if (!s)                                                 \
+            return -1;                                          \
+        if (s->record_type_class != 0x00) {                     \
+            c->errnum = ERR_SEL_RECORD_DATA_NOT_AVAILABLE;      \
+            return -1;                                          \
+        }                                                       \
+        return (expr);                                          \
+    }
+
+int ipmi_monitoring_sel_read_record_id(ipmi_monitoring_ctx_t c)
+{
+    struct fake_sel *s = cur_sel(c);
+    return s ? s->record_id : -1;
+}
+
+int ipmi_monitoring_sel_read_record_type(ipmi_monitoring_ctx_t c)
+{
+    struct fake_sel *s = cur_sel(c);
+    return s ? (s->record_type_class ? 0xc0 : 0x02) : -1;
+}
+
+int ipmi_monitoring_sel_read_record_type_class(ipmi_monitoring_ctx_t c)
+{
+    struct fake_sel *s = cur_sel(c);
+    return s ? s->record_type_class : -1;
+}
+
+int ipmi_monitoring_sel_read_sel_state(ipmi_monitoring_ctx_t c)
+{
+    struct fake_sel *s = cur_sel(c);
+    return s ? s->sel_state : -1;
+}
+
+int ipmi_monitoring_sel_read_timestamp(ipmi_monitoring_ctx_t c, unsigned int *timestamp)
+{
+    struct fake_sel *s = cur_sel(c);
+
+    if (!s)
+        return -1;
+    *timestamp = s->timestamp;
+    return 0;
+}
+
+SEL_SYSTEM_FIELD(ipmi_monitoring_sel_read_sensor_type, s->sensor_type)
+SEL_SYSTEM_FIELD(ipmi_monitoring_sel_read_sensor_number, s->sensor_number)
+SEL_SYSTEM_FIELD(ipmi_monitoring_sel_read_event_direction, s->event_direction)
+SEL_SYSTEM_FIELD(ipmi_monitoring_sel_read_event_offset_type, s->sensor_type == 0x08 ? 0x0f : 0x00)
+SEL_SYSTEM_FIELD(ipmi_monitoring_sel_read_event_offset, s->event_offset)
+SEL_SYSTEM_FIELD(ipmi_monitoring_sel_read_event_type_code, s->sensor_type == 0x08 ? 0x6f : 0x01)
+
+char *ipmi_monitoring_sel_read_sensor_name(ipmi_monitoring_ctx_t c)
+{
+    struct fake_sel *s = cur_sel(c);
+    return s ? s->name : NULL;
+}
+
+char *ipmi_monitoring_sel_read_event_offset_string(ipmi_monitoring_ctx_t c)
+{
+    struct fake_sel *s = cur_sel(c);
+
+    if (!s)
+        return NULL;
+    if (s->record_type_class != 0x00)
+        return "";
+    return s->sensor_type == 0x08 ? "Presence detected" : "Upper Non-critical - going high";
+}
+
+int ipmi_monitoring_sel_read_event_data(ipmi_monitoring_ctx_t c,
+                                        unsigned int *event_data1,
+                                        unsigned int *event_data2,
+                                        unsigned int *event_data3)
+{
+    struct fake_sel *s = cur_sel(c);
+
+    if (!s)
+        return -1;
+    if (s->record_type_class != 0x00) {
+        c->errnum = ERR_SEL_RECORD_DATA_NOT_AVAILABLE;
+        return -1;
+    }
+    *event_data1 = 0x50 | (unsigned int)s->event_offset;
+    *event_data2 = 0xff;
+    *event_data3 = (unsigned int)s->record_id & 0xff;
+    return 0;
+}
+
+int ipmi_monitoring_sel_read_manufacturer_id(ipmi_monitoring_ctx_t c)
+{
+    struct fake_sel *s = cur_sel(c);
+
+    if (!s)
+        return -1;
+    if (s->record_type_class != 0x01) {
+        c->errnum = ERR_SEL_RECORD_DATA_NOT_AVAILABLE;
+        return -1;
+    }
+    return s->manufacturer_id;
+}
+
+int ipmi_monitoring_sel_read_oem_data(ipmi_monitoring_ctx_t c, void *oem_data,
+                                      unsigned int oem_data_len)
+{
+    struct fake_sel *s = cur_sel(c);
+
+    if (!s)
+        return -1;
+    if (s->record_type_class == 0x00) {
+        c->errnum = ERR_SEL_RECORD_DATA_NOT_AVAILABLE;
+        return -1;
+    }
+    if (oem_data_len < sizeof(s->oem_data)) {
+        c->errnum = ERR_PARAMETERS;
+        return -1;
+    }
+    memcpy(oem_data, s->oem_data, sizeof(s->oem_data));
+    return (int)sizeof(s->oem_data);
+}
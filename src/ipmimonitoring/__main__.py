@@ -5,15 +5,66 @@ interface, handling argument parsing and sensor data display.
 """
 
 import sys
-import time
 import json
+import argparse
 import dataclasses
 from prettytable import PrettyTable
 from enum import Enum
 
 from .arguments import *
+from .schedule import Scheduler
+from .delta import Deadband, DeltaFilter
 
-def make_json(records, indent):
+DEFAULT_KEYFRAME_EVERY = 60
+
+def parse_deadband(spec):
+    """Parse a deadband argument.
+
+    The argument is "[UNITS:]VALUE" where VALUE is an absolute value
+    or a percentage of the reading such as "5%", and UNITS is the name
+    of an IpmiMonitoringSensorUnits member.  Without UNITS the
+    deadband is used for all units without a deadband of their own.
+
+    Returns:
+        tuple: (IpmiMonitoringSensorUnits or None, Deadband)
+    """
+
+    units = None
+    if ':' in spec:
+        name, spec = spec.split(':', 1)
+        try:
+            units = IpmiMonitoringSensorUnits[name.upper()]
+        except KeyError:
+            raise argparse.ArgumentTypeError(f"unknown units {name!r}")
+
+    try:
+        if spec.endswith('%'):
+            deadband = Deadband(relative = float(spec[:-1]) / 100)
+        else:
+            deadband = Deadband(absolute = float(spec))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid deadband {spec!r}")
+
+    return units, deadband
+
+def make_delta_filter(args):
+    """Create a DeltaFilter from the --deadband and --keyframe-every arguments."""
+
+    deadbands = {}
+    for units, deadband in args.deadband or []:
+        # An absolute and a relative deadband for the same units are combined
+        old = deadbands.get(units, Deadband())
+        deadbands[units] = Deadband(absolute = max(old.absolute, deadband.absolute),
+                                    relative = max(old.relative, deadband.relative))
+
+    keyframe_every = args.keyframe_every
+    if keyframe_every is None:
+        keyframe_every = DEFAULT_KEYFRAME_EVERY
+
+    default = deadbands.pop(None, Deadband())
+    return DeltaFilter(deadbands, default, keyframe_every = keyframe_every or None)
+
+def make_json(records, indent, removed = ()):
     a = []
     for record in records:
         d = {}
@@ -22,6 +73,8 @@ def make_json(records, indent):
                 v = v.name
             d[k] = v
         a.append(d)
+    for record_id in removed:
+        a.append({ 'record_id': record_id, 'removed': True })
     return json.dumps(a, indent = indent)
 
 def make_table(records):
@@ -85,7 +138,10 @@ def main():
     # Add custom arguments
     parser.add_argument('--follow', type = float, nargs = '?', const = 1, action = 'store',
                         metavar = "SECONDS",
-                        help = "keep reading (with optional delay in seconds)")
+                        help = "keep reading (with optional period in seconds)")
+
+    parser.add_argument('--align', action = 'store_true',
+                        help = "with --follow, align reads to multiples of the period")
 
     parser.add_argument('--table', type = str, nargs = '?', const = 'text', action = 'store',
                         metavar = "FORMAT",
@@ -96,6 +152,19 @@ def main():
                         metavar = "INDENT",
                         help = "output json format (optional indent for pretty output)")
 
+    parser.add_argument('--changes-only', action = 'store_true',
+                        help = "with --follow, only output sensors which have changed")
+
+    parser.add_argument('--deadband', type = parse_deadband, action = 'append',
+                        metavar = "[UNITS:]VALUE[%]",
+                        help = "with --changes-only, ignore reading changes up to VALUE "
+                        "or VALUE percent, for UNITS or for all units (may be repeated)")
+
+    parser.add_argument('--keyframe-every', type = int, action = 'store',
+                        metavar = "N",
+                        help = "with --changes-only, output all sensors every N reads "
+                        f"(0 for only the first, default={DEFAULT_KEYFRAME_EVERY})")
+
     # Add arguments for the ipmimonitoring library
     add_parser_arguments(parser)
 
@@ -106,27 +175,74 @@ def main():
         print("table and json can not be specified at the same time", file = sys.stderr)
         sys.exit(1)
 
+    if args.follow is not None and args.follow < 0:
+        print("follow period must not be negative", file = sys.stderr)
+        sys.exit(1)
+
+    if args.align and not args.follow:
+        print("align can only be specified together with follow and a period greater than 0",
+              file = sys.stderr)
+        sys.exit(1)
+
+    if args.changes_only and args.follow is None:
+        print("changes-only can only be specified together with follow", file = sys.stderr)
+        sys.exit(1)
+
+    if args.deadband is not None and not args.changes_only:
+        print("deadband can only be specified together with changes-only", file = sys.stderr)
+        sys.exit(1)
+
+    if args.keyframe_every is not None and not args.changes_only:
+        print("keyframe-every can only be specified together with changes-only",
+              file = sys.stderr)
+        sys.exit(1)
+
+    if args.keyframe_every is not None and args.keyframe_every < 0:
+        print("keyframe-every must not be negative", file = sys.stderr)
+        sys.exit(1)
+
     # Create an IpmiMonitoringContext
     ctx = create_ipmi_context(args)
 
+    # Reads are started on absolute deadlines so that the time it
+    # takes to read the sensors does not add to the period
+    scheduler = None
+    if args.follow is not None:
+        scheduler = Scheduler(args.follow, align = args.align)
+
+    delta = None
+    if args.changes_only:
+        delta = make_delta_filter(args)
+
     # Read and print sensor data
     try:
         while True:
+            if scheduler is not None:
+                scheduler.wait()
+
             records = read_sensors(ctx, args)
 
-            if args.json is not None:
-                print(make_json(records, args.json if args.json >= 0 else None))
+            # Nothing is output for a read where nothing has changed
+            removed = ()
+            if delta is not None:
+                records = delta.update(IpmiMonitoringSweep(ctx.hostname, records))
+                removed = records.removed
 
-            else:
-                table = make_table(records)
-                print(table.get_formatted_string(args.table or 'text'))
+            if delta is None or records or removed:
+                if args.json is not None:
+                    print(make_json(records, args.json if args.json >= 0 else None, removed))
 
-            sys.stdout.flush()
+                else:
+                    if delta is None or records:
+                        table = make_table(records)
+                        print(table.get_formatted_string(args.table or 'text'))
+                    if removed:
+                        print("Removed record IDs: " + ', '.join(str(r) for r in removed))
 
-            if args.follow is None:
-                break
+                sys.stdout.flush()
 
-            time.sleep(args.follow)
+            if scheduler is None:
+                break
 
     except KeyboardInterrupt:
         pass
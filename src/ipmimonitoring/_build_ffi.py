@@ -0,0 +1,156 @@
+#! /usr/bin/python3
+"""Out-of-line API mode build of the libipmimonitoring bindings.
+
+By default wrapper.py uses cffi in ABI mode, where every call into
+libipmimonitoring goes through libffi.  This script compiles an
+extension module, ipmimonitoring._ipmimonitoring_cffi, which is linked
+directly against libipmimonitoring and which wrapper.py will pick up
+automatically when it is available.
+
+Building requires a C compiler, setuptools and the libipmimonitoring
+headers (on debian "sudo apt install libipmimonitoring-dev").  Build
+the extension in place in the source tree with:
+
+    python -m ipmimonitoring._build_ffi
+
+The module level ffibuilder can also be used as a setuptools
+"cffi_modules" entry.
+"""
+
+import os
+import sys
+
+import cffi
+
+# Make it possible to run this file directly or via cffi_modules
+# without having the package installed
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ipmimonitoring._cdef import CDEF
+
+MODULE_NAME = "ipmimonitoring._ipmimonitoring_cffi"
+
+# Helpers which only exist in the API mode extension.  Walking the
+# sensor iterator in C means that a whole sweep can be extracted with a
+# single call from Python instead of a dozen calls per sensor.  The
+# extern "Python" callback is used when records are streamed to Python
+# while the library is still reading sensors.
+HELPER_TYPES = """
+union pyipmimonitoring_sensor_reading {
+    uint8_t bool_value;
+    uint32_t uint32_value;
+    double double_value;
+};
+
+struct pyipmimonitoring_sensor_record {
+    int record_id;
+    int sensor_number;
+    int sensor_type;
+    int sensor_state;
+    int sensor_units;
+    int sensor_reading_type;
+    int has_reading;
+    union pyipmimonitoring_sensor_reading reading;
+    int sensor_bitmask_type;
+    int sensor_bitmask;
+    int event_reading_type_code;
+    char *sensor_name;
+    char **sensor_bitmask_strings;
+};
+"""
+
+CDEF_HELPERS = HELPER_TYPES + """
+void pyipmimonitoring_sensor_read_record(ipmi_monitoring_ctx_t c,
+                                         struct pyipmimonitoring_sensor_record *record);
+int pyipmimonitoring_sensor_read_records(ipmi_monitoring_ctx_t c,
+                                         struct pyipmimonitoring_sensor_record *records,
+                                         int records_len);
+
+extern "Python" int pyipmimonitoring_sensor_callback(ipmi_monitoring_ctx_t c, void *callback_data);
+"""
+
+SOURCE = """
+#include <stdint.h>
+#include <string.h>
+#include <ipmi_monitoring.h>
+""" + HELPER_TYPES + """
+/* Copy the sensor reading the iterator is positioned at into record.
+ * The name and bitmask string pointers stay owned by libipmimonitoring
+ * and are valid until the iterator is destroyed.
+ */
+static void pyipmimonitoring_sensor_read_record(ipmi_monitoring_ctx_t c,
+                                                struct pyipmimonitoring_sensor_record *r)
+{
+    void *reading;
+
+    r->record_id = ipmi_monitoring_sensor_read_record_id(c);
+    r->sensor_number = ipmi_monitoring_sensor_read_sensor_number(c);
+    r->sensor_type = ipmi_monitoring_sensor_read_sensor_type(c);
+    r->sensor_name = ipmi_monitoring_sensor_read_sensor_name(c);
+    r->sensor_state = ipmi_monitoring_sensor_read_sensor_state(c);
+    r->sensor_units = ipmi_monitoring_sensor_read_sensor_units(c);
+    r->sensor_reading_type = ipmi_monitoring_sensor_read_sensor_reading_type(c);
+    r->sensor_bitmask_type = ipmi_monitoring_sensor_read_sensor_bitmask_type(c);
+    r->sensor_bitmask = ipmi_monitoring_sensor_read_sensor_bitmask(c);
+    r->sensor_bitmask_strings = ipmi_monitoring_sensor_read_sensor_bitmask_strings(c);
+    r->event_reading_type_code = ipmi_monitoring_sensor_read_event_reading_type_code(c);
+
+    memset(&r->reading, 0, sizeof(r->reading));
+    reading = ipmi_monitoring_sensor_read_sensor_reading(c);
+    r->has_reading = reading != NULL;
+    if (reading) {
+        switch (r->sensor_reading_type) {
+        case 0: /* IPMI_MONITORING_SENSOR_READING_TYPE_UNSIGNED_INTEGER8_BOOL */
+            r->reading.bool_value = *(uint8_t *)reading;
+            break;
+        case 1: /* IPMI_MONITORING_SENSOR_READING_TYPE_UNSIGNED_INTEGER32 */
+            r->reading.uint32_value = *(uint32_t *)reading;
+            break;
+        case 2: /* IPMI_MONITORING_SENSOR_READING_TYPE_DOUBLE */
+            r->reading.double_value = *(double *)reading;
+            break;
+        }
+    }
+}
+
+/* Copy up to records_len sensor readings from the iterator into
+ * records, advancing the iterator past each one.  Returns the number
+ * of records filled in.
+ */
+static int pyipmimonitoring_sensor_read_records(ipmi_monitoring_ctx_t c,
+                                                struct pyipmimonitoring_sensor_record *records,
+                                                int records_len)
+{
+    int i;
+
+    for (i = 0; i < records_len; i++) {
+        pyipmimonitoring_sensor_read_record(c, &records[i]);
+        ipmi_monitoring_sensor_iterator_next(c);
+    }
+
+    return i;
+}
+"""
+
+def make_ffibuilder(**kwargs):
+    """Create a cffi builder for the API mode extension.
+
+    Args:
+        **kwargs: Extra arguments passed on to ffi.set_source, for
+            example include_dirs or library_dirs
+
+    Returns:
+        cffi.FFI: FFI builder for the extension module
+    """
+
+    builder = cffi.FFI()
+    builder.cdef(CDEF + CDEF_HELPERS)
+    builder.set_source(MODULE_NAME, SOURCE, libraries = [ 'ipmimonitoring' ], **kwargs)
+    return builder
+
+ffibuilder = make_ffibuilder()
+
+if __name__ == '__main__':
+    # Place the extension next to the python files of the package
+    ffibuilder.compile(tmpdir = os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       verbose = True)
@@ -0,0 +1,130 @@
+"""
+C declarations from ipmi_monitoring.h, and the libc functions the
+bindings use, shared by the ABI mode bindings in wrapper.py and the
+API mode build in _build_ffi.py.
+"""
+
+# C structures from ipmi_monitoring.h
+CDEF = """
+    // IPMI config structure
+    struct ipmi_monitoring_ipmi_config {
+        int driver_type;
+        int disable_auto_probe;
+        unsigned int driver_address;
+        unsigned int register_spacing;
+        char *driver_device;
+
+        int protocol_version;
+        char *username;
+        char *password;
+        unsigned char *k_g;
+        unsigned int k_g_len;
+        int privilege_level;
+        int authentication_type;
+        int cipher_suite_id;
+        int session_timeout_len;
+        int retransmission_timeout_len;
+
+        unsigned int workaround_flags;
+    };
+
+    // Opaque context type
+    typedef struct ipmi_monitoring_ctx *ipmi_monitoring_ctx_t;
+
+    // Callback function type
+    typedef int (*Ipmi_Monitoring_Callback)(ipmi_monitoring_ctx_t c, void *callback_data);
+
+    // Library initialization
+    int ipmi_monitoring_init(unsigned int flags, int *errnum);
+
+    // Context management
+    ipmi_monitoring_ctx_t ipmi_monitoring_ctx_create(void);
+    void ipmi_monitoring_ctx_destroy(ipmi_monitoring_ctx_t c);
+    int ipmi_monitoring_ctx_errnum(ipmi_monitoring_ctx_t c);
+    char *ipmi_monitoring_ctx_strerror(int errnum);
+    char *ipmi_monitoring_ctx_errormsg(ipmi_monitoring_ctx_t c);
+
+    // Configuration functions
+    int ipmi_monitoring_ctx_sel_config_file(ipmi_monitoring_ctx_t c, const char *sel_config_file);
+    int ipmi_monitoring_ctx_sensor_config_file(ipmi_monitoring_ctx_t c, const char *sensor_config_file);
+    int ipmi_monitoring_ctx_sdr_cache_directory(ipmi_monitoring_ctx_t c, const char *dir);
+    int ipmi_monitoring_ctx_sdr_cache_filenames(ipmi_monitoring_ctx_t c, const char *format);
+
+    // SEL functions
+    int ipmi_monitoring_sel_by_record_id(ipmi_monitoring_ctx_t c, const char *hostname,
+                                        struct ipmi_monitoring_ipmi_config *config,
+                                        unsigned int sel_flags, unsigned int *record_ids,
+                                        unsigned int record_ids_len, Ipmi_Monitoring_Callback callback,
+                                        void *callback_data);
+    int ipmi_monitoring_sel_by_sensor_type(ipmi_monitoring_ctx_t c, const char *hostname,
+                                          struct ipmi_monitoring_ipmi_config *config,
+                                          unsigned int sel_flags, unsigned int *sensor_types,
+                                          unsigned int sensor_types_len, Ipmi_Monitoring_Callback callback,
+                                          void *callback_data);
+    int ipmi_monitoring_sel_by_date_range(ipmi_monitoring_ctx_t c, const char *hostname,
+                                         struct ipmi_monitoring_ipmi_config *config,
+                                         unsigned int sel_flags, const char *date_begin,
+                                         const char *date_end, Ipmi_Monitoring_Callback callback,
+                                         void *callback_data);
+
+    // SEL iterator functions
+    int ipmi_monitoring_sel_iterator_first(ipmi_monitoring_ctx_t c);
+    int ipmi_monitoring_sel_iterator_next(ipmi_monitoring_ctx_t c);
+    void ipmi_monitoring_sel_iterator_destroy(ipmi_monitoring_ctx_t c);
+    int ipmi_monitoring_sel_read_record_id(ipmi_monitoring_ctx_t c);
+    int ipmi_monitoring_sel_read_record_type(ipmi_monitoring_ctx_t c);
+    int ipmi_monitoring_sel_read_record_type_class(ipmi_monitoring_ctx_t c);
+    int ipmi_monitoring_sel_read_sel_state(ipmi_monitoring_ctx_t c);
+    int ipmi_monitoring_sel_read_timestamp(ipmi_monitoring_ctx_t c, unsigned int *timestamp);
+    int ipmi_monitoring_sel_read_sensor_type(ipmi_monitoring_ctx_t c);
+    int ipmi_monitoring_sel_read_sensor_number(ipmi_monitoring_ctx_t c);
+    char *ipmi_monitoring_sel_read_sensor_name(ipmi_monitoring_ctx_t c);
+    int ipmi_monitoring_sel_read_event_direction(ipmi_monitoring_ctx_t c);
+    int ipmi_monitoring_sel_read_event_offset_type(ipmi_monitoring_ctx_t c);
+    int ipmi_monitoring_sel_read_event_offset(ipmi_monitoring_ctx_t c);
+    char *ipmi_monitoring_sel_read_event_offset_string(ipmi_monitoring_ctx_t c);
+    int ipmi_monitoring_sel_read_event_type_code(ipmi_monitoring_ctx_t c);
+    int ipmi_monitoring_sel_read_event_data(ipmi_monitoring_ctx_t c,
+                                           unsigned int *event_data1,
+                                           unsigned int *event_data2,
+                                           unsigned int *event_data3);
+    int ipmi_monitoring_sel_read_manufacturer_id(ipmi_monitoring_ctx_t c);
+    int ipmi_monitoring_sel_read_oem_data(ipmi_monitoring_ctx_t c, void *oem_data,
+                                         unsigned int oem_data_len);
+
+    // Sensor reading functions
+    int ipmi_monitoring_sensor_readings_by_record_id(ipmi_monitoring_ctx_t c, const char *hostname,
+                                                    struct ipmi_monitoring_ipmi_config *config,
+                                                    unsigned int sensor_reading_flags,
+                                                    unsigned int *record_ids,
+                                                    unsigned int record_ids_len,
+                                                    Ipmi_Monitoring_Callback callback,
+                                                    void *callback_data);
+    int ipmi_monitoring_sensor_readings_by_sensor_type(ipmi_monitoring_ctx_t c, const char *hostname,
+                                                      struct ipmi_monitoring_ipmi_config *config,
+                                                      unsigned int sensor_reading_flags,
+                                                      unsigned int *sensor_types,
+                                                      unsigned int sensor_types_len,
+                                                      Ipmi_Monitoring_Callback callback,
+                                                      void *callback_data);
+
+    // Sensor iterator functions
+    int ipmi_monitoring_sensor_iterator_first(ipmi_monitoring_ctx_t c);
+    int ipmi_monitoring_sensor_iterator_next(ipmi_monitoring_ctx_t c);
+    void ipmi_monitoring_sensor_iterator_destroy(ipmi_monitoring_ctx_t c);
+    int ipmi_monitoring_sensor_read_record_id(ipmi_monitoring_ctx_t c);
+    int ipmi_monitoring_sensor_read_sensor_number(ipmi_monitoring_ctx_t c);
+    int ipmi_monitoring_sensor_read_sensor_type(ipmi_monitoring_ctx_t c);
+    char *ipmi_monitoring_sensor_read_sensor_name(ipmi_monitoring_ctx_t c);
+    int ipmi_monitoring_sensor_read_sensor_state(ipmi_monitoring_ctx_t c);
+    int ipmi_monitoring_sensor_read_sensor_units(ipmi_monitoring_ctx_t c);
+    int ipmi_monitoring_sensor_read_sensor_reading_type(ipmi_monitoring_ctx_t c);
+    void *ipmi_monitoring_sensor_read_sensor_reading(ipmi_monitoring_ctx_t c);
+    int ipmi_monitoring_sensor_read_sensor_bitmask_type(ipmi_monitoring_ctx_t c);
+    int ipmi_monitoring_sensor_read_sensor_bitmask(ipmi_monitoring_ctx_t c);
+    char **ipmi_monitoring_sensor_read_sensor_bitmask_strings(ipmi_monitoring_ctx_t c);
+    int ipmi_monitoring_sensor_read_event_reading_type_code(ipmi_monitoring_ctx_t c);
+
+    // From string.h, to compare strings from the library without copying them
+    int strcmp(const char *s1, const char *s2);
+"""
@@ -58,8 +58,10 @@ class CffiStructWrapper:
                         if isinstance(v, str):
                             v = v.encode('utf-8')
                         cname = t.cname
-                        if cname == 'char *':
-                            cname = 'char []'
+                        if isinstance(v, bytes) and t.item.kind == 'primitive':
+                            # Copy strings and byte buffers such as
+                            # unsigned char * into a new array
+                            cname = t.item.cname + '[]'
                         v = self._ffi.new(cname, v)
 
                     self._refs[k] = v
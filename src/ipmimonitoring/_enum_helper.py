@@ -0,0 +1,51 @@
+"""Enum helpers for IPMI monitoring.
+
+This module provides fast lookup of enum members from the integer
+values returned by libipmimonitoring.
+"""
+
+from enum import Enum
+from typing import Any, Type
+
+class EnumTable(tuple):
+    """Dense lookup table from integer values to enum members.
+
+    Looking up an Enum by value is slow and raises ValueError for
+    values which are not in the enum, for example vendor specific
+    values.  An EnumTable is a tuple indexed by value which is built
+    once when the enum is defined, values without a member and values
+    outside of the table map to the UNKNOWN member of the enum, or to
+    None if the enum has no UNKNOWN member.
+    """
+
+    def __new__(cls, enum_type: Type[Enum], size: int = 256) -> 'EnumTable':
+        """Create a lookup table for an enum.
+
+        Args:
+            enum_type: Enum class
+            size: Number of entries in the table
+        """
+
+        unknown = getattr(enum_type, 'UNKNOWN', None)
+        table = [ unknown ] * size
+        for e in enum_type:
+            if 0 <= e.value < size:
+                table[e.value] = e
+
+        self = super().__new__(cls, table)
+        self.unknown = unknown
+        return self
+
+    def get(self, value: int) -> Any:
+        """Get the enum member for a value.
+
+        Args:
+            value: Integer value
+
+        Returns:
+            The enum member for value or the UNKNOWN member or None
+        """
+
+        if 0 <= value < len(self):
+            return self[value]
+        return self.unknown
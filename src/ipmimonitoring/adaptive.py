@@ -0,0 +1,232 @@
+"""Adaptive sampling of sensors.
+
+Reading every sensor in every sweep wastes IPMI traffic and BMC time
+on sensors such as voltages which hardly change.  AdaptiveSampler
+learns how fast each sensor changes and reads it only as often as
+needed, using read_sensors_by_record_id for the sensors which are due:
+
+    sampler = AdaptiveSampler(ctx, min_interval = 5, max_staleness = 300)
+    for tick in Scheduler(sampler.min_interval).ticks():
+        for record in sampler.poll():
+            ...
+
+Sensors which are not in the NOMINAL state are read every poll.  The
+others get an interval between min_interval and max_staleness
+depending on how fast their reading has been changing relative to a
+tolerance.  Discrete sensors without a reading back off while their
+bitmask stays the same and are read every poll again when it changes.
+
+No sensor is read less often than max_staleness, as long as poll() is
+called at least every min_interval.  Every max_staleness all sensors
+are read in a full sweep, which picks up sensors which have been added
+since the last one.  Sensors which are missing from a read are dropped
+until a full sweep finds them again.
+"""
+
+import time
+from dataclasses import dataclass
+
+from .enums import IpmiMonitoringState
+from .wrapper import IpmiMonitoringContext, IpmiMonitoringSweep
+
+def _is_number(v):
+    """Check if a reading is a number which can change gradually."""
+
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+class _SensorState:
+    """What the sampler has learnt about one sensor."""
+
+    __slots__ = ('record', 'last_read', 'interval', 'rate')
+
+    def __init__(self, record, now, interval):
+        self.record = record
+        self.last_read = now
+        self.interval = interval
+        self.rate = None
+
+@dataclass
+class AdaptiveSamplerStats:
+    """Statistics for an adaptive sampler.
+
+    Attributes:
+        polls: Number of polls
+        records_read: Number of sensor records read
+        records_full: Number of records full sweeps would have read
+    """
+
+    __slots__ = ('polls', 'records_read', 'records_full')
+
+    polls : int
+    records_read : int
+    records_full : int
+
+    @property
+    def ratio(self):
+        """Fraction of the records of full sweeps which were read."""
+
+        return self.records_read / self.records_full if self.records_full else 1.0
+
+class AdaptiveSampler:
+    """Read sensors at a rate adapted to how fast they change.
+
+    Attributes:
+        ctx: IpmiMonitoringContext to read with
+        min_interval: Shortest interval between reads of a sensor
+        max_staleness: Longest interval between reads of a sensor
+        rel_tolerance: Change relative to the reading which is significant
+        abs_tolerance: Smallest change which is significant
+        stats: AdaptiveSamplerStats
+    """
+
+    def __init__(self, ctx, min_interval = 5.0, max_staleness = 300.0,
+                 rel_tolerance = 0.02, abs_tolerance = 0.5, smoothing = 0.3,
+                 reading_flags = IpmiMonitoringContext.DEFAULT_READING_FLAGS,
+                 clock = time.monotonic):
+        """Initialize an adaptive sampler.
+
+        Args:
+            ctx (IpmiMonitoringContext): Context to read with
+            min_interval (float): Shortest interval between reads of a
+                sensor, and how often poll() should be called
+            max_staleness (float): Longest interval between reads of a
+                sensor
+            rel_tolerance (float): A change of this fraction of the
+                reading is significant
+            abs_tolerance (float): A change of this much is always
+                significant
+            smoothing (float): Weight of the latest rate of change in
+                the moving average, between 0 and 1
+            reading_flags (int): Sensor reading flags to use
+            clock (callable): Function returning the current time
+        """
+
+        self.ctx = ctx
+        self.min_interval = min_interval
+        self.max_staleness = max_staleness
+        self.rel_tolerance = rel_tolerance
+        self.abs_tolerance = abs_tolerance
+        self.smoothing = smoothing
+        self.reading_flags = reading_flags
+        self.stats = AdaptiveSamplerStats(polls = 0, records_read = 0, records_full = 0)
+
+        self._clock = clock
+        self._sensors = {}
+        self._last_full = None
+
+    def latest(self):
+        """Return the latest record of every sensor.
+
+        Returns:
+            dict: IpmiMonitoringSensorData by record ID
+        """
+
+        return { record_id: s.record for record_id, s in self._sensors.items() }
+
+    def _next_interval(self, s, record, now):
+        """Compute the interval until the next read of a sensor.
+
+        Args:
+            s (_SensorState): State of the sensor
+            record (IpmiMonitoringSensorData): The new record
+            now (float): Current time
+
+        Returns:
+            float: Interval in seconds
+        """
+
+        if record.sensor_state != IpmiMonitoringState.NOMINAL:
+            return self.min_interval
+
+        old = s.record
+        if record.sensor_state != old.sensor_state or record.sensor_bitmask != old.sensor_bitmask:
+            s.rate = None
+            return self.min_interval
+
+        if not _is_number(record.sensor_reading) or not _is_number(old.sensor_reading):
+            # Discrete sensor, or a reading which is not a number,
+            # back off while nothing changes
+            if record.sensor_reading != old.sensor_reading:
+                s.rate = None
+                return self.min_interval
+            return min(self.max_staleness, s.interval * 2)
+
+        dt = now - s.last_read
+        if dt <= 0:
+            return s.interval
+
+        rate = abs(record.sensor_reading - old.sensor_reading) / dt
+        if s.rate is None:
+            s.rate = rate
+        else:
+            s.rate = self.smoothing * rate + (1 - self.smoothing) * s.rate
+
+        tolerance = max(self.abs_tolerance, self.rel_tolerance * abs(record.sensor_reading))
+        interval = tolerance / s.rate if s.rate > 0 else self.max_staleness
+
+        # Only grow gradually, a single quiet sample says little
+        interval = min(interval, s.interval * 2)
+        return max(self.min_interval, min(self.max_staleness, interval))
+
+    def due(self, now = None):
+        """Return the record IDs of the sensors which should be read now.
+
+        A sensor is due if its interval would run out before the next
+        poll.
+
+        Args:
+            now (float, optional): Current time
+
+        Returns:
+            list: Record IDs
+        """
+
+        if now is None:
+            now = self._clock()
+        horizon = now + self.min_interval
+        return [ record_id for record_id, s in self._sensors.items()
+                 if s.last_read + s.interval < horizon ]
+
+    def poll(self):
+        """Read the sensors which are due.
+
+        The first poll, and then a poll every max_staleness, reads all
+        sensors.
+
+        Returns:
+            IpmiMonitoringSweep: The records read by this poll
+        """
+
+        now = self._clock()
+
+        if self._last_full is None or now - self._last_full >= self.max_staleness:
+            sweep = self.ctx.read_sensors(self.reading_flags, snapshot = True)
+            record_ids = self._sensors.keys()
+            self._last_full = now
+        else:
+            record_ids = self.due(now)
+            if record_ids:
+                sweep = self.ctx.read_sensors_by_record_id(record_ids, self.reading_flags,
+                                                           snapshot = True)
+            else:
+                sweep = IpmiMonitoringSweep(self.ctx.hostname, ())
+
+        # Forget the sensors which are gone
+        seen = { record.record_id for record in sweep }
+        for record_id in [ record_id for record_id in record_ids if record_id not in seen ]:
+            del self._sensors[record_id]
+
+        for record in sweep:
+            s = self._sensors.get(record.record_id)
+            if s is None:
+                self._sensors[record.record_id] = _SensorState(record, now, self.min_interval)
+            else:
+                s.interval = self._next_interval(s, record, now)
+                s.record = record
+                s.last_read = now
+
+        self.stats.polls += 1
+        self.stats.records_read += len(sweep)
+        self.stats.records_full += len(self._sensors)
+
+        return sweep
@@ -0,0 +1,382 @@
+"""asyncio interface to libipmimonitoring.
+
+The library calls block for the whole round trip to the BMC, which can
+take seconds.  AsyncIpmiMonitoringContext runs them on a dedicated
+thread pool instead of on the event loop, so that many hosts can be
+polled from one event loop alongside other I/O.
+
+Sensor records are streamed back to the event loop while the library
+is still reading the sensors:
+
+    async with AsyncIpmiMonitoringContext(hostname = 'bmc1') as ctx:
+        async for record in ctx.aread_sensors():
+            print(record.sensor_name, record.sensor_reading)
+
+The number of reads in progress is limited by an AsyncLimits object,
+both in total and per host.  All contexts on an event loop share the
+default AsyncLimits of the loop unless they are given one of their own.
+
+When a read is cancelled, or the consumer stops iterating early, the
+sweep is stopped at the next record.  A call which is blocked in the
+library cannot be interrupted, so the worker thread finishes it in the
+background.  The context and the concurrency limits stay reserved until
+it has done so.
+"""
+
+import asyncio
+import weakref
+import functools
+import threading
+import concurrent.futures
+
+from .wrapper import IpmiMonitoringContext
+
+# Size of the default executor
+DEFAULT_EXECUTOR_THREADS = 64
+
+_default_executor = None
+_default_executor_lock = threading.Lock()
+
+def get_default_executor():
+    """Return the executor shared by contexts which do not have their own.
+
+    Returns:
+        concurrent.futures.ThreadPoolExecutor: The executor
+    """
+
+    global _default_executor
+
+    if _default_executor is None:
+        with _default_executor_lock:
+            if _default_executor is None:
+                _default_executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers = DEFAULT_EXECUTOR_THREADS,
+                    thread_name_prefix = 'ipmimonitoring-aio')
+    return _default_executor
+
+class AsyncLimits:
+    """Limits for the number of concurrent reads, in total and per host.
+
+    The semaphores are created on first use, so an AsyncLimits object
+    can be created before the event loop is running.  It must only be
+    used from one event loop.
+
+    Attributes:
+        total: Maximum number of reads in progress
+        per_host: Maximum number of reads in progress for one host
+    """
+
+    def __init__(self, total = DEFAULT_EXECUTOR_THREADS, per_host = 1):
+        """Initialize limits.
+
+        Args:
+            total (int): Maximum number of reads in progress
+            per_host (int): Maximum number of reads in progress for one host
+        """
+
+        self.total = total
+        self.per_host = per_host
+        self._total = None
+        self._hosts = {}
+
+    async def acquire(self, hostname):
+        """Wait until a read of a host is allowed.
+
+        Args:
+            hostname (str): Host to read
+
+        Returns:
+            callable: Function which releases the reservation
+        """
+
+        if self._total is None:
+            self._total = asyncio.Semaphore(self.total)
+
+        # Per host semaphores are reference counted so that the table
+        # does not grow with every host ever polled
+        entry = self._hosts.get(hostname)
+        if entry is None:
+            entry = self._hosts[hostname] = [ asyncio.Semaphore(self.per_host), 0 ]
+        entry[1] += 1
+
+        def unref():
+            entry[1] -= 1
+            if not entry[1]:
+                del self._hosts[hostname]
+
+        try:
+            await entry[0].acquire()
+        except BaseException:
+            unref()
+            raise
+
+        try:
+            await self._total.acquire()
+        except BaseException:
+            entry[0].release()
+            unref()
+            raise
+
+        def release():
+            self._total.release()
+            entry[0].release()
+            unref()
+
+        return release
+
+# Default limits by event loop, since the semaphores of an AsyncLimits
+# object can only be used from one event loop
+_default_limits = weakref.WeakKeyDictionary()
+
+def get_default_limits():
+    """Return the limits shared by contexts which do not have their own.
+
+    Must be called from a coroutine.  Each event loop has its own
+    default limits.
+
+    Returns:
+        AsyncLimits: The default limits of the running event loop
+    """
+
+    loop = asyncio.get_running_loop()
+    limits = _default_limits.get(loop)
+    if limits is None:
+        limits = _default_limits[loop] = AsyncLimits()
+    return limits
+
+def _retrieve_exception(future):
+    """Mark the exception of a future nobody awaits as retrieved."""
+
+    if not future.cancelled():
+        future.exception()
+
+class AsyncIpmiMonitoringContext:
+    """asyncio wrapper around IpmiMonitoringContext.
+
+    Attributes:
+        ctx: The wrapped IpmiMonitoringContext
+        executor: Executor the library calls run on
+        limits: AsyncLimits used for this context, None for the
+            default limits of the running event loop
+    """
+
+    def __init__(self, hostname = None, username = None, password = None, config = None,
+                 executor = None, limits = None, **kwargs):
+        """Initialize an asyncio context.
+
+        Args:
+            hostname (str, optional): Hostname for out-of-band communication
+            username (str, optional): Username for out-of-band communication
+            password (str, optional): Password for out-of-band communication
+            config (IpmiMonitoringConfig, optional): IPMI configuration settings
+            executor (concurrent.futures.Executor, optional): Executor to
+                run library calls on, defaults to a shared thread pool
+            limits (AsyncLimits, optional): Concurrency limits, defaults
+                to limits shared by all contexts on the event loop
+            **kwargs: Other arguments for IpmiMonitoringContext
+        """
+
+        self.ctx = IpmiMonitoringContext(hostname = hostname, username = username,
+                                         password = password, config = config, **kwargs)
+        self.executor = executor or get_default_executor()
+        self.limits = limits
+
+        # Library call which is still running, possibly after the read
+        # which started it has been cancelled
+        self._pending = None
+
+    @property
+    def hostname(self):
+        return self.ctx.hostname
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.wait_idle()
+
+    async def wait_idle(self):
+        """Wait for a library call left behind by a cancelled read to finish."""
+
+        pending = self._pending
+        if pending is not None and not pending.done():
+            await asyncio.wait([ pending ])
+
+    async def _start(self, func, *args, **kwargs):
+        """Start a library call on the executor.
+
+        The concurrency limits are held until the call has finished,
+        even if the caller is cancelled before that.
+
+        Returns:
+            asyncio.Future: Future for the result of the call
+        """
+
+        limits = self.limits or get_default_limits()
+        while True:
+            # The context can only do one thing at a time.  Wait for it
+            # before taking a slot of the limits, so that a context
+            # which is busy does not hold slots other hosts could use.
+            while self._pending is not None and not self._pending.done():
+                await asyncio.wait([ self._pending ])
+
+            release = await limits.acquire(self.hostname)
+
+            # Another read may have started while waiting for the
+            # limits.  Nothing is awaited between this check and
+            # setting _pending below.
+            if self._pending is None or self._pending.done():
+                break
+            release()
+
+        try:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+        except BaseException:
+            release()
+            raise
+
+        future.add_done_callback(lambda f: release())
+        self._pending = future
+        return future
+
+    async def _call(self, func, *args, **kwargs):
+        """Run a library call on the executor and return its result."""
+
+        future = await self._start(func, *args, **kwargs)
+        return await asyncio.shield(future)
+
+    async def aread_sensors(self, reading_flags = IpmiMonitoringContext.DEFAULT_READING_FLAGS):
+        """Read sensor data, yielding records as the library reads them.
+
+        Args:
+            reading_flags (int): Sensor reading flags to use
+
+        Yields:
+            IpmiMonitoringSensorData: Sensor records
+        """
+
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        done = object()
+        stop = False
+
+        def on_record(record):
+            loop.call_soon_threadsafe(queue.put_nowait, record)
+            return stop
+
+        future = await self._start(self.ctx.read_sensors, reading_flags, on_record = on_record)
+        future.add_done_callback(lambda f: queue.put_nowait(done))
+
+        try:
+            while True:
+                record = await queue.get()
+                if record is done:
+                    break
+                yield record
+
+            # Raise any error from the library call
+            await future
+
+        finally:
+            # Cancelled, or the consumer stopped early.  The call can
+            # not be interrupted, so it is left to finish and its
+            # error, if any, is retrieved so that it is not logged.
+            stop = True
+            future.add_done_callback(_retrieve_exception)
+
+    async def aread_sweep(self, reading_flags = IpmiMonitoringContext.DEFAULT_READING_FLAGS):
+        """Read sensor data into an IpmiMonitoringSweep.
+
+        Args:
+            reading_flags (int): Sensor reading flags to use
+
+        Returns:
+            IpmiMonitoringSweep: The sensor records
+        """
+
+        return await self._call(self.ctx.read_sensors, reading_flags, snapshot = True)
+
+    async def aread_sensors_by_record_id(self, record_ids,
+                                         reading_flags = IpmiMonitoringContext.DEFAULT_READING_FLAGS):
+        """Read sensor data into an IpmiMonitoringSweep.  Only return matching record IDs.
+
+        Args:
+            record_ids (list): List of record IDs to match
+            reading_flags (int): Sensor reading flags to use
+
+        Returns:
+            IpmiMonitoringSweep: The sensor records
+        """
+
+        return await self._call(self.ctx.read_sensors_by_record_id, record_ids, reading_flags,
+                                snapshot = True)
+
+    async def aread_sensors_by_sensor_type(self, sensor_types,
+                                           reading_flags = IpmiMonitoringContext.DEFAULT_READING_FLAGS):
+        """Read sensor data into an IpmiMonitoringSweep.  Only return matching sensor types.
+
+        Args:
+            sensor_types (list): List of sensor types to match
+            reading_flags (int): Sensor reading flags to use
+
+        Returns:
+            IpmiMonitoringSweep: The sensor records
+        """
+
+        return await self._call(self.ctx.read_sensors_by_sensor_type, sensor_types, reading_flags,
+                                snapshot = True)
+
+    async def aread_sel(self, sel_flags = IpmiMonitoringContext.DEFAULT_SEL_FLAGS):
+        """Read all System Event Log records.
+
+        Args:
+            sel_flags (int): SEL flags to use
+
+        Returns:
+            list: IpmiMonitoringSelData records
+        """
+
+        return await self._call(self.ctx.read_sel, sel_flags)
+
+    async def aread_sel_by_record_id(self, record_ids, sel_flags = IpmiMonitoringContext.DEFAULT_SEL_FLAGS):
+        """Read System Event Log records.  Only return records matching record IDs.
+
+        Args:
+            record_ids (list): List of record IDs to match
+            sel_flags (int): SEL flags to use
+
+        Returns:
+            list: IpmiMonitoringSelData records
+        """
+
+        return await self._call(self.ctx.read_sel_by_record_id, record_ids, sel_flags)
+
+    async def aread_sel_by_sensor_type(self, sensor_types, sel_flags = IpmiMonitoringContext.DEFAULT_SEL_FLAGS):
+        """Read System Event Log records.  Only return matching sensor types.
+
+        Args:
+            sensor_types (list): List of sensor types to match
+            sel_flags (int): SEL flags to use
+
+        Returns:
+            list: IpmiMonitoringSelData records
+        """
+
+        return await self._call(self.ctx.read_sel_by_sensor_type, sensor_types, sel_flags)
+
+    async def aread_sel_by_date_range(self, date_begin = None, date_end = None,
+                                      sel_flags = IpmiMonitoringContext.DEFAULT_SEL_FLAGS):
+        """Read System Event Log records.  Only return records in a date range.
+
+        Args:
+            date_begin (str or datetime.date, optional): First date
+            date_end (str or datetime.date, optional): Last date
+            sel_flags (int): SEL flags to use
+
+        Returns:
+            list: IpmiMonitoringSelData records
+        """
+
+        return await self._call(self.ctx.read_sel_by_date_range, date_begin, date_end, sel_flags)
@@ -6,6 +6,7 @@ creates an IpmiMonitoringContext based on those arguments.
 """
 
 import os
+import re
 import argparse
 import typing
 from argparse import ArgumentParser
@@ -47,6 +48,10 @@ def add_parser_arguments(parser: ArgumentParser) -> None:
                         help = 'sensor types to read')
     group.add_argument('--record-id', type = int, action = 'append',
                         help = 'record IDs to read')
+    group.add_argument('--sensor-name', type = str, action = 'append', metavar = 'GLOB',
+                        help = 'names of sensors to read, glob patterns such as "CPU*_TEMP"')
+    group.add_argument('--sensor-regex', type = re.compile, action = 'append', metavar = 'REGEX',
+                        help = 'regular expressions matching the whole names of sensors to read')
 
     group = parser.add_argument_group("in-band communication configuration")
     group.add_argument('--driver-type',
@@ -182,7 +187,8 @@ def read_sensors(ctx: IpmiMonitoringContext, args: argparse.Namespace) -> typing
     """Read sensor data based on the provided arguments.
 
     This function determines which sensors to read based on the arguments
-    (sensor types or record IDs) and returns the appropriate sensor data.
+    (sensor types, record IDs or sensor names) and returns the appropriate
+    sensor data.
 
     Args:
         ctx (IpmiMonitoringContext): IPMI monitoring context
@@ -197,6 +203,9 @@ def read_sensors(ctx: IpmiMonitoringContext, args: argparse.Namespace) -> typing
         records = ctx.read_sensors_by_sensor_type(args.sensor_type, reading_flags = sensor_reading_flags)
     elif args.record_id:
         records = ctx.read_sensors_by_record_id(args.record_id, reading_flags = sensor_reading_flags)
+    elif args.sensor_name or args.sensor_regex:
+        names = (args.sensor_name or []) + (args.sensor_regex or [])
+        records = ctx.read_sensors(reading_flags = sensor_reading_flags, names = names)
     else:
         records = ctx.read_sensors(reading_flags = sensor_reading_flags)
     return records
@@ -4,6 +4,8 @@ Python version of enums from ipmi_monitoring_bitmasks.h
 
 from enum import Enum
 
+from ._enum_helper import EnumTable
+
 class IpmiMonitoringSensorBitmaskType(Enum):
     """IPMI Monitoring Sensor Bitmask Type"""
     THRESHOLD = 0x00
@@ -446,3 +448,6 @@ class IpmiMonitoringSensorBitmaskFruState(Enum):
     FRU_DEACTIVATION_REQUESTED = 0x0020
     FRU_DEACTIVATION_IN_PROGRESS = 0x0040
     FRU_COMMUNICATION_LOST = 0x0080
+
+# Lookup table for decoding values returned by libipmimonitoring
+IPMI_MONITORING_SENSOR_BITMASK_TYPE_TABLE = EnumTable(IpmiMonitoringSensorBitmaskType)
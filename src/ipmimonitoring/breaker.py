@@ -0,0 +1,231 @@
+"""Per-host circuit breakers.
+
+When a BMC is down every read waits for the full session timeout.  A
+circuit breaker remembers that a host is failing and rejects reads of
+it straight away for a while, so that the time goes to hosts which
+answer:
+
+    breakers = CircuitBreakers()
+
+    breaker = breakers.get(hostname)
+    sweep = breaker.call(ctx.read_sensors, snapshot = True)
+
+Connection and session timeouts and BMC busy errors open the breaker
+with a backoff which doubles for every consecutive failure.
+Authentication errors will not go away by themselves, so they open
+the breaker for the maximum backoff at once.  When the backoff has
+expired one read is let through as a probe.  If it succeeds the
+breaker closes again, otherwise it opens with a longer backoff.
+"""
+
+import time
+import threading
+from enum import Enum
+from dataclasses import dataclass
+
+from .wrapper import (IpmiMonitoringError, IpmiMonitoringConnectionError,
+                      IpmiMonitoringBusyError, IpmiMonitoringAuthError)
+
+class CircuitState(Enum):
+    """State of a circuit breaker"""
+    CLOSED = 0
+    OPEN = 1
+    HALF_OPEN = 2
+
+class IpmiMonitoringCircuitOpenError(IpmiMonitoringError):
+    """A read was rejected because the circuit breaker of the host is open.
+
+    Attributes:
+        retry_after: Seconds until the breaker lets a probe through
+        cause: The exception which opened the breaker
+    """
+
+    def __init__(self, message, retry_after = 0.0, cause = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.cause = cause
+
+    def __reduce__(self):
+        return (self.__class__, (str(self), self.retry_after, self.cause))
+
+class CircuitBreaker:
+    """Circuit breaker for one host.
+
+    Attributes:
+        hostname: Hostname of the host
+        state: CircuitState of the breaker
+        failures: Number of consecutive failures
+        last_error: Exception from the last failure, or None
+    """
+
+    def __init__(self, hostname, base_backoff = 1.0, max_backoff = 300.0,
+                 failure_threshold = 1, clock = time.monotonic):
+        """Initialize a circuit breaker.
+
+        Args:
+            hostname (str): Hostname of the host
+            base_backoff (float): Backoff after the first failure
+            max_backoff (float): Longest backoff, also used for
+                authentication errors
+            failure_threshold (int): Number of consecutive timeouts
+                before the breaker opens
+            clock (callable): Function returning the current time
+        """
+
+        self.hostname = hostname
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.failure_threshold = failure_threshold
+
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.last_error = None
+
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._open_until = 0.0
+        self._probing = False
+
+    def retry_after(self):
+        """Seconds until the breaker lets a read through, 0 if it does now."""
+
+        with self._lock:
+            if self.state == CircuitState.OPEN:
+                return max(0.0, self._open_until - self._clock())
+            return 0.0
+
+    def allow(self):
+        """Check if a read may be started.
+
+        In the half open state only one read at a time is allowed, the
+        probe.  Every read which is allowed must be followed by a call
+        to success() or failure().
+
+        Returns:
+            bool: True if the read may be started
+        """
+
+        with self._lock:
+            if self.state == CircuitState.OPEN:
+                if self._clock() < self._open_until:
+                    return False
+                self.state = CircuitState.HALF_OPEN
+
+            if self.state == CircuitState.HALF_OPEN:
+                if self._probing:
+                    return False
+                self._probing = True
+
+            return True
+
+    def success(self):
+        """Record a successful read."""
+
+        with self._lock:
+            self.state = CircuitState.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def failure(self, error):
+        """Record a failed read.
+
+        Errors other than timeouts, BMC busy and authentication errors
+        say nothing about the health of the BMC and do not count.  If
+        such an error ends the probe of a half open breaker, the breaker
+        stays half open and the next read is the probe.
+
+        Args:
+            error (Exception): The exception raised by the read
+        """
+
+        with self._lock:
+            probing = self._probing
+            self._probing = False
+
+            if isinstance(error, IpmiMonitoringAuthError):
+                backoff = self.max_backoff
+
+            elif isinstance(error, (IpmiMonitoringConnectionError, IpmiMonitoringBusyError)):
+                self.failures += 1
+                if self.failures < self.failure_threshold and not probing:
+                    self.last_error = error
+                    return
+                exponent = max(0, self.failures - self.failure_threshold)
+                backoff = min(self.max_backoff, self.base_backoff * 2 ** exponent)
+
+            else:
+                return
+
+            self.last_error = error
+            self.state = CircuitState.OPEN
+            self._open_until = self._clock() + backoff
+
+    def call(self, func, *args, **kwargs):
+        """Call a read function through the breaker.
+
+        Args:
+            func (callable): Function which reads from the host
+            *args: Arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            The return value of func
+        """
+
+        if not self.allow():
+            raise IpmiMonitoringCircuitOpenError(
+                f"Circuit breaker for {self.hostname} is open: {self.last_error}",
+                self.retry_after(), self.last_error)
+
+        try:
+            result = func(*args, **kwargs)
+
+        except BaseException as e:
+            # Also for KeyboardInterrupt and the like, so that a probe
+            # is never left running
+            self.failure(e)
+            raise
+
+        self.success()
+        return result
+
+class CircuitBreakers:
+    """Circuit breakers for many hosts, created on demand."""
+
+    def __init__(self, **breaker_kwargs):
+        """Initialize the breakers.
+
+        Args:
+            **breaker_kwargs: Arguments for each CircuitBreaker
+        """
+
+        self._breaker_kwargs = breaker_kwargs
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, hostname):
+        """Return the circuit breaker of a host.
+
+        Args:
+            hostname (str): Hostname of the host
+
+        Returns:
+            CircuitBreaker: The breaker
+        """
+
+        with self._lock:
+            breaker = self._breakers.get(hostname)
+            if breaker is None:
+                breaker = self._breakers[hostname] = CircuitBreaker(hostname, **self._breaker_kwargs)
+            return breaker
+
+    def open_hosts(self):
+        """Return the hostnames whose breakers are not closed.
+
+        Returns:
+            list: Hostnames
+        """
+
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return [ b.hostname for b in breakers if b.state != CircuitState.CLOSED ]
@@ -0,0 +1,229 @@
+"""Emitting only the sensors which have changed.
+
+Most sensors read the same from one sweep to the next, so storing or
+shipping every sweep mostly repeats old data.  DeltaFilter remembers
+the last emitted record of every sensor of each host and passes on
+only the records whose state or bitmask has changed, or whose reading
+has moved outside a deadband around the last emitted reading:
+
+    delta = DeltaFilter(deadbands = {
+        IpmiMonitoringSensorUnits.CELSIUS: Deadband(absolute = 1.0),
+        IpmiMonitoringSensorUnits.RPM: Deadband(relative = 0.05),
+    }, keyframe_every = 60)
+
+    for tick in Scheduler(10).ticks():
+        changes = delta.update(ctx.read_sensors(snapshot = True))
+        for record in changes:
+            ...
+
+The deadband is measured from the last emitted reading, not the last
+read one, so a slow drift is emitted once it has added up.  Every
+keyframe_every sweeps of a host all sensors are emitted, so that
+consumers which start late or lose data catch up.
+"""
+
+from dataclasses import dataclass
+
+from .wrapper import IpmiMonitoringSweep
+
+def _is_number(v):
+    """Check if a reading is a number a deadband applies to."""
+
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+@dataclass(frozen = True)
+class Deadband:
+    """Change of a reading which is too small to emit.
+
+    A reading is emitted when it differs from the last emitted reading
+    by more than both the absolute deadband and the relative deadband
+    times the last emitted reading.
+
+    Attributes:
+        absolute: Absolute deadband in the units of the sensor
+        relative: Deadband as a fraction of the reading
+    """
+
+    __slots__ = ('absolute', 'relative')
+
+    absolute : float
+    relative : float
+
+    def __init__(self, absolute = 0.0, relative = 0.0):
+        object.__setattr__(self, 'absolute', absolute)
+        object.__setattr__(self, 'relative', relative)
+
+    def exceeded(self, old, new):
+        """Check if a reading has moved outside the deadband.
+
+        Args:
+            old (float): Last emitted reading
+            new (float): New reading
+
+        Returns:
+            bool: True if the change should be emitted
+        """
+
+        return abs(new - old) > max(self.absolute, self.relative * abs(old))
+
+class DeltaSweep(IpmiMonitoringSweep):
+    """The changed records of a sweep.
+
+    Attributes:
+        hostname: Hostname the sweep was read from
+        timestamp: Time when the sweep was completed
+        records: Tuple of the records which have changed, or all
+            records of a keyframe
+        keyframe: True if this holds all records of the sweep
+        removed: Tuple of record IDs which were in the last sweep but
+            not in this one
+    """
+
+    __slots__ = ('keyframe', 'removed')
+
+    def __init__(self, hostname, records, timestamp = None, keyframe = False, removed = ()):
+        super().__init__(hostname, records, timestamp)
+        object.__setattr__(self, 'keyframe', keyframe)
+        object.__setattr__(self, 'removed', tuple(removed))
+
+    def __repr__(self):
+        return (f"<{self.__class__.__name__} {self.hostname!r} {len(self)} records"
+                f"{' keyframe' if self.keyframe else ''}>")
+
+@dataclass
+class DeltaStats:
+    """Statistics for a delta filter.
+
+    Attributes:
+        sweeps: Number of sweeps filtered
+        keyframes: Number of keyframes emitted
+        records_in: Number of records in the sweeps
+        records_out: Number of records emitted
+    """
+
+    __slots__ = ('sweeps', 'keyframes', 'records_in', 'records_out')
+
+    sweeps : int
+    keyframes : int
+    records_in : int
+    records_out : int
+
+    @property
+    def ratio(self):
+        """Fraction of the records which were emitted."""
+
+        return self.records_out / self.records_in if self.records_in else 1.0
+
+class _HostState:
+    """Last emitted records of one host."""
+
+    __slots__ = ('records', 'sweeps')
+
+    def __init__(self):
+        self.records = {}
+        self.sweeps = 0
+
+class DeltaFilter:
+    """Pass on only the sensor records which have changed.
+
+    The filter keeps state for each hostname, so one filter can be used
+    for the sweeps of many hosts, for example from a FleetPoller.
+
+    Attributes:
+        deadbands: Deadband by IpmiMonitoringSensorUnits
+        default_deadband: Deadband for units not in deadbands
+        keyframe_every: Emit all records every this many sweeps of a
+            host, None for only the first sweep
+        stats: DeltaStats
+    """
+
+    def __init__(self, deadbands = None, default_deadband = Deadband(), keyframe_every = 60):
+        """Initialize a delta filter.
+
+        Args:
+            deadbands (dict, optional): Deadband by IpmiMonitoringSensorUnits
+            default_deadband (Deadband): Deadband for other units,
+                by default any change is emitted
+            keyframe_every (int, optional): Emit all records every this
+                many sweeps of a host, None for only the first sweep
+        """
+
+        if keyframe_every is not None and keyframe_every < 1:
+            raise ValueError("keyframe_every must be at least 1, or None")
+
+        self.deadbands = dict(deadbands or {})
+        self.default_deadband = default_deadband
+        self.keyframe_every = keyframe_every
+        self.stats = DeltaStats(sweeps = 0, keyframes = 0, records_in = 0, records_out = 0)
+
+        self._hosts = {}
+
+    def _changed(self, old, new):
+        """Check if a record differs enough from the last emitted one."""
+
+        if (new.sensor_state != old.sensor_state or
+            new.sensor_bitmask != old.sensor_bitmask):
+            return True
+
+        a = old.sensor_reading
+        b = new.sensor_reading
+        if a == b:
+            return False
+        if not _is_number(a) or not _is_number(b):
+            # Missing, boolean or other readings only compare equal
+            return True
+
+        deadband = self.deadbands.get(new.sensor_units, self.default_deadband)
+        return deadband.exceeded(a, b)
+
+    def update(self, sweep):
+        """Filter a sweep.
+
+        Args:
+            sweep (IpmiMonitoringSweep): A complete sweep of a host
+
+        Returns:
+            DeltaSweep: The records which have changed
+        """
+
+        host = self._hosts.get(sweep.hostname)
+        if host is None:
+            host = self._hosts[sweep.hostname] = _HostState()
+
+        keyframe = host.sweeps == 0 or (self.keyframe_every is not None and
+                                         host.sweeps % self.keyframe_every == 0)
+        host.sweeps += 1
+
+        last = host.records
+        seen = set()
+        changed = []
+        for record in sweep:
+            record_id = record.record_id
+            seen.add(record_id)
+            old = last.get(record_id)
+            if keyframe or old is None or self._changed(old, record):
+                last[record_id] = record
+                changed.append(record)
+
+        removed = [ record_id for record_id in last if record_id not in seen ]
+        for record_id in removed:
+            del last[record_id]
+
+        self.stats.sweeps += 1
+        self.stats.keyframes += keyframe
+        self.stats.records_in += len(sweep)
+        self.stats.records_out += len(changed)
+
+        return DeltaSweep(sweep.hostname, changed, sweep.timestamp, keyframe, removed)
+
+    def reset(self, hostname = None):
+        """Forget the state of a host, so that its next sweep is a keyframe.
+
+        Args:
+            hostname (str, optional): Hostname, None for all hosts
+        """
+
+        if hostname is None:
+            self._hosts.clear()
+        else:
+            self._hosts.pop(hostname, None)
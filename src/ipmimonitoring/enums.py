@@ -4,6 +4,8 @@ Python version of enums from ipmi_monitoring.h
 
 from enum import Enum
 
+from ._enum_helper import EnumTable
+
 class IpmiMonitoringErrorCodes(Enum):
     """IPMI Monitoring Error Codes"""
     SUCCESS = 0
@@ -211,3 +213,11 @@ class IpmiMonitoringSensorReadingFlags(Enum):
     ENTITY_SENSOR_NAMES = 0x00000100
     ASSUME_MAX_SDR_RECORD_COUNT = 0x00000200
     IGNORE_UNREADABLE_SENSORS = 0x00000002  # legacy macro
+
+# Lookup tables for decoding values returned by libipmimonitoring
+IPMI_MONITORING_STATE_TABLE = EnumTable(IpmiMonitoringState)
+IPMI_MONITORING_SENSOR_TYPE_TABLE = EnumTable(IpmiMonitoringSensorType)
+IPMI_MONITORING_SENSOR_UNITS_TABLE = EnumTable(IpmiMonitoringSensorUnits)
+IPMI_MONITORING_SENSOR_READING_TYPE_TABLE = EnumTable(IpmiMonitoringSensorReadingType)
+IPMI_MONITORING_SEL_RECORD_TYPE_CLASS_TABLE = EnumTable(IpmiMonitoringSelRecordTypeClass)
+IPMI_MONITORING_SEL_EVENT_DIRECTION_TABLE = EnumTable(IpmiMonitoringSelEventDirection)
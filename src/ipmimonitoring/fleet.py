@@ -0,0 +1,560 @@
+"""Concurrent sensor sweeps of many hosts.
+
+FleetPoller reads the sensors of a list of hosts on a bounded pool of
+threads.  Each worker thread has its own IpmiMonitoringContext which
+it reuses for every host it polls.  cffi releases the GIL while a
+thread is blocked in libipmimonitoring waiting for a BMC, so the
+sweeps of different hosts overlap even though the records are decoded
+in Python.
+
+Decoding still holds the GIL, so a large fleet saturates one core.
+ProcessFleetPoller shards the hosts across worker processes which each
+run a FleetPoller, and sends the sweeps back as CompactSweep objects,
+which pickle to a few flat arrays instead of one object per record.
+"""
+
+import os
+import math
+import time
+import array
+import threading
+import concurrent.futures
+from dataclasses import dataclass
+
+from .enums import *
+from .bitmasks import *
+from .wrapper import IpmiMonitoringContext, IpmiMonitoringConfig, IpmiMonitoringSensorData
+from .wrapper import _READING_TYPE_BOOL, _READING_TYPE_UINT32
+from .schedule import jitter_offset
+from .isolated import IsolatedContext
+
+@dataclass
+class FleetResult:
+    """Result of sweeping one host.
+
+    Attributes:
+        hostname: Hostname of the host
+        sweep: IpmiMonitoringSweep with the sensor records, or None on error
+        error: Exception raised by the sweep, or None on success
+        elapsed: Time the sweep took in seconds
+    """
+
+    __slots__ = ('hostname', 'sweep', 'error', 'elapsed')
+
+    hostname : str
+    sweep : object
+    error : object
+    elapsed : float
+
+    @property
+    def ok(self):
+        """True if the sweep succeeded."""
+
+        return self.error is None
+
+@dataclass
+class FleetSweepStats:
+    """Fleet wide timing statistics for one sweep.
+
+    Attributes:
+        hosts: Number of hosts polled
+        ok: Number of successful hosts
+        failed: Number of hosts which failed
+        records: Total number of sensor records read
+        wall_time: Time from the start to the end of the sweep
+        min_time: Shortest time to poll a host
+        mean_time: Mean time to poll a host
+        p50_time: Median time to poll a host
+        p95_time: 95th percentile of the time to poll a host
+        max_time: Longest time to poll a host
+    """
+
+    __slots__ = ('hosts', 'ok', 'failed', 'records', 'wall_time',
+                 'min_time', 'mean_time', 'p50_time', 'p95_time', 'max_time')
+
+    hosts : int
+    ok : int
+    failed : int
+    records : int
+    wall_time : float
+    min_time : float
+    mean_time : float
+    p50_time : float
+    p95_time : float
+    max_time : float
+
+    @classmethod
+    def from_results(cls, results, wall_time):
+        """Compute the statistics of a sweep.
+
+        Args:
+            results (list): FleetResult objects
+            wall_time (float): Duration of the sweep
+
+        Returns:
+            FleetSweepStats: Statistics
+        """
+
+        times = sorted(r.elapsed for r in results)
+        ok = sum(1 for r in results if r.ok)
+
+        def percentile(p):
+            if not times:
+                return 0.0
+            return times[min(len(times) - 1, int(p * len(times)))]
+
+        return cls(
+            hosts = len(results),
+            ok = ok,
+            failed = len(results) - ok,
+            records = sum(len(r.sweep) for r in results if r.ok),
+            wall_time = wall_time,
+            min_time = times[0] if times else 0.0,
+            mean_time = sum(times) / len(times) if times else 0.0,
+            p50_time = percentile(0.50),
+            p95_time = percentile(0.95),
+            max_time = times[-1] if times else 0.0)
+
+class FleetPoller:
+    """Poll the sensors of many hosts concurrently.
+
+    Attributes:
+        hosts: List of (hostname, config) tuples
+        concurrency: Number of worker threads
+        stats: FleetSweepStats for the last completed sweep, or None
+    """
+
+    def __init__(self, hosts, concurrency = 32, reading_flags = IpmiMonitoringContext.DEFAULT_READING_FLAGS,
+                 spread = 0.0, breakers = None, deadline = None, mp_context = None,
+                 **context_kwargs):
+        """Initialize a fleet poller.
+
+        Args:
+            hosts (iterable): (hostname, config) tuples, where config is
+                an IpmiMonitoringConfig or None for the default config
+            concurrency (int): Maximum number of hosts polled at the same time
+            reading_flags (int): Sensor reading flags to use
+            spread (float): Spread the start of the hosts over this many
+                seconds from the start of the sweep.  Each host gets the
+                same offset in every sweep, see schedule.jitter_offset.
+            breakers (CircuitBreakers, optional): Circuit breakers which
+                skip hosts that have been failing
+            deadline (float, optional): Hard deadline for reading a host
+                in seconds.  Each worker thread then reads through an
+                IsolatedContext, which runs the reads in a worker process
+                that is killed if the deadline passes.
+            mp_context (optional): multiprocessing context for the
+                worker processes of IsolatedContext
+            **context_kwargs: Extra arguments for the IpmiMonitoringContext
+                of each worker thread, for example sdr_cache_directory
+        """
+
+        self.hosts = list(hosts)
+        self.concurrency = concurrency
+        self.reading_flags = reading_flags
+        self.spread = spread
+        self.breakers = breakers
+        self.deadline = deadline
+        self.stats = None
+
+        self._context_kwargs = context_kwargs
+        self._mp_context = mp_context
+        self._isolated = []
+        self._default_config = IpmiMonitoringConfig()
+        self._local = threading.local()
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers = concurrency, thread_name_prefix = 'ipmimonitoring')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Stop the worker threads."""
+
+        self._executor.shutdown(wait = True)
+
+        for ctx in self._isolated:
+            ctx.close()
+        self._isolated = []
+
+    def _get_context(self):
+        """Return the context of the current worker thread."""
+
+        ctx = getattr(self._local, 'ctx', None)
+        if ctx is None:
+            if self.deadline is not None:
+                ctx = IsolatedContext(deadline = self.deadline, mp_context = self._mp_context,
+                                      **self._context_kwargs)
+                self._isolated.append(ctx)
+            else:
+                ctx = IpmiMonitoringContext(**self._context_kwargs)
+            self._local.ctx = ctx
+        return ctx
+
+    def _poll_host(self, hostname, config, start = None):
+        """Sweep one host on a worker thread.
+
+        Args:
+            hostname (str): Host to sweep
+            config (IpmiMonitoringConfig): Config for the host or None
+            start (float, optional): time.monotonic() to start at
+
+        Returns:
+            FleetResult: Result of the sweep
+        """
+
+        if start is not None:
+            delay = start - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+        t0 = time.perf_counter()
+        try:
+            ctx = self._get_context()
+            ctx.hostname = hostname
+            ctx.config = config or self._default_config
+            if self.breakers is not None:
+                sweep = self.breakers.get(hostname).call(
+                    ctx.read_sensors, self.reading_flags, snapshot = True)
+            else:
+                sweep = ctx.read_sensors(self.reading_flags, snapshot = True)
+            return FleetResult(hostname, sweep, None, time.perf_counter() - t0)
+
+        except Exception as e:
+            return FleetResult(hostname, None, e, time.perf_counter() - t0)
+
+    def iter_sweep(self):
+        """Sweep all hosts, yielding the results as they complete.
+
+        The statistics for the sweep are available in the stats
+        attribute once the generator has been exhausted.
+
+        Yields:
+            FleetResult: Result for each host
+        """
+
+        t0 = time.perf_counter()
+        if self.spread:
+            # Submitted in start order, so a worker thread only waits
+            # when there is no host which is due yet
+            now = time.monotonic()
+            hosts = sorted(((now + jitter_offset(hostname, self.spread), hostname, config)
+                            for hostname, config in self.hosts), key = lambda h: h[0])
+            futures = [ self._executor.submit(self._poll_host, hostname, config, start)
+                        for start, hostname, config in hosts ]
+        else:
+            futures = [ self._executor.submit(self._poll_host, hostname, config)
+                        for hostname, config in self.hosts ]
+
+        results = []
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                result = future.result()
+                results.append(result)
+                yield result
+
+        finally:
+            for future in futures:
+                future.cancel()
+
+        self.stats = FleetSweepStats.from_results(results, time.perf_counter() - t0)
+
+    def sweep(self):
+        """Sweep all hosts.
+
+        Returns:
+            list: FleetResult for each host, in completion order
+        """
+
+        return list(self.iter_sweep())
+
+# Integer columns of a CompactSweep and the record field for each
+_COMPACT_COLUMNS = (
+    ('record_id', 'record_id'),
+    ('event_reading_type_code', 'event_reading_type_code'),
+    ('sensor_number', 'sensor_number'),
+    ('sensor_type', 'sensor_type'),
+    ('state', 'sensor_state'),
+    ('reading_type', 'sensor_reading_type'),
+    ('units', 'sensor_units'),
+    ('bitmask_type', 'sensor_bitmask_type'),
+    ('bitmask', 'sensor_bitmask'),
+)
+
+class CompactSweep:
+    """Columnar form of a sweep which is cheap to pickle.
+
+    The integer fields are stored in array.array columns and the
+    readings as doubles, NaN if the sensor has no reading.  Readings
+    which are not numbers, such as the string for a reading of an
+    unknown type, are stored as NaN and kept separately.  Sensor names
+    and bitmask strings are stored as indices into tuples of unique
+    values.
+
+    Attributes:
+        hostname: Hostname the sweep was read from
+        timestamp: Time when the sweep was completed
+        columns: Integer columns by name
+        reading: Sensor readings
+        other_readings: Readings which are not numbers by record index
+        names: Unique sensor names
+        name_codes: Index into names for each record
+        bitmask_strings: Unique tuples of bitmask strings
+        bitmask_strings_codes: Index into bitmask_strings for each record
+    """
+
+    __slots__ = ('hostname', 'timestamp', 'columns', 'reading', 'other_readings',
+                 'names', 'name_codes', 'bitmask_strings', 'bitmask_strings_codes')
+
+    def __init__(self, hostname, timestamp, columns, reading, other_readings,
+                 names, name_codes, bitmask_strings, bitmask_strings_codes):
+        self.hostname = hostname
+        self.timestamp = timestamp
+        self.columns = columns
+        self.reading = reading
+        self.other_readings = other_readings
+        self.names = names
+        self.name_codes = name_codes
+        self.bitmask_strings = bitmask_strings
+        self.bitmask_strings_codes = bitmask_strings_codes
+
+    def __len__(self):
+        return len(self.reading)
+
+    def __getstate__(self):
+        return tuple(getattr(self, k) for k in self.__slots__)
+
+    def __setstate__(self, state):
+        for k, v in zip(self.__slots__, state):
+            setattr(self, k, v)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self.hostname!r} {len(self)} records>"
+
+    @classmethod
+    def from_sweep(cls, sweep):
+        """Convert an IpmiMonitoringSweep.
+
+        Args:
+            sweep (IpmiMonitoringSweep): The sweep
+
+        Returns:
+            CompactSweep: The same records in columnar form
+        """
+
+        columns = { k: array.array('i') for k, _ in _COMPACT_COLUMNS }
+        reading = array.array('d')
+        other_readings = {}
+        names = {}
+        name_codes = array.array('i')
+        bitmask_strings = {}
+        bitmask_strings_codes = array.array('i')
+
+        for record in sweep:
+            for k, field in _COMPACT_COLUMNS:
+                v = getattr(record, field)
+                columns[k].append(v if isinstance(v, int) else v.value)
+            v = record.sensor_reading
+            if v is None:
+                reading.append(math.nan)
+            elif isinstance(v, (int, float)):
+                reading.append(v)
+            else:
+                other_readings[len(reading)] = v
+                reading.append(math.nan)
+            name_codes.append(names.setdefault(record.sensor_name, len(names)))
+            bitmask_strings_codes.append(
+                bitmask_strings.setdefault(record.sensor_bitmask_strings, len(bitmask_strings)))
+
+        return cls(sweep.hostname, sweep.timestamp, columns, reading, other_readings,
+                   tuple(names), name_codes, tuple(bitmask_strings), bitmask_strings_codes)
+
+    def records(self):
+        """Expand the sweep into IpmiMonitoringSensorData records.
+
+        Returns:
+            list: IpmiMonitoringSensorData records
+        """
+
+        c = self.columns
+        result = []
+        for i in range(len(self)):
+            reading_type = c['reading_type'][i]
+            reading = self.reading[i]
+            if math.isnan(reading):
+                reading = self.other_readings.get(i)
+            elif reading_type == _READING_TYPE_BOOL:
+                reading = bool(reading)
+            elif reading_type == _READING_TYPE_UINT32:
+                reading = int(reading)
+
+            result.append(IpmiMonitoringSensorData(
+                record_id = c['record_id'][i],
+                event_reading_type_code = c['event_reading_type_code'][i],
+                sensor_number = c['sensor_number'][i],
+                sensor_name = self.names[self.name_codes[i]],
+                sensor_type = IPMI_MONITORING_SENSOR_TYPE_TABLE.get(c['sensor_type'][i]),
+                sensor_state = IPMI_MONITORING_STATE_TABLE.get(c['state'][i]),
+                sensor_reading_type = IPMI_MONITORING_SENSOR_READING_TYPE_TABLE.get(reading_type),
+                sensor_reading = reading,
+                sensor_units = IPMI_MONITORING_SENSOR_UNITS_TABLE.get(c['units'][i]),
+                sensor_bitmask_type = IPMI_MONITORING_SENSOR_BITMASK_TYPE_TABLE.get(c['bitmask_type'][i]),
+                sensor_bitmask = c['bitmask'][i],
+                sensor_bitmask_strings = self.bitmask_strings[self.bitmask_strings_codes[i]]))
+        return result
+
+    def to_frame(self):
+        """Convert to a SensorFrame.  Requires NumPy.
+
+        Returns:
+            SensorFrame: The sweep
+        """
+
+        import numpy as np
+        from .frame import SensorFrame
+
+        return SensorFrame(
+            { k: self.columns[k] for k, _ in _COMPACT_COLUMNS },
+            np.frombuffer(self.reading, dtype = np.float64),
+            self.name_codes, self.names,
+            np.zeros(len(self), dtype = np.int32), (self.hostname,))
+
+# FleetPoller of a worker process, reused between shards
+_worker_poller = None
+
+def _scan_shard(hosts, threads, reading_flags, context_kwargs):
+    """Sweep a shard of hosts in a worker process.
+
+    Returns:
+        list: FleetResult objects with CompactSweep sweeps
+    """
+
+    global _worker_poller
+
+    if _worker_poller is None or _worker_poller.concurrency != threads:
+        # Stop the threads of the old poller before replacing it
+        if _worker_poller is not None:
+            _worker_poller.close()
+        _worker_poller = FleetPoller([], concurrency = threads, reading_flags = reading_flags,
+                                     **context_kwargs)
+
+    _worker_poller.hosts = hosts
+    _worker_poller.reading_flags = reading_flags
+
+    results = []
+    for result in _worker_poller.iter_sweep():
+        if result.ok:
+            # A sweep which can not be converted only fails its own host
+            try:
+                result.sweep = CompactSweep.from_sweep(result.sweep)
+            except Exception as e:
+                result.sweep = None
+                result.error = e
+        results.append(result)
+    return results
+
+class ProcessFleetPoller:
+    """Poll the sensors of many hosts with a pool of processes.
+
+    The hosts are split into shards which are swept by worker
+    processes, each of which polls the hosts of a shard on its own
+    thread pool.  The configs of the hosts are pickled to the workers.
+
+    Attributes:
+        hosts: List of (hostname, config) tuples
+        processes: Number of worker processes
+        threads: Number of threads in each worker process
+        stats: FleetSweepStats for the last completed sweep, or None
+    """
+
+    def __init__(self, hosts, processes = None, threads = 8,
+                 reading_flags = IpmiMonitoringContext.DEFAULT_READING_FLAGS,
+                 shards_per_process = 4, mp_context = None, **context_kwargs):
+        """Initialize a process fleet poller.
+
+        Args:
+            hosts (iterable): (hostname, config) tuples, where config is
+                an IpmiMonitoringConfig or None for the default config
+            processes (int, optional): Number of worker processes,
+                defaults to the number of CPUs
+            threads (int): Number of hosts polled at the same time by
+                each worker process
+            reading_flags (int): Sensor reading flags to use
+            shards_per_process (int): Number of shards per worker
+                process, more shards even out differences between hosts
+            mp_context (optional): multiprocessing context for the pool
+            **context_kwargs: Extra arguments for the IpmiMonitoringContext
+                of each worker thread
+        """
+
+        self.hosts = list(hosts)
+        self.processes = processes or os.cpu_count() or 1
+        self.threads = threads
+        self.reading_flags = reading_flags
+        self.shards_per_process = shards_per_process
+        self.stats = None
+
+        self._context_kwargs = context_kwargs
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers = self.processes, mp_context = mp_context)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Stop the worker processes."""
+
+        self._executor.shutdown(wait = True)
+
+    def _shards(self):
+        """Split the hosts into shards.
+
+        Returns:
+            list: Lists of (hostname, config) tuples
+        """
+
+        count = max(1, min(len(self.hosts), self.processes * self.shards_per_process))
+        return [ self.hosts[i::count] for i in range(count) ]
+
+    def iter_sweep(self):
+        """Sweep all hosts, yielding the results as each shard completes.
+
+        The statistics for the sweep are available in the stats
+        attribute once the generator has been exhausted.
+
+        Yields:
+            FleetResult: Result for each host, with a CompactSweep
+        """
+
+        t0 = time.perf_counter()
+        futures = [ self._executor.submit(_scan_shard, shard, self.threads,
+                                          self.reading_flags, self._context_kwargs)
+                    for shard in self._shards() if shard ]
+
+        results = []
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                for result in future.result():
+                    results.append(result)
+                    yield result
+
+        finally:
+            for future in futures:
+                future.cancel()
+
+        self.stats = FleetSweepStats.from_results(results, time.perf_counter() - t0)
+
+    def sweep(self):
+        """Sweep all hosts.
+
+        Returns:
+            list: FleetResult for each host
+        """
+
+        return list(self.iter_sweep())
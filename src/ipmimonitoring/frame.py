@@ -0,0 +1,275 @@
+"""Columnar sensor sweep results backed by NumPy arrays.
+
+A SensorFrame holds a whole sweep as one array per field instead of
+one IpmiMonitoringSensorData object per sensor, which makes it cheap
+to do threshold checks, aggregation and diffing with vectorised NumPy
+operations, and to concatenate sweeps from many hosts into one frame.
+
+This module requires NumPy, which is an optional dependency.
+"""
+
+import numpy as np
+
+from .wrapper import _READING_TYPE_BOOL, _READING_TYPE_UINT32, _READING_TYPE_DOUBLE
+
+# Integer columns of a SensorFrame
+_INT_COLUMNS = (
+    'record_id',
+    'sensor_number',
+    'sensor_type',
+    'state',
+    'units',
+    'reading_type',
+    'bitmask_type',
+    'bitmask',
+    'event_reading_type_code',
+)
+
+class SensorFrame:
+    """Struct-of-arrays representation of sensor sweeps.
+
+    Sensor and host names are stored as categoricals, an int32 array of
+    codes into a tuple of unique names.
+
+    Attributes:
+        record_id: Record IDs (int32)
+        sensor_number: Sensor numbers (int32)
+        sensor_type: Sensor types (int32, IpmiMonitoringSensorType values)
+        state: Sensor states (int32, IpmiMonitoringState values)
+        units: Sensor units (int32, IpmiMonitoringSensorUnits values)
+        reading_type: Reading types (int32, IpmiMonitoringSensorReadingType values)
+        bitmask_type: Bitmask types (int32, IpmiMonitoringSensorBitmaskType values)
+        bitmask: Sensor bitmasks (int32)
+        event_reading_type_code: Event reading type codes (int32)
+        reading: Sensor readings (float64, NaN if the sensor has no reading)
+        sensor_name_codes: Index into sensor_name_categories (int32)
+        sensor_name_categories: Unique sensor names
+        host_codes: Index into host_categories (int32)
+        host_categories: Unique hostnames
+    """
+
+    __slots__ = _INT_COLUMNS + (
+        'reading',
+        'sensor_name_codes',
+        'sensor_name_categories',
+        'host_codes',
+        'host_categories',
+    )
+
+    def __init__(self, columns, reading, sensor_name_codes, sensor_name_categories,
+                 host_codes, host_categories):
+        """Initialize a sensor frame.
+
+        Args:
+            columns (dict): Integer columns by name
+            reading: Sensor readings
+            sensor_name_codes: Sensor name codes
+            sensor_name_categories (tuple): Unique sensor names
+            host_codes: Host codes
+            host_categories (tuple): Unique hostnames
+        """
+
+        for k in _INT_COLUMNS:
+            setattr(self, k, np.asarray(columns[k], dtype = np.int32))
+        self.reading = np.asarray(reading, dtype = np.float64)
+        self.sensor_name_codes = np.asarray(sensor_name_codes, dtype = np.int32)
+        self.sensor_name_categories = tuple(sensor_name_categories)
+        self.host_codes = np.asarray(host_codes, dtype = np.int32)
+        self.host_categories = tuple(host_categories)
+
+    def __len__(self):
+        return len(self.record_id)
+
+    def __repr__(self):
+        return f"<SensorFrame {len(self)} sensors from {len(self.host_categories)} hosts>"
+
+    @property
+    def sensor_name(self):
+        """Sensor names as an object array."""
+
+        return np.array(self.sensor_name_categories, dtype = object)[self.sensor_name_codes]
+
+    @property
+    def host(self):
+        """Hostnames as an object array."""
+
+        return np.array(self.host_categories, dtype = object)[self.host_codes]
+
+    @classmethod
+    def concatenate(cls, frames):
+        """Concatenate frames, for example from different hosts.
+
+        Args:
+            frames (iterable): SensorFrame objects
+
+        Returns:
+            SensorFrame: Frame with the rows of all frames
+        """
+
+        frames = list(frames)
+
+        def merge(categories, codes):
+            merged = {}
+            remapped = []
+            for c, v in zip(categories, codes):
+                mapping = np.array([ merged.setdefault(name, len(merged)) for name in c ],
+                                   dtype = np.int32)
+                remapped.append(mapping[v] if len(v) else v)
+            return list(merged), (np.concatenate(remapped) if remapped else [])
+
+        sensor_name_categories, sensor_name_codes = merge(
+            [ f.sensor_name_categories for f in frames ],
+            [ f.sensor_name_codes for f in frames ])
+        host_categories, host_codes = merge(
+            [ f.host_categories for f in frames ],
+            [ f.host_codes for f in frames ])
+
+        columns = {}
+        for k in _INT_COLUMNS:
+            columns[k] = np.concatenate([ getattr(f, k) for f in frames ]) if frames else []
+
+        return cls(
+            columns,
+            np.concatenate([ f.reading for f in frames ]) if frames else [],
+            sensor_name_codes, sensor_name_categories,
+            host_codes, host_categories)
+
+def _record_dtype(ffi):
+    """NumPy dtype matching struct pyipmimonitoring_sensor_record.
+
+    Args:
+        ffi: FFI of the API mode extension
+
+    Returns:
+        numpy.dtype: Structured dtype
+    """
+
+    struct = "struct pyipmimonitoring_sensor_record"
+    names = []
+    formats = []
+    offsets = []
+
+    def add(name, fmt, field):
+        names.append(name)
+        formats.append(fmt)
+        offsets.append(ffi.offsetof(struct, field))
+
+    add('record_id', np.int32, 'record_id')
+    add('sensor_number', np.int32, 'sensor_number')
+    add('sensor_type', np.int32, 'sensor_type')
+    add('state', np.int32, 'sensor_state')
+    add('units', np.int32, 'sensor_units')
+    add('reading_type', np.int32, 'sensor_reading_type')
+    add('has_reading', np.int32, 'has_reading')
+    add('bitmask_type', np.int32, 'sensor_bitmask_type')
+    add('bitmask', np.int32, 'sensor_bitmask')
+    add('event_reading_type_code', np.int32, 'event_reading_type_code')
+    add('reading_bool', np.uint8, 'reading')
+    add('reading_uint32', np.uint32, 'reading')
+    add('reading_double', np.float64, 'reading')
+
+    return np.dtype({
+        'names': names,
+        'formats': formats,
+        'offsets': offsets,
+        'itemsize': ffi.sizeof(struct),
+    })
+
+def _read_frame_batched(ctx, ffi, sensor_count):
+    """Extract a sweep with the batched C helper of the API mode extension."""
+
+    records = ctx._get_sensor_records(sensor_count)
+    count = ctx._read_records(ctx.ctx, records, sensor_count)
+
+    dtype = _record_dtype(ffi)
+    view = np.frombuffer(ffi.buffer(records, count * dtype.itemsize), dtype = dtype)
+
+    columns = { k: view[k].copy() for k in _INT_COLUMNS }
+
+    reading_type = view['reading_type']
+    has_reading = view['has_reading'] != 0
+    reading = np.full(count, np.nan)
+    mask = has_reading & (reading_type == _READING_TYPE_DOUBLE)
+    reading[mask] = view['reading_double'][mask]
+    mask = has_reading & (reading_type == _READING_TYPE_UINT32)
+    reading[mask] = view['reading_uint32'][mask]
+    mask = has_reading & (reading_type == _READING_TYPE_BOOL)
+    reading[mask] = view['reading_bool'][mask] != 0
+
+    record_ids = columns['record_id'].tolist()
+    names = [ ctx._decode_sensor_name(record_ids[i], records[i].sensor_name) for i in range(count) ]
+
+    return columns, reading, names
+
+def _read_frame_fields(ctx, ffi, sensor_count):
+    """Extract a sweep with one library call per field."""
+
+    lib = ctx.lib
+    c = ctx.ctx
+
+    columns = { k: np.empty(sensor_count, dtype = np.int32) for k in _INT_COLUMNS }
+    reading = np.full(sensor_count, np.nan)
+    names = []
+
+    record_id = columns['record_id']
+    sensor_number = columns['sensor_number']
+    sensor_type = columns['sensor_type']
+    state = columns['state']
+    units = columns['units']
+    reading_type = columns['reading_type']
+    bitmask_type = columns['bitmask_type']
+    bitmask = columns['bitmask']
+    event_reading_type_code = columns['event_reading_type_code']
+
+    for i in range(sensor_count):
+        rid = lib.ipmi_monitoring_sensor_read_record_id(c)
+        record_id[i] = rid
+        sensor_number[i] = lib.ipmi_monitoring_sensor_read_sensor_number(c)
+        sensor_type[i] = lib.ipmi_monitoring_sensor_read_sensor_type(c)
+        names.append(ctx._decode_sensor_name(rid, lib.ipmi_monitoring_sensor_read_sensor_name(c)))
+        state[i] = lib.ipmi_monitoring_sensor_read_sensor_state(c)
+        units[i] = lib.ipmi_monitoring_sensor_read_sensor_units(c)
+        rt = lib.ipmi_monitoring_sensor_read_sensor_reading_type(c)
+        reading_type[i] = rt
+        bitmask_type[i] = lib.ipmi_monitoring_sensor_read_sensor_bitmask_type(c)
+        bitmask[i] = lib.ipmi_monitoring_sensor_read_sensor_bitmask(c)
+        event_reading_type_code[i] = lib.ipmi_monitoring_sensor_read_event_reading_type_code(c)
+
+        ptr = lib.ipmi_monitoring_sensor_read_sensor_reading(c)
+        if ptr:
+            if rt == _READING_TYPE_DOUBLE:
+                reading[i] = ffi.cast('double*', ptr)[0]
+            elif rt == _READING_TYPE_UINT32:
+                reading[i] = ffi.cast('uint32_t*', ptr)[0]
+            elif rt == _READING_TYPE_BOOL:
+                reading[i] = ffi.cast('uint8_t*', ptr)[0] != 0
+
+        lib.ipmi_monitoring_sensor_iterator_next(c)
+
+    return columns, reading, names
+
+def read_frame(ctx, ffi, sensor_count):
+    """Build a SensorFrame from the sensor iterator of a context.
+
+    Args:
+        ctx (IpmiMonitoringContext): Context positioned at the first sensor
+        ffi: FFI used by the context
+        sensor_count (int): Number of sensors in the iterator
+
+    Returns:
+        SensorFrame: The sweep
+    """
+
+    if ctx._read_records is not None:
+        columns, reading, names = _read_frame_batched(ctx, ffi, sensor_count)
+    else:
+        columns, reading, names = _read_frame_fields(ctx, ffi, sensor_count)
+
+    categories = {}
+    codes = np.fromiter((categories.setdefault(name, len(categories)) for name in names),
+                        dtype = np.int32, count = len(names))
+
+    return SensorFrame(
+        columns, reading,
+        codes, list(categories),
+        np.zeros(len(names), dtype = np.int32), (ctx.hostname,))
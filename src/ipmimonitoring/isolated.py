@@ -0,0 +1,285 @@
+"""Reads with a hard deadline in a supervised worker process.
+
+A call into libipmimonitoring can not be interrupted from Python, and
+misbehaving BMC firmware can make a read block long after the session
+timeout.  IsolatedContext runs the reads in a worker process instead.
+If a read has not finished when the deadline passes the worker is
+killed, IpmiMonitoringDeadlineError is raised and a new worker is
+started for the next read:
+
+    ctx = IsolatedContext(hostname = 'bmc1', config = config, deadline = 10)
+    try:
+        sweep = ctx.read_sensors()
+    except IpmiMonitoringDeadlineError:
+        ...
+
+Reads always return the complete result, sensor reads as an
+IpmiMonitoringSweep, since a lazy generator can not be passed between
+processes.
+
+Workers are started with the forkserver start method by default, so
+that they are not forked from a process where other threads may be
+inside libipmimonitoring holding locks.  The context arguments are
+then pickled to the worker.
+"""
+
+import time
+import multiprocessing
+
+from .wrapper import (IpmiMonitoringContext, IpmiMonitoringConfig, IpmiMonitoringSweep,
+                      IpmiMonitoringConnectionError)
+
+# Start method for worker processes when no mp_context is given
+DEFAULT_START_METHOD = 'forkserver'
+
+def _default_mp_context():
+    """Return the multiprocessing context for worker processes."""
+
+    if DEFAULT_START_METHOD in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context(DEFAULT_START_METHOD)
+    return multiprocessing.get_context('spawn')
+
+class IpmiMonitoringDeadlineError(IpmiMonitoringConnectionError):
+    """A read did not finish before its deadline and was killed.
+
+    This is a subclass of IpmiMonitoringConnectionError so that circuit
+    breakers treat it like a timeout reported by the library.
+    """
+
+    pass
+
+def _worker_main(conn, context_kwargs):
+    """Main loop of a worker process.
+
+    Args:
+        conn: Connection to the parent process
+        context_kwargs (dict): Arguments for the IpmiMonitoringContext
+    """
+
+    # Imported here to avoid a circular import, fleet imports this module
+    from .fleet import CompactSweep
+
+    ctx = IpmiMonitoringContext(**context_kwargs)
+    default_config = ctx.config
+
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+
+        hostname, config, method, args, kwargs = request
+        try:
+            ctx.hostname = hostname
+            ctx.config = config or default_config
+            result = getattr(ctx, method)(*args, **kwargs)
+            if isinstance(result, IpmiMonitoringSweep):
+                response = ('sweep', CompactSweep.from_sweep(result))
+            else:
+                response = ('value', result)
+
+        except Exception as e:
+            response = ('error', e)
+
+        conn.send(response)
+
+class IsolatedContext:
+    """Context which reads in a worker process with a deadline.
+
+    The hostname and config attributes can be changed between reads,
+    the worker process is reused for all of them.
+
+    Attributes:
+        hostname: Hostname for out-of-band communication
+        config: IpmiMonitoringConfig, sent to the worker for every read
+        deadline: Default deadline for a read in seconds
+        recycled: Number of workers killed because of a deadline
+    """
+
+    def __init__(self, hostname = None, username = None, password = None, config = None,
+                 deadline = 30.0, mp_context = None, **context_kwargs):
+        """Initialize an isolated context.
+
+        Args:
+            hostname (str, optional): Hostname for out-of-band communication
+            username (str, optional): Username for out-of-band communication
+            password (str, optional): Password for out-of-band communication
+            config (IpmiMonitoringConfig, optional): IPMI configuration settings
+            deadline (float): Default deadline for a read in seconds
+            mp_context (optional): multiprocessing context for the
+                worker, defaults to the forkserver start method, or
+                spawn where that is not available
+            **context_kwargs: Other arguments for the IpmiMonitoringContext
+                in the worker, for example sdr_cache_directory.  They
+                must be picklable.
+        """
+
+        self.hostname = hostname
+        self.config = config or IpmiMonitoringConfig()
+        self.deadline = deadline
+        self.recycled = 0
+
+        if username is not None:
+            self.config.username = username
+        if password is not None:
+            self.config.password = password
+
+        self._mp = mp_context or _default_mp_context()
+        self._context_kwargs = context_kwargs
+        self._process = None
+        self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        self._kill()
+
+    def _start(self):
+        """Start a worker process if there is none."""
+
+        if self._process is None:
+            parent, child = self._mp.Pipe()
+            process = self._mp.Process(target = _worker_main, args = (child, self._context_kwargs),
+                                       daemon = True)
+            process.start()
+            child.close()
+            self._process = process
+            self._conn = parent
+
+    def _kill(self):
+        """Kill the worker process, if any."""
+
+        process = getattr(self, '_process', None)
+        if process is not None:
+            self._conn.close()
+            process.kill()
+            process.join()
+            self._process = None
+            self._conn = None
+
+    def close(self):
+        """Stop the worker process."""
+
+        if self._process is not None:
+            try:
+                self._conn.send(None)
+                self._process.join(1.0)
+            except OSError:
+                pass
+            self._kill()
+
+    def _request(self, method, args, kwargs, deadline):
+        """Run a read in the worker process.
+
+        Args:
+            method (str): Name of the IpmiMonitoringContext method
+            args (tuple): Positional arguments for the method
+            kwargs (dict): Keyword arguments for the method
+            deadline (float, optional): Deadline in seconds, None for
+                the default deadline
+
+        Returns:
+            The result of the method
+        """
+
+        if deadline is None:
+            deadline = self.deadline
+
+        # Starting a worker does not count against the deadline
+        self._start()
+        t0 = time.monotonic()
+        try:
+            self._conn.send((self.hostname, self.config, method, args, kwargs))
+            remaining = deadline - (time.monotonic() - t0)
+            ready = remaining > 0 and self._conn.poll(remaining)
+            response = self._conn.recv() if ready else None
+
+        except (OSError, EOFError):
+            # The worker died
+            response = ('error', None)
+
+        if response is None:
+            self._kill()
+            self.recycled += 1
+            raise IpmiMonitoringDeadlineError(
+                f"Read of {self.hostname} did not finish within {deadline} seconds")
+
+        kind, value = response
+        if kind == 'sweep':
+            return IpmiMonitoringSweep(value.hostname, value.records(), value.timestamp)
+        if kind == 'error':
+            if value is None:
+                self._kill()
+                raise IpmiMonitoringConnectionError(f"Worker process for {self.hostname} died")
+            raise value
+        return value
+
+    def read_sensors(self, reading_flags = IpmiMonitoringContext.DEFAULT_READING_FLAGS,
+                     snapshot = True, deadline = None):
+        """Read sensor data.
+
+        Args:
+            reading_flags (int): Sensor reading flags to use
+            snapshot (bool): Ignored, the result is always a snapshot
+            deadline (float, optional): Deadline in seconds
+
+        Returns:
+            IpmiMonitoringSweep: The sensor records
+        """
+
+        return self._request('read_sensors', (reading_flags,), { 'snapshot': True }, deadline)
+
+    def read_sensors_by_record_id(self, record_ids,
+                                  reading_flags = IpmiMonitoringContext.DEFAULT_READING_FLAGS,
+                                  snapshot = True, deadline = None):
+        """Read sensor data.  Only return matching record IDs.
+
+        Args:
+            record_ids (list): List of record IDs to match
+            reading_flags (int): Sensor reading flags to use
+            snapshot (bool): Ignored, the result is always a snapshot
+            deadline (float, optional): Deadline in seconds
+
+        Returns:
+            IpmiMonitoringSweep: The sensor records
+        """
+
+        return self._request('read_sensors_by_record_id', (list(record_ids), reading_flags),
+                             { 'snapshot': True }, deadline)
+
+    def read_sensors_by_sensor_type(self, sensor_types,
+                                    reading_flags = IpmiMonitoringContext.DEFAULT_READING_FLAGS,
+                                    snapshot = True, deadline = None):
+        """Read sensor data.  Only return matching sensor types.
+
+        Args:
+            sensor_types (list): List of sensor types to match
+            reading_flags (int): Sensor reading flags to use
+            snapshot (bool): Ignored, the result is always a snapshot
+            deadline (float, optional): Deadline in seconds
+
+        Returns:
+            IpmiMonitoringSweep: The sensor records
+        """
+
+        return self._request('read_sensors_by_sensor_type', (list(sensor_types), reading_flags),
+                             { 'snapshot': True }, deadline)
+
+    def read_sel(self, sel_flags = IpmiMonitoringContext.DEFAULT_SEL_FLAGS, deadline = None):
+        """Read all System Event Log records.
+
+        Args:
+            sel_flags (int): SEL flags to use
+            deadline (float, optional): Deadline in seconds
+
+        Returns:
+            list: IpmiMonitoringSelData records
+        """
+
+        return self._request('read_sel', (sel_flags,), {}, deadline)
@@ -4,6 +4,8 @@ Python version of enums from ipmi_monitoring_offsets.h
 
 from enum import Enum
 
+from ._enum_helper import EnumTable
+
 class IpmiMonitoringEventOffsetType(Enum):
     """IPMI Monitoring Event Offset Type"""
     THRESHOLD = 0x00
@@ -452,3 +454,6 @@ class IpmiMonitoringEventOffsetFruState(Enum):
     FRU_DEACTIVATION_REQUESTED = 0x05
     FRU_DEACTIVATION_IN_PROGRESS = 0x06
     FRU_COMMUNICATION_LOST = 0x07
+
+# Lookup table for decoding values returned by libipmimonitoring
+IPMI_MONITORING_EVENT_OFFSET_TYPE_TABLE = EnumTable(IpmiMonitoringEventOffsetType)
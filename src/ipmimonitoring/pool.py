@@ -0,0 +1,293 @@
+"""Pool of reusable contexts.
+
+Creating an IpmiMonitoringContext means creating a library context and
+allocating a config, and a context also caches sensor names and
+bitmask strings between sweeps.  A ContextPool keeps contexts around
+so that code which reads the same hosts over and over again, such as
+request handlers, can reuse them:
+
+    pool = ContextPool(max_contexts = 64)
+
+    with pool.lease('bmc1', config) as ctx:
+        sweep = ctx.read_sensors(snapshot = True)
+
+Contexts are keyed by hostname and a fingerprint of the config, and
+each context gets its own copy of the config, so changing a config
+after it has been passed to the pool does not affect the contexts
+already created with it.  Each context is lent to one user at a time since a context can only
+run one read at a time.  When the pool is full the least recently used
+idle context is destroyed to make room.  The pool also keeps health
+statistics for each host based on how the leases ended.
+"""
+
+import time
+import threading
+import contextlib
+import collections
+from dataclasses import dataclass
+
+from .wrapper import IpmiMonitoringContext, IpmiMonitoringConfig, IpmiMonitoringError
+
+@dataclass
+class HostHealth:
+    """Health statistics for a host.
+
+    Attributes:
+        hostname: Hostname of the host
+        leases: Number of completed leases
+        failures: Number of leases which ended with an exception
+        consecutive_failures: Number of failures since the last success
+        last_error: Last exception, or None
+        last_success: time.time() of the last success, or None
+        last_failure: time.time() of the last failure, or None
+        total_time: Total time contexts for the host have been lent out
+    """
+
+    __slots__ = ('hostname', 'leases', 'failures', 'consecutive_failures', 'last_error',
+                 'last_success', 'last_failure', 'total_time')
+
+    hostname : str
+    leases : int
+    failures : int
+    consecutive_failures : int
+    last_error : object
+    last_success : object
+    last_failure : object
+    total_time : float
+
+    @property
+    def mean_time(self):
+        """Mean time per lease."""
+
+        return self.total_time / self.leases if self.leases else 0.0
+
+@dataclass
+class ContextPoolStats:
+    """Statistics for a context pool.
+
+    Attributes:
+        created: Number of contexts created
+        reused: Number of leases which reused an idle context
+        evicted: Number of idle contexts destroyed to make room
+        waits: Number of leases which had to wait for a context
+    """
+
+    __slots__ = ('created', 'reused', 'evicted', 'waits')
+
+    created : int
+    reused : int
+    evicted : int
+    waits : int
+
+class ContextPool:
+    """Pool of IpmiMonitoringContext objects keyed by host and config.
+
+    Attributes:
+        max_contexts: Maximum number of contexts, idle and lent out
+        stats: ContextPoolStats for the pool
+    """
+
+    def __init__(self, max_contexts = 64, **context_kwargs):
+        """Initialize a context pool.
+
+        Args:
+            max_contexts (int): Maximum number of contexts
+            **context_kwargs: Extra arguments for each IpmiMonitoringContext,
+                for example sdr_cache_directory
+        """
+
+        self.max_contexts = max_contexts
+        self.stats = ContextPoolStats(created = 0, reused = 0, evicted = 0, waits = 0)
+
+        self._context_kwargs = context_kwargs
+        self._default_config = IpmiMonitoringConfig()
+        self._cond = threading.Condition()
+
+        # Idle contexts in least recently used order, by id of the
+        # context, and the same contexts by key
+        self._idle = collections.OrderedDict()
+        self._idle_by_key = {}
+        # Lent out contexts by id of the context, with key and start time
+        self._lent = {}
+        self._health = {}
+
+    def __len__(self):
+        with self._cond:
+            return len(self._idle) + len(self._lent)
+
+    def _key(self, hostname, config):
+        return (hostname, config.fingerprint())
+
+    def _take_idle(self, key):
+        """Remove and return the most recently used idle context for key."""
+
+        contexts = self._idle_by_key.get(key)
+        if not contexts:
+            return None
+
+        i, ctx = contexts.popitem()
+        if not contexts:
+            del self._idle_by_key[key]
+        del self._idle[i]
+        return ctx
+
+    def _add_idle(self, key, ctx):
+        """Add an idle context as the most recently used one."""
+
+        self._idle[id(ctx)] = (key, ctx)
+        contexts = self._idle_by_key.get(key)
+        if contexts is None:
+            contexts = self._idle_by_key[key] = collections.OrderedDict()
+        contexts[id(ctx)] = ctx
+
+    def _evict_idle(self):
+        """Destroy the least recently used idle context."""
+
+        i, (key, ctx) = self._idle.popitem(last = False)
+        contexts = self._idle_by_key[key]
+        del contexts[i]
+        if not contexts:
+            del self._idle_by_key[key]
+
+    def acquire(self, hostname = None, config = None, timeout = None):
+        """Borrow a context for a host.
+
+        The context must be given back with release().
+
+        Args:
+            hostname (str, optional): Hostname for out-of-band communication
+            config (IpmiMonitoringConfig, optional): IPMI configuration settings
+            timeout (float, optional): Maximum time to wait if all
+                contexts are lent out, None to wait forever
+
+        Returns:
+            IpmiMonitoringContext: Context for the host
+        """
+
+        config = config or self._default_config
+        key = self._key(hostname, config)
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._cond:
+            waited = False
+            while True:
+                ctx = self._take_idle(key)
+                if ctx is not None:
+                    self.stats.reused += 1
+                    break
+
+                if len(self._idle) + len(self._lent) >= self.max_contexts and self._idle:
+                    # Make room by dropping the least recently used idle context
+                    self._evict_idle()
+                    self.stats.evicted += 1
+
+                if len(self._idle) + len(self._lent) < self.max_contexts:
+                    ctx = IpmiMonitoringContext(hostname = hostname,
+                                                config = IpmiMonitoringConfig(**config.to_dict()),
+                                                **self._context_kwargs)
+                    self.stats.created += 1
+                    break
+
+                if not waited:
+                    self.stats.waits += 1
+                    waited = True
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise IpmiMonitoringError(f"Timed out waiting for a context for {hostname}")
+                self._cond.wait(remaining)
+
+            self._lent[id(ctx)] = (key, time.monotonic())
+
+        return ctx
+
+    def release(self, ctx, error = None):
+        """Give back a context borrowed with acquire().
+
+        Giving back a context which is not lent out by the pool raises
+        ValueError.
+
+        Args:
+            ctx (IpmiMonitoringContext): The context
+            error (Exception, optional): Exception if the lease failed,
+                used for the health statistics
+        """
+
+        with self._cond:
+            lent = self._lent.pop(id(ctx), None)
+            if lent is None:
+                raise ValueError("context is not lent out by this pool")
+            key, t0 = lent
+            self._add_idle(key, ctx)
+            self._record(ctx.hostname, error, time.monotonic() - t0)
+            self._cond.notify()
+
+    def _record(self, hostname, error, elapsed):
+        """Update the health statistics of a host."""
+
+        health = self._health.get(hostname)
+        if health is None:
+            health = self._health[hostname] = HostHealth(
+                hostname = hostname, leases = 0, failures = 0, consecutive_failures = 0,
+                last_error = None, last_success = None, last_failure = None, total_time = 0.0)
+
+        health.leases += 1
+        health.total_time += elapsed
+        if error is None:
+            health.consecutive_failures = 0
+            health.last_success = time.time()
+        else:
+            health.failures += 1
+            health.consecutive_failures += 1
+            health.last_error = error
+            health.last_failure = time.time()
+
+    @contextlib.contextmanager
+    def lease(self, hostname = None, config = None, timeout = None):
+        """Borrow a context for the duration of a with statement.
+
+        An exception raised in the with statement is counted as a
+        failure of the host.
+
+        Args:
+            hostname (str, optional): Hostname for out-of-band communication
+            config (IpmiMonitoringConfig, optional): IPMI configuration settings
+            timeout (float, optional): Maximum time to wait for a context
+
+        Yields:
+            IpmiMonitoringContext: Context for the host
+        """
+
+        ctx = self.acquire(hostname, config, timeout)
+        try:
+            yield ctx
+
+        except Exception as e:
+            self.release(ctx, e)
+            raise
+
+        else:
+            self.release(ctx)
+
+    def health(self, hostname):
+        """Return the health statistics of a host.
+
+        Args:
+            hostname (str): Hostname of the host
+
+        Returns:
+            HostHealth: Copy of the statistics, or None if the host has
+                not been used
+        """
+
+        with self._cond:
+            health = self._health.get(hostname)
+            if health is None:
+                return None
+            return HostHealth(**{ k: getattr(health, k) for k in HostHealth.__slots__ })
+
+    def clear(self):
+        """Destroy all idle contexts."""
+
+        with self._cond:
+            self._idle.clear()
+            self._idle_by_key.clear()
@@ -0,0 +1,246 @@
+"""Periodic scheduling on absolute deadlines.
+
+Sleeping for a fixed time after each sweep makes the real period the
+sweep time plus the delay, so the samples drift and the spacing grows
+when the BMC is slow.  Scheduler runs on absolute deadlines instead,
+a multiple of the period after the start, or optionally aligned to
+multiples of the period in wall clock time:
+
+    scheduler = Scheduler(10, align = True)
+    for tick in scheduler.ticks():
+        sweep = ctx.read_sensors(snapshot = True)
+
+If a sweep overruns so that the next tick can not start within
+max_lag of its deadline, the ticks which have been missed are skipped
+instead of being run back to back.
+
+Schedules which are not aligned run on time.monotonic(), so they are
+not affected when the wall clock is set.  Aligned schedules need the
+wall clock, and start over from the current time if it is set back.
+A period of zero runs the ticks back to back without sleeping.
+
+When many hosts are polled on the same schedule, jitter_offset() gives
+each host a fixed offset within the period, so that the hosts do not
+all start at the same moment.
+"""
+
+import math
+import time
+import zlib
+from dataclasses import dataclass
+
+def jitter_offset(key, spread):
+    """Return a deterministic offset for a key.
+
+    The offset is the same every time for the same key, also between
+    processes, and the offsets of different keys are spread evenly.
+
+    Args:
+        key (str): Key, for example a hostname
+        spread (float): Offsets are in the range [0, spread)
+
+    Returns:
+        float: Offset
+    """
+
+    if not spread:
+        return 0.0
+    return zlib.crc32(str(key).encode('utf-8')) / 2**32 * spread
+
+@dataclass
+class Tick:
+    """A scheduled tick.
+
+    Attributes:
+        index: Number of the tick, counting skipped ticks
+        deadline: Time the tick was scheduled for
+        start: Time the tick actually started
+        skipped: Number of ticks skipped just before this one
+    """
+
+    __slots__ = ('index', 'deadline', 'start', 'skipped')
+
+    index : int
+    deadline : float
+    start : float
+    skipped : int
+
+    @property
+    def lag(self):
+        """How late the tick started."""
+
+        return self.start - self.deadline
+
+@dataclass
+class SchedulerStats:
+    """Lag statistics for a scheduler.
+
+    Attributes:
+        ticks: Number of ticks run
+        skipped: Number of ticks skipped because of overruns
+        last_lag: Lag of the last tick
+        min_lag: Smallest lag
+        mean_lag: Mean lag
+        max_lag: Largest lag
+    """
+
+    __slots__ = ('ticks', 'skipped', 'last_lag', 'min_lag', 'mean_lag', 'max_lag')
+
+    ticks : int
+    skipped : int
+    last_lag : float
+    min_lag : float
+    mean_lag : float
+    max_lag : float
+
+class Scheduler:
+    """Run ticks on absolute deadlines.
+
+    Attributes:
+        period: Time between ticks in seconds
+        align: Align the deadlines to multiples of the period
+        offset: Offset added to every deadline
+        max_lag: A tick which is later than this is skipped
+    """
+
+    def __init__(self, period, align = False, offset = 0.0, max_lag = None,
+                 clock = None, sleep = time.sleep):
+        """Initialize a scheduler.
+
+        Args:
+            period (float): Time between ticks in seconds, 0 to run
+                the ticks without sleeping
+            align (bool): Align the deadlines to multiples of the
+                period since the epoch, otherwise the first tick is
+                run immediately
+            offset (float): Offset added to every deadline, for example
+                from jitter_offset()
+            max_lag (float, optional): Ticks which would start later
+                than this after their deadline are skipped, defaults to
+                a quarter of the period
+            clock (callable, optional): Function returning the current
+                time, defaults to time.time if align is true and
+                time.monotonic otherwise
+            sleep (callable): Function sleeping for a number of seconds
+        """
+
+        if period < 0:
+            raise ValueError("period must not be negative")
+        if align and not period:
+            raise ValueError("an aligned schedule needs a period greater than 0")
+
+        self.period = period
+        self.align = align
+        self.offset = offset
+        self.max_lag = period / 4 if max_lag is None else max_lag
+
+        if clock is None:
+            clock = time.time if align else time.monotonic
+
+        self._clock = clock
+        self._sleep = sleep
+        self._index = None
+        self._base = None
+
+        self._ticks = 0
+        self._skipped = 0
+        self._last_lag = 0.0
+        self._min_lag = math.inf
+        self._max_lag = 0.0
+        self._total_lag = 0.0
+
+    @property
+    def stats(self):
+        """SchedulerStats for the ticks run so far."""
+
+        return SchedulerStats(
+            ticks = self._ticks,
+            skipped = self._skipped,
+            last_lag = self._last_lag,
+            min_lag = self._min_lag if self._ticks else 0.0,
+            mean_lag = self._total_lag / self._ticks if self._ticks else 0.0,
+            max_lag = self._max_lag)
+
+    def _deadline(self, index):
+        return self._base + index * self.period
+
+    def _start(self, now):
+        """Set the deadline of the first tick."""
+
+        if self.align:
+            self._base = (math.floor((now - self.offset) / self.period) * self.period +
+                          self.offset)
+            self._index = 0 if now - self._base <= self.max_lag else 1
+        else:
+            self._base = now + self.offset
+            self._index = 0
+
+    def wait(self):
+        """Wait for the next tick.
+
+        Returns:
+            Tick: The tick
+        """
+
+        now = self._clock()
+
+        # Without a period every tick is due when it is waited for
+        if not self.period:
+            self._index = 0 if self._index is None else self._index + 1
+            return self._record(Tick(index = self._index, deadline = now, start = now,
+                                     skipped = 0))
+
+        if self._index is None:
+            self._start(now)
+
+        else:
+            self._index += 1
+
+            # The wall clock has been set back, so the next deadline is
+            # more than a period away.  Start over from the current time.
+            if self._deadline(self._index) - now > self.period:
+                self._start(now)
+
+        # Skip the ticks which can not be started in time
+        skipped = 0
+        if now - self._deadline(self._index) > self.max_lag:
+            late = math.ceil((now - self.max_lag - self._base) / self.period)
+            skipped = late - self._index
+            self._index = late
+
+        deadline = self._deadline(self._index)
+        delay = deadline - now
+        if delay > 0:
+            self._sleep(delay)
+            now = self._clock()
+
+        return self._record(Tick(index = self._index, deadline = deadline, start = now,
+                                 skipped = skipped))
+
+    def _record(self, tick):
+        """Add a tick to the statistics and return it."""
+
+        lag = tick.lag
+        self._ticks += 1
+        self._skipped += tick.skipped
+        self._last_lag = lag
+        self._min_lag = min(self._min_lag, lag)
+        self._max_lag = max(self._max_lag, lag)
+        self._total_lag += lag
+
+        return tick
+
+    def ticks(self, count = None):
+        """Generate ticks.
+
+        Args:
+            count (int, optional): Number of ticks, None for no limit
+
+        Yields:
+            Tick: Each tick, after waiting for its deadline
+        """
+
+        n = 0
+        while count is None or n < count:
+            yield self.wait()
+            n += 1
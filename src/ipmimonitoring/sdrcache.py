@@ -0,0 +1,517 @@
+"""SDR cache files.
+
+libipmimonitoring keeps a copy of the SDR repository of each host in a
+file in the SDR cache directory, named by the SDR cache filename
+format.  The format can contain %L for the short local hostname, %H
+for the remote hostname ("localhost" for in-band communication) and %%
+for a percent sign.
+
+The SDR holds the static description of every sensor, its name, type,
+units, entity and for threshold sensors the threshold values, none of
+which libipmimonitoring returns.  SdrCache reads it straight from an
+SDR cache file, without a session with the BMC:
+
+    with SdrCache.open_host('bmc1', sdr_cache_directory = '/var/cache/sdr') as cache:
+        sensor = cache.by_name('CPU0_TEMP')[0]
+        print(sensor.thresholds['upper_critical'])
+
+The file is memory mapped and only the record headers are scanned when
+it is opened.  A sensor record is decoded the first time it is looked
+up.
+"""
+
+import os
+import math
+import mmap
+import socket
+import struct
+from dataclasses import dataclass
+
+from .enums import *
+from .wrapper import IpmiMonitoringError
+
+# Defaults used by libipmimonitoring when none are set on the context
+DEFAULT_SDR_CACHE_DIRECTORY = '/var/cache/ipmimonitoringsdrcache'
+DEFAULT_SDR_CACHE_FILENAMES = 'sdr-cache-%L.%H'
+
+def sdr_cache_path(hostname = None, sdr_cache_directory = None, sdr_cache_filenames = None):
+    """Return the path of the SDR cache file of a host.
+
+    Args:
+        hostname (str, optional): Remote hostname, None for in-band
+        sdr_cache_directory (str, optional): SDR cache directory
+        sdr_cache_filenames (str, optional): SDR cache filename format
+
+    Returns:
+        str: Path to the SDR cache file
+    """
+
+    fmt = sdr_cache_filenames or DEFAULT_SDR_CACHE_FILENAMES
+    local = socket.gethostname().split('.')[0] or 'localhost'
+
+    expansions = { 'L': local, 'H': hostname or 'localhost', '%': '%' }
+
+    name = []
+    i = 0
+    while i < len(fmt):
+        if fmt[i] == '%' and fmt[i + 1:i + 2] in expansions:
+            name.append(expansions[fmt[i + 1]])
+            i += 2
+        else:
+            name.append(fmt[i])
+            i += 1
+
+    return os.path.join(sdr_cache_directory or DEFAULT_SDR_CACHE_DIRECTORY, ''.join(name))
+
+class IpmiMonitoringSdrCacheError(IpmiMonitoringError):
+    """An SDR cache file could not be parsed."""
+
+    pass
+
+# The file starts with a magic number, the file version, the SDR
+# version, the record count, the free space and the most recent
+# addition and erase timestamps, followed by the SDR records
+_SDR_CACHE_MAGIC = b'\x7a\xb8\x2e\x90'
+_SDR_CACHE_HEADER = struct.Struct('<4sIBHHII')
+
+# Each SDR record starts with the record ID, SDR version, record type
+# and the length of the rest of the record
+_SDR_RECORD_HEADER = struct.Struct('<HBBB')
+_SDR_RECORD_HEADER_LEN = _SDR_RECORD_HEADER.size
+
+SDR_FULL_SENSOR_RECORD = 0x01
+SDR_COMPACT_SENSOR_RECORD = 0x02
+
+# Offset of the ID string type/length byte in each record type
+_ID_STRING_OFFSET = {
+    SDR_FULL_SENSOR_RECORD: 47,
+    SDR_COMPACT_SENSOR_RECORD: 31,
+}
+
+# Thresholds in the order of the bits of the threshold masks and of
+# the threshold bytes in a full sensor record, which start at byte 36
+# with the upper non-recoverable threshold
+THRESHOLD_NAMES = (
+    'lower_non_critical',
+    'lower_critical',
+    'lower_non_recoverable',
+    'upper_non_critical',
+    'upper_critical',
+    'upper_non_recoverable',
+)
+_THRESHOLD_OFFSETS = (41, 40, 39, 38, 37, 36)
+
+# IPMI sensor unit codes which have an IpmiMonitoringSensorUnits member
+_UNITS = {
+    0: IpmiMonitoringSensorUnits.NONE,
+    1: IpmiMonitoringSensorUnits.CELSIUS,
+    2: IpmiMonitoringSensorUnits.FAHRENHEIT,
+    4: IpmiMonitoringSensorUnits.VOLTS,
+    5: IpmiMonitoringSensorUnits.AMPS,
+    6: IpmiMonitoringSensorUnits.WATTS,
+    18: IpmiMonitoringSensorUnits.RPM,
+}
+
+# Linearization functions of a full sensor record
+_LINEARIZATION = (
+    lambda x: x,
+    math.log,
+    math.log10,
+    math.log2,
+    math.exp,
+    lambda x: 10 ** x,
+    lambda x: 2 ** x,
+    lambda x: 1 / x,
+    lambda x: x * x,
+    lambda x: x * x * x,
+    math.sqrt,
+    lambda x: math.copysign(abs(x) ** (1 / 3), x),
+)
+
+_BCD_PLUS = '0123456789 -.:,_'
+_SIX_BIT_ASCII = (' !"#$%&\'()*+,-./0123456789:;<=>?'
+                  '@ABCDEFGHIJKLMNOPQRSTUVWXYZ[\\]^_')
+
+def _scale(value, exp):
+    """Multiply by a power of ten, dividing for negative exponents so
+    that for example 132 * 10**-1 gives 13.2 and not 13.200000000000001.
+    """
+
+    return value * 10 ** exp if exp >= 0 else value / 10 ** -exp
+
+def _signed(value, bits):
+    """Interpret the low bits of an integer as two's complement."""
+
+    sign = 1 << (bits - 1)
+    return (value & (sign - 1)) - (value & sign)
+
+def _decode_id_string(type_length, data):
+    """Decode the ID string of an SDR record.
+
+    Args:
+        type_length (int): The ID string type/length byte
+        data (bytes): The bytes following it
+
+    Returns:
+        str: The ID string
+    """
+
+    string_type = type_length >> 6
+    length = type_length & 0x1f
+
+    if string_type == 1:
+        # BCD plus, two characters per byte
+        chars = []
+        for b in data[:length]:
+            chars.append(_BCD_PLUS[b >> 4])
+            chars.append(_BCD_PLUS[b & 0x0f])
+        return ''.join(chars).rstrip()
+
+    if string_type == 2:
+        # 6-bit packed ASCII, four characters in three bytes
+        bits = int.from_bytes(data[:length], 'little')
+        count = length * 8 // 6
+        return ''.join(_SIX_BIT_ASCII[(bits >> (6 * i)) & 0x3f] for i in range(count)).rstrip()
+
+    # 8-bit ASCII + Latin 1, and Unicode which is not really used
+    return bytes(data[:length]).split(b'\0', 1)[0].decode('latin-1')
+
+@dataclass
+class SdrSensor:
+    """A sensor described by a full or compact sensor record.
+
+    Attributes:
+        record_id: Record ID, the same as in IpmiMonitoringSensorData
+        record_type: SDR_FULL_SENSOR_RECORD or SDR_COMPACT_SENSOR_RECORD
+        sensor_owner_id: Slave address or software ID of the sensor owner
+        sensor_owner_lun: LUN of the sensor owner
+        sensor_number: Sensor number
+        sensor_name: ID string of the record
+        sensor_type: IpmiMonitoringSensorType
+        event_reading_type_code: Event reading type code
+        entity_id: Entity ID, for example 0x03 for a processor
+        entity_instance: Entity instance
+        sensor_units: IpmiMonitoringSensorUnits
+        base_unit: IPMI base unit code, for units not in
+            IpmiMonitoringSensorUnits
+        thresholds: Readable thresholds by name, see THRESHOLD_NAMES,
+            converted to the sensor units.  Empty for compact records.
+        positive_hysteresis: Positive going hysteresis in the sensor
+            units, or None
+        negative_hysteresis: Negative going hysteresis in the sensor
+            units, or None
+        nominal_reading: Nominal reading in the sensor units, or None
+    """
+
+    __slots__ = ('record_id', 'record_type', 'sensor_owner_id', 'sensor_owner_lun',
+                 'sensor_number', 'sensor_name', 'sensor_type', 'event_reading_type_code',
+                 'entity_id', 'entity_instance', 'sensor_units', 'base_unit', 'thresholds',
+                 'positive_hysteresis', 'negative_hysteresis', 'nominal_reading')
+
+    record_id : int
+    record_type : int
+    sensor_owner_id : int
+    sensor_owner_lun : int
+    sensor_number : int
+    sensor_name : str
+    sensor_type : IpmiMonitoringSensorType
+    event_reading_type_code : int
+    entity_id : int
+    entity_instance : int
+    sensor_units : IpmiMonitoringSensorUnits
+    base_unit : int
+    thresholds : dict
+    positive_hysteresis : object
+    negative_hysteresis : object
+    nominal_reading : object
+
+class _Conversion:
+    """Conversion of raw values of a full sensor record."""
+
+    __slots__ = ('analog_format', 'linearization', 'm', 'b', 'r_exp', 'b_exp')
+
+    def __init__(self, r):
+        self.analog_format = r[20] >> 6
+        self.linearization = r[23] & 0x7f
+        self.m = _signed(r[24] | (r[25] & 0xc0) << 2, 10)
+        self.b = _signed(r[26] | (r[27] & 0xc0) << 2, 10)
+        self.r_exp = _signed(r[29] >> 4, 4)
+        self.b_exp = _signed(r[29] & 0x0f, 4)
+
+    def value(self, raw):
+        """Convert a raw reading or threshold, None if it can not be."""
+
+        if self.analog_format == 1:
+            raw = raw - 0xff if raw & 0x80 else raw
+        elif self.analog_format == 2:
+            raw = _signed(raw, 8)
+        elif self.analog_format == 3:
+            return None
+
+        y = _scale(self.m * raw + _scale(self.b, self.b_exp), self.r_exp)
+        if self.linearization >= len(_LINEARIZATION):
+            # Non-linear sensors need a reading factors command to the BMC
+            return None
+        try:
+            return float(_LINEARIZATION[self.linearization](y))
+        except (ValueError, ZeroDivisionError, OverflowError):
+            return None
+
+    def hysteresis(self, raw):
+        """Convert a raw hysteresis, which is unsigned and has no offset."""
+
+        if self.analog_format == 3 or self.linearization:
+            return None
+        return float(_scale(abs(self.m) * raw, self.r_exp))
+
+class SdrCache:
+    """Memory mapped SDR cache file.
+
+    Iterating over an SdrCache yields the SdrSensor of every full and
+    compact sensor record, in file order.  Other record types are
+    skipped.
+
+    Attributes:
+        path: Path to the file
+        file_version: Version of the SDR cache file format
+        sdr_version: SDR version of the BMC
+        record_count: Number of records according to the header
+        free_space: Free space in the SDR repository of the BMC
+        most_recent_addition: Timestamp of the last addition to the SDR
+        most_recent_erase: Timestamp of the last erase of the SDR
+    """
+
+    def __init__(self, path, data):
+        """Initialize from the contents of an SDR cache file, see open().
+
+        Args:
+            path (str): Path to the file
+            data (bytes or mmap): Contents of the file
+        """
+
+        self.path = path
+        self._data = data
+
+        if len(data) < _SDR_CACHE_HEADER.size:
+            raise IpmiMonitoringSdrCacheError(f"{path}: too short for an SDR cache file")
+
+        (magic, self.file_version, self.sdr_version, self.record_count, self.free_space,
+         self.most_recent_addition, self.most_recent_erase) = _SDR_CACHE_HEADER.unpack_from(data)
+        if magic != _SDR_CACHE_MAGIC:
+            raise IpmiMonitoringSdrCacheError(f"{path}: not an SDR cache file")
+
+        # Offsets of the sensor records by record ID, and by name once
+        # a name has been looked up
+        self._offsets = {}
+        self._names = None
+        self._sensors = {}
+
+        offset = _SDR_CACHE_HEADER.size
+        for _ in range(self.record_count):
+            if offset + _SDR_RECORD_HEADER_LEN > len(data):
+                raise IpmiMonitoringSdrCacheError(f"{path}: truncated SDR record at {offset}")
+            record_id, _, record_type, length = _SDR_RECORD_HEADER.unpack_from(data, offset)
+            end = offset + _SDR_RECORD_HEADER_LEN + length
+            if end > len(data):
+                raise IpmiMonitoringSdrCacheError(f"{path}: truncated SDR record at {offset}")
+            if record_type in _ID_STRING_OFFSET:
+                self._offsets[record_id] = offset
+            offset = end
+
+    @classmethod
+    def open(cls, path):
+        """Open an SDR cache file.
+
+        Args:
+            path (str): Path to the file
+
+        Returns:
+            SdrCache: The parsed file
+        """
+
+        with open(path, 'rb') as f:
+            try:
+                data = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files can not be mapped
+                data = b''
+
+        try:
+            return cls(path, data)
+
+        except Exception:
+            if isinstance(data, mmap.mmap):
+                data.close()
+            raise
+
+    @classmethod
+    def open_host(cls, hostname = None, sdr_cache_directory = None, sdr_cache_filenames = None):
+        """Open the SDR cache file of a host.
+
+        Args:
+            hostname (str, optional): Remote hostname, None for in-band
+            sdr_cache_directory (str, optional): SDR cache directory
+            sdr_cache_filenames (str, optional): SDR cache filename format
+
+        Returns:
+            SdrCache: The parsed file
+        """
+
+        return cls.open(sdr_cache_path(hostname, sdr_cache_directory, sdr_cache_filenames))
+
+    def close(self):
+        """Unmap the file."""
+
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._data = b''
+        self._offsets = {}
+        self._names = None
+        self._sensors = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __iter__(self):
+        for record_id in self._offsets:
+            yield self.get(record_id)
+
+    def __contains__(self, record_id):
+        return record_id in self._offsets
+
+    def __getitem__(self, record_id):
+        sensor = self.get(record_id)
+        if sensor is None:
+            raise KeyError(record_id)
+        return sensor
+
+    def record_ids(self):
+        """Return the record IDs of all sensor records.
+
+        Returns:
+            list: Record IDs in file order
+        """
+
+        return list(self._offsets)
+
+    def _record(self, offset):
+        """Return the bytes of the record at offset."""
+
+        length = self._data[offset + 4]
+        return self._data[offset:offset + _SDR_RECORD_HEADER_LEN + length]
+
+    def _name(self, r):
+        """Decode the ID string of a record."""
+
+        i = _ID_STRING_OFFSET[r[3]]
+        if len(r) <= i:
+            return ''
+        return _decode_id_string(r[i], r[i + 1:])
+
+    def get(self, record_id):
+        """Look up a sensor by record ID.
+
+        Args:
+            record_id (int): Record ID
+
+        Returns:
+            SdrSensor: The sensor, or None if there is no sensor record
+                with the record ID
+        """
+
+        sensor = self._sensors.get(record_id)
+        if sensor is not None:
+            return sensor
+
+        offset = self._offsets.get(record_id)
+        if offset is None:
+            return None
+
+        sensor = self._sensors[record_id] = self._decode(self._record(offset))
+        return sensor
+
+    def by_name(self, name):
+        """Look up sensors by name.
+
+        Names are not necessarily unique, so a list is returned.
+
+        Args:
+            name (str): Sensor name
+
+        Returns:
+            list: SdrSensor objects, empty if there are none
+        """
+
+        if self._names is None:
+            names = {}
+            for record_id, offset in self._offsets.items():
+                names.setdefault(self._name(self._record(offset)), []).append(record_id)
+            self._names = names
+
+        return [ self.get(record_id) for record_id in self._names.get(name, ()) ]
+
+    def _decode(self, r):
+        """Decode a full or compact sensor record.
+
+        Args:
+            r (bytes): The record
+
+        Returns:
+            SdrSensor: The sensor
+        """
+
+        record_type = r[3]
+        if len(r) < _ID_STRING_OFFSET[record_type]:
+            raise IpmiMonitoringSdrCacheError(f"{self.path}: SDR record {r[0] | r[1] << 8} too short")
+
+        thresholds = {}
+        positive_hysteresis = negative_hysteresis = nominal_reading = None
+
+        if record_type == SDR_FULL_SENSOR_RECORD:
+            conversion = _Conversion(r)
+
+            # Thresholds are only there if the capabilities say they
+            # can be read, and then only those in the readable mask
+            if (r[11] >> 2) & 0x03 in (1, 2):
+                readable = r[18]
+                for bit, (name, i) in enumerate(zip(THRESHOLD_NAMES, _THRESHOLD_OFFSETS)):
+                    if readable & (1 << bit):
+                        value = conversion.value(r[i])
+                        if value is not None:
+                            thresholds[name] = value
+
+            if (r[11] >> 4) & 0x03 in (1, 2):
+                positive_hysteresis = conversion.hysteresis(r[42])
+                negative_hysteresis = conversion.hysteresis(r[43])
+
+            if r[30] & 0x01:
+                nominal_reading = conversion.value(r[31])
+
+        if r[20] & 0x01:
+            sensor_units = IpmiMonitoringSensorUnits.PERCENT
+        else:
+            sensor_units = _UNITS.get(r[21], IpmiMonitoringSensorUnits.UNKNOWN)
+
+        return SdrSensor(
+            record_id = r[0] | r[1] << 8,
+            record_type = record_type,
+            sensor_owner_id = r[5],
+            sensor_owner_lun = r[6] & 0x03,
+            sensor_number = r[7],
+            sensor_name = self._name(r),
+            sensor_type = IPMI_MONITORING_SENSOR_TYPE_TABLE.get(r[12]),
+            event_reading_type_code = r[13] & 0x7f,
+            entity_id = r[8],
+            entity_instance = r[9] & 0x7f,
+            sensor_units = sensor_units,
+            base_unit = r[21],
+            thresholds = thresholds,
+            positive_hysteresis = positive_hysteresis,
+            negative_hysteresis = negative_hysteresis,
+            nominal_reading = nominal_reading)
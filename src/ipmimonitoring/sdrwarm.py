@@ -0,0 +1,221 @@
+"""Pre-populate the SDR cache of many hosts.
+
+The first read of a host downloads its whole SDR repository from the
+BMC into the SDR cache before any sensor can be read, which can take
+many seconds.  This tool does that for a list of hosts in parallel, for
+example when a monitoring system is deployed, so that the first real
+sweep does not pay for it:
+
+    python -m ipmimonitoring.sdrwarm --sdr-cache-directory /var/cache/sdr \\
+        --username admin --password secret --hosts-file hosts.txt
+
+Hosts whose SDR cache file exists and is younger than --max-age are
+skipped, older ones are re-read.  The time taken is reported for every
+host.
+
+The same thing is available from Python with warm_sdr_caches().
+"""
+
+import os
+import sys
+import time
+import threading
+import concurrent.futures
+from enum import Enum
+from dataclasses import dataclass
+
+from .arguments import *
+from .sdrcache import sdr_cache_path
+
+class SdrWarmStatus(Enum):
+    """What was done with the SDR cache of a host"""
+    FRESH = 0
+    CREATED = 1
+    REFRESHED = 2
+    FAILED = 3
+
+@dataclass
+class SdrWarmResult:
+    """Result of warming the SDR cache of one host.
+
+    Attributes:
+        hostname: Hostname of the host
+        status: SdrWarmStatus
+        path: Path to the SDR cache file
+        age: Age of the SDR cache file before warming in seconds, or
+            None if there was none
+        records: Number of sensors read, or None
+        error: Exception if the read failed, or None
+        elapsed: Time taken in seconds
+    """
+
+    __slots__ = ('hostname', 'status', 'path', 'age', 'records', 'error', 'elapsed')
+
+    hostname : str
+    status : SdrWarmStatus
+    path : str
+    age : object
+    records : object
+    error : object
+    elapsed : float
+
+def warm_sdr_caches(hosts, sdr_cache_directory = None, sdr_cache_filenames = None,
+                    max_age = None, force = False, parallel = 16,
+                    reading_flags = IpmiMonitoringContext.DEFAULT_READING_FLAGS,
+                    **context_kwargs):
+    """Make sure that the SDR cache of every host is populated.
+
+    A host is read once, which makes libipmimonitoring download its SDR
+    repository if there is no SDR cache file for it yet.  Stale files
+    are re-read with the REREAD_SDR_CACHE flag.
+
+    Args:
+        hosts (iterable): (hostname, config) tuples, where config is an
+            IpmiMonitoringConfig or None for the default config
+        sdr_cache_directory (str, optional): SDR cache directory, None
+            for the library default
+        sdr_cache_filenames (str, optional): SDR cache filename format,
+            None for the library default
+        max_age (float, optional): Files older than this many seconds
+            are re-read, None to keep existing files regardless of age
+        force (bool): Re-read the SDR of every host
+        parallel (int): Number of hosts warmed at the same time
+        reading_flags (int): Sensor reading flags to use
+        **context_kwargs: Other arguments for the IpmiMonitoringContext
+            of each worker thread
+
+    Yields:
+        SdrWarmResult: Result for each host, in completion order
+    """
+
+    default_config = IpmiMonitoringConfig()
+    local = threading.local()
+
+    def warm(hostname, config):
+        t0 = time.perf_counter()
+
+        path = sdr_cache_path(hostname, sdr_cache_directory, sdr_cache_filenames)
+        try:
+            age = max(0.0, time.time() - os.stat(path).st_mtime)
+        except OSError:
+            age = None
+
+        if age is not None and not force and (max_age is None or age <= max_age):
+            return SdrWarmResult(hostname, SdrWarmStatus.FRESH, path, age, None, None,
+                                 time.perf_counter() - t0)
+
+        flags = reading_flags
+        if age is not None:
+            flags |= IpmiMonitoringSensorReadingFlags.REREAD_SDR_CACHE.value
+        status = SdrWarmStatus.CREATED if age is None else SdrWarmStatus.REFRESHED
+
+        try:
+            ctx = getattr(local, 'ctx', None)
+            if ctx is None:
+                ctx = local.ctx = IpmiMonitoringContext(
+                    sdr_cache_directory = sdr_cache_directory,
+                    sdr_cache_filenames = sdr_cache_filenames,
+                    **context_kwargs)
+            ctx.hostname = hostname
+            ctx.config = config or default_config
+            records = len(ctx.read_sensors(flags, snapshot = True))
+            return SdrWarmResult(hostname, status, path, age, records, None,
+                                 time.perf_counter() - t0)
+
+        except Exception as e:
+            return SdrWarmResult(hostname, SdrWarmStatus.FAILED, path, age, None, e,
+                                 time.perf_counter() - t0)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers = parallel,
+                                               thread_name_prefix = 'sdrwarm') as executor:
+        futures = [ executor.submit(warm, hostname, config) for hostname, config in hosts ]
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                yield future.result()
+
+        finally:
+            for future in futures:
+                future.cancel()
+
+def read_hosts_file(path):
+    """Read hostnames from a file, one per line.
+
+    Empty lines and everything after a # are ignored.
+
+    Args:
+        path (str): Path to the file, "-" for standard input
+
+    Returns:
+        list: Hostnames
+    """
+
+    f = sys.stdin if path == '-' else open(path)
+    try:
+        hosts = []
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                hosts.append(line)
+        return hosts
+
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def main():
+    parser = create_parser()
+    parser.description = 'Pre-populate the SDR cache of many hosts'
+    parser.add_argument('hosts', nargs = '*', metavar = 'HOSTNAME',
+                        help = 'hosts to warm the SDR cache of')
+    parser.add_argument('--hosts-file', type = str, action = 'append', default = [],
+                        help = 'read hostnames from a file, one per line, - for stdin')
+    parser.add_argument('--parallel', type = int, default = 16,
+                        help = 'number of hosts to warm at the same time (default: %(default)s)')
+    parser.add_argument('--max-age', type = float, default = None, metavar = 'SECONDS',
+                        help = 're-read SDR cache files older than this (default: keep)')
+    parser.add_argument('--force', action = 'store_true',
+                        help = 're-read the SDR of every host')
+    add_parser_arguments(parser)
+    args = parser.parse_args()
+
+    hostnames = list(args.hosts)
+    for path in args.hosts_file:
+        hostnames.extend(read_hosts_file(path))
+    if args.hostname:
+        hostnames.append(args.hostname)
+    if not hostnames:
+        parser.error("no hosts given")
+
+    config = build_ipmi_config(args)
+    reading_flags = build_sensor_reading_flags(args)
+    if args.reread_sdr_cache:
+        args.force = True
+
+    t0 = time.perf_counter()
+    counts = { status: 0 for status in SdrWarmStatus }
+    for result in warm_sdr_caches([ (hostname, config) for hostname in hostnames ],
+                                  sdr_cache_directory = args.sdr_cache_directory,
+                                  sdr_cache_filenames = args.sdr_cache_filenames,
+                                  max_age = args.max_age, force = args.force,
+                                  parallel = args.parallel,
+                                  reading_flags = reading_flags,
+                                  init_flags = args.init_flags,
+                                  sensor_config_file = args.sensor_config_file):
+        counts[result.status] += 1
+        if result.error is not None:
+            detail = str(result.error)
+        elif result.records is not None:
+            detail = f"{result.records} sensors"
+        else:
+            detail = f"age {result.age:.0f}s"
+        print(f"{result.hostname:30} {result.status.name.lower():9} "
+              f"{result.elapsed:8.3f}s  {detail}", flush = True)
+
+    print(', '.join(f"{n} {status.name.lower()}" for status, n in counts.items()) +
+          f" in {time.perf_counter() - t0:.3f}s", file = sys.stderr)
+
+    if counts[SdrWarmStatus.FAILED]:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Selecting sensors by name.
+
+libipmimonitoring can only select sensors by record ID or sensor type.
+A SensorSelector matches sensor names against glob patterns such as
+"CPU*_TEMP" or regular expressions, and read_sensors(names = ...)
+resolves it to the record IDs of the matching sensors, so that the BMC
+is only asked for those sensors:
+
+    sweep = ctx.read_sensors(names = [ 'CPU*_TEMP', 'PS*_Status' ], snapshot = True)
+    sweep = ctx.read_sensors(names = re.compile(r'FAN\\d+'), snapshot = True)
+
+Glob patterns and regular expressions must match the whole name.
+"""
+
+import re
+import fnmatch
+
+class SensorSelector:
+    """Set of glob patterns and regular expressions matching sensor names.
+
+    Selectors with the same patterns compare equal, so they can be
+    used as keys for caching the record IDs they resolve to.
+
+    Attributes:
+        patterns: Tuple of the glob pattern strings and compiled
+            regular expressions
+    """
+
+    __slots__ = ('patterns', '_regexes', '_key')
+
+    def __init__(self, names):
+        """Initialize a selector.
+
+        Args:
+            names: A glob pattern string, a compiled regular
+                expression, or a list of them
+        """
+
+        if isinstance(names, (str, re.Pattern)):
+            names = [ names ]
+
+        self.patterns = tuple(names)
+        self._regexes = tuple(n if isinstance(n, re.Pattern) else re.compile(fnmatch.translate(n))
+                              for n in self.patterns)
+        self._key = tuple((r.pattern, r.flags) for r in self._regexes)
+
+    def __eq__(self, other):
+        return isinstance(other, SensorSelector) and self._key == other._key
+
+    def __hash__(self):
+        return hash(self._key)
+
+    def __repr__(self):
+        return f"SensorSelector({list(self.patterns)!r})"
+
+    def match(self, name):
+        """Check if a sensor name is selected.
+
+        Args:
+            name (str): Sensor name
+
+        Returns:
+            bool: True if any pattern matches the whole name
+        """
+
+        for regex in self._regexes:
+            if regex.fullmatch(name):
+                return True
+        return False
+
+    def select(self, sensors):
+        """Return the record IDs of the selected sensors.
+
+        Args:
+            sensors (iterable): (record_id, sensor_name) tuples
+
+        Returns:
+            list: Record IDs of the sensors whose name matches
+        """
+
+        return [ record_id for record_id, name in sensors if self.match(name) ]
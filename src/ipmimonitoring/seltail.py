@@ -0,0 +1,244 @@
+"""Incremental reading of the System Event Log.
+
+Reading the whole SEL on every poll means downloading and parsing the
+complete log from the BMC, which takes seconds on a BMC with a full
+SEL.  SelTail remembers the record ID and timestamp of the last record
+it has seen for each host in a small state file and only fetches the
+records after that point, so that a poll costs in proportion to the
+number of new events instead of the size of the log.
+
+The last seen record is fetched again on every poll.  If it has
+disappeared or has a different timestamp the SEL has been cleared or
+has wrapped around, and the whole log is read once to resynchronise.
+"""
+
+import os
+import json
+import fcntl
+import datetime
+import threading
+
+# Valid SEL record IDs, 0x0000 and 0xffff are reserved
+_SEL_RECORD_ID_MIN = 0x0001
+_SEL_RECORD_ID_MAX = 0xfffe
+
+# Serializes updates of state files between threads, flock() on the
+# lock file next to the state file does it between processes
+_state_lock = threading.Lock()
+
+def _next_record_ids(record_id, count):
+    """Return the count record IDs following record_id, wrapping around.
+
+    Args:
+        record_id (int): Last seen record ID
+        count (int): Number of record IDs
+
+    Returns:
+        list: Record IDs
+    """
+
+    span = _SEL_RECORD_ID_MAX - _SEL_RECORD_ID_MIN + 1
+    return [ (record_id - _SEL_RECORD_ID_MIN + i) % span + _SEL_RECORD_ID_MIN
+             for i in range(1, count + 1) ]
+
+class SelTail:
+    """Follow the System Event Log of a host.
+
+    By default new records are fetched by record ID, in windows of
+    consecutive record IDs after the last seen record.  This works for
+    BMCs which number SEL records sequentially.  For BMCs which do not,
+    pass by_date = True to fetch the records from the day of the last
+    seen record instead.
+
+    Attributes:
+        ctx: IpmiMonitoringContext used to read the SEL
+        state_path: Path of the state file
+        window: Number of record IDs fetched per query
+        by_date: Fetch new records by date instead of by record ID
+        resyncs: Number of times the whole SEL has been read
+    """
+
+    def __init__(self, ctx, state_path, window = 64, by_date = False, backlog = True):
+        """Initialize SEL tailing for the host of a context.
+
+        Args:
+            ctx (IpmiMonitoringContext): Context for the host
+            state_path (str): Path of the state file.  The file is
+                keyed by hostname and can be shared by several hosts.
+            window (int): Number of record IDs fetched per query
+            by_date (bool): Fetch new records by date instead of by
+                record ID
+            backlog (bool): If there is no state for the host, return
+                the records already in the SEL on the first poll.  If
+                false the first poll only records the current end of
+                the SEL.
+        """
+
+        self.ctx = ctx
+        self.state_path = state_path
+        self.window = window
+        self.by_date = by_date
+        self.backlog = backlog
+        self.resyncs = 0
+
+        self._key = ctx.hostname or ''
+        self._state = self._load_state().get(self._key)
+
+    def _load_state(self):
+        """Read the state of all hosts from the state file.
+
+        A missing or corrupt state file is treated as empty, so that
+        the hosts are resynchronised instead of failing forever.
+
+        Returns:
+            dict: State by hostname
+        """
+
+        try:
+            with open(self.state_path) as f:
+                states = json.load(f)
+
+        except (FileNotFoundError, ValueError):
+            return {}
+
+        return states if isinstance(states, dict) else {}
+
+    def _save_state(self):
+        """Write the state of this host to the state file.
+
+        The state of the other hosts in the file is read and written
+        back under a lock, so several SelTail objects, also in
+        different processes, can share a state file.
+        """
+
+        tmp = f"{self.state_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with _state_lock, open(self.state_path + '.lock', 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+
+            states = self._load_state()
+            states[self._key] = self._state
+
+            try:
+                with open(tmp, 'w') as f:
+                    json.dump(states, f, indent = 1, sort_keys = True)
+                os.replace(tmp, self.state_path)
+
+            except OSError:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
+                raise
+
+    @property
+    def high_water(self):
+        """Tuple with record ID and timestamp of the last seen record, or None."""
+
+        if self._state is None:
+            return None
+        return self._state['record_id'], self._state['timestamp']
+
+    def reset(self):
+        """Forget the last seen record of this host."""
+
+        self._state = None
+        self._save_state()
+
+    def _is_last_seen(self, record):
+        """Check if a record is the last seen record."""
+
+        return (record.record_id == self._state['record_id'] and
+                record.timestamp == self._state['timestamp'])
+
+    def _is_newer(self, record):
+        """Check if a record from a resynchronisation is newer than the last seen record."""
+
+        if record.timestamp is None:
+            return record.record_id > self._state['record_id']
+        return self._state['timestamp'] is None or record.timestamp > self._state['timestamp']
+
+    def _fetch_by_record_id(self):
+        """Fetch the records after the last seen record by record ID.
+
+        Returns:
+            list: New records, or None if the last seen record is gone
+        """
+
+        anchor = self._state['record_id']
+        ids = [ anchor ] + _next_record_ids(anchor, self.window)
+        records = self.ctx.read_sel_by_record_id(ids)
+
+        if not any(self._is_last_seen(record) for record in records):
+            return None
+
+        new = []
+        while True:
+            order = { rid: i for i, rid in enumerate(ids) }
+            batch = sorted((record for record in records if record.record_id != anchor),
+                           key = lambda record: order.get(record.record_id, len(ids)))
+            new.extend(batch)
+
+            # A full window means that there may be more records after it
+            if len(batch) < self.window:
+                return new
+
+            anchor = batch[-1].record_id
+            ids = _next_record_ids(anchor, self.window)
+            records = self.ctx.read_sel_by_record_id(ids)
+
+    def _fetch_by_date(self):
+        """Fetch the records after the last seen record by date.
+
+        Returns:
+            list: New records, or None if the last seen record is gone
+        """
+
+        timestamp = self._state['timestamp']
+        if timestamp is None:
+            return None
+
+        # Start a day early so that time zones do not matter
+        date_begin = datetime.date.fromtimestamp(timestamp) - datetime.timedelta(days = 1)
+        records = self.ctx.read_sel_by_date_range(date_begin)
+
+        for i, record in enumerate(records):
+            if self._is_last_seen(record):
+                return records[i + 1:]
+
+        return None
+
+    def poll(self):
+        """Fetch the records added to the SEL since the last poll.
+
+        The state file is only updated after the records have been
+        read successfully.
+
+        Returns:
+            list: New IpmiMonitoringSelData records, oldest first
+        """
+
+        new = None
+        if self._state is not None:
+            if self.by_date:
+                new = self._fetch_by_date()
+            else:
+                new = self._fetch_by_record_id()
+
+        if new is not None:
+            last = new[-1] if new else None
+
+        else:
+            # First poll, or the SEL has been cleared or has wrapped around
+            self.resyncs += 1
+            records = self.ctx.read_sel()
+            if self._state is None:
+                new = records if self.backlog else []
+            else:
+                new = [ record for record in records if self._is_newer(record) ]
+            last = records[-1] if records else None
+
+        if last is not None:
+            self._state = { 'record_id': last.record_id, 'timestamp': last.timestamp }
+            self._save_state()
+
+        return new
@@ -0,0 +1,282 @@
+"""Persistent index of static sensor metadata.
+
+Of the fields of a sensor record only the state, the reading and the
+bitmask change between sweeps.  The name, sensor type, units, reading
+type, bitmask type, sensor number and event reading type code come
+from the SDR and stay the same until the SDR changes.
+
+SensorMetadataIndex keeps those static fields for each (host,
+record_id), learnt from the first sweep of a host.  A context with an
+index only asks the library for the dynamic fields of the sensors it
+already knows and joins them with the metadata from the index:
+
+    index = SensorMetadataIndex(sdr_cache_directory = '/var/cache/sdr')
+    ctx = IpmiMonitoringContext(hostname = 'bmc1', metadata_index = index,
+                                sdr_cache_directory = '/var/cache/sdr')
+
+The index of each host is saved in a file next to the SDR cache file
+of the host, so that it survives restarts.  It is discarded when the
+SDR cache is re-read, either because the REREAD_SDR_CACHE flag is
+given or because the SDR cache file has changed since the index was
+learnt, and it is only used with the reading flags it was learnt with.
+
+With the SHARED_SENSORS flag several sensors can share one record ID,
+so the index is not used at all.
+"""
+
+import os
+import json
+import threading
+
+from .enums import *
+from .bitmasks import IPMI_MONITORING_SENSOR_BITMASK_TYPE_TABLE
+from .sdrcache import sdr_cache_path
+
+_INDEX_VERSION = 1
+
+# Suffix added to the SDR cache filename for the index file
+INDEX_SUFFIX = '.index'
+
+_REREAD_SDR_CACHE = IpmiMonitoringSensorReadingFlags.REREAD_SDR_CACHE.value
+_SHARED_SENSORS = IpmiMonitoringSensorReadingFlags.SHARED_SENSORS.value
+
+class SensorMetadata:
+    """Static metadata of a sensor.
+
+    The attributes have the same names and values as in
+    IpmiMonitoringSensorData.  reading_type and bitmask_type are the
+    raw values from the library.
+    """
+
+    __slots__ = (
+        'event_reading_type_code',
+        'sensor_number',
+        'sensor_name',
+        'sensor_type',
+        'sensor_reading_type',
+        'sensor_units',
+        'sensor_bitmask_type',
+        'reading_type',
+        'bitmask_type',
+        'raw',
+    )
+
+    def __init__(self, event_reading_type_code, sensor_number, sensor_name,
+                 sensor_type, reading_type, sensor_units, bitmask_type):
+        """Initialize sensor metadata from the raw library values.
+
+        Args:
+            event_reading_type_code (int): Event reading type code
+            sensor_number (int): Sensor number
+            sensor_name (str): Sensor name
+            sensor_type (int): Sensor type
+            reading_type (int): Sensor reading type
+            sensor_units (int): Sensor units
+            bitmask_type (int): Sensor bitmask type
+        """
+
+        self.event_reading_type_code = event_reading_type_code
+        self.sensor_number = sensor_number
+        self.sensor_name = sensor_name
+        self.sensor_type = IPMI_MONITORING_SENSOR_TYPE_TABLE.get(sensor_type)
+        self.sensor_reading_type = IPMI_MONITORING_SENSOR_READING_TYPE_TABLE.get(reading_type)
+        self.sensor_units = IPMI_MONITORING_SENSOR_UNITS_TABLE.get(sensor_units)
+        self.sensor_bitmask_type = IPMI_MONITORING_SENSOR_BITMASK_TYPE_TABLE.get(bitmask_type)
+        self.reading_type = reading_type
+        self.bitmask_type = bitmask_type
+        self.raw = (event_reading_type_code, sensor_number, sensor_name,
+                    sensor_type, reading_type, sensor_units, bitmask_type)
+
+    def __repr__(self):
+        return f"SensorMetadata{self.raw!r}"
+
+class _HostIndex:
+    """Index of one host."""
+
+    __slots__ = ('flags', 'stamp', 'sensors')
+
+    def __init__(self, flags, stamp, sensors):
+        self.flags = flags
+        self.stamp = stamp
+        self.sensors = sensors
+
+class SensorMetadataIndex:
+    """Static sensor metadata by host and record ID.
+
+    An index can be shared by many contexts, also in different threads,
+    for example by passing it to FleetPoller.
+
+    Attributes:
+        sdr_cache_directory: SDR cache directory, None for the default
+        sdr_cache_filenames: SDR cache filename format, None for the default
+        persist: Save the index of each host next to its SDR cache file
+    """
+
+    def __init__(self, sdr_cache_directory = None, sdr_cache_filenames = None, persist = True):
+        """Initialize an index.
+
+        The SDR cache settings must be the same as those of the
+        contexts using the index, they are used to find the SDR cache
+        files.
+
+        Args:
+            sdr_cache_directory (str, optional): SDR cache directory
+            sdr_cache_filenames (str, optional): SDR cache filename format
+            persist (bool): Save and load the index files
+        """
+
+        self.sdr_cache_directory = sdr_cache_directory
+        self.sdr_cache_filenames = sdr_cache_filenames
+        self.persist = persist
+
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _sdr_cache_path(self, hostname):
+        return sdr_cache_path(hostname, self.sdr_cache_directory, self.sdr_cache_filenames)
+
+    def stamp(self, hostname):
+        """Return what identifies the current SDR cache file of a host.
+
+        Args:
+            hostname (str): Hostname, None for in-band
+
+        Returns:
+            list: Modification time and size, or None if there is no file
+        """
+
+        try:
+            st = os.stat(self._sdr_cache_path(hostname))
+            return [ st.st_mtime_ns, st.st_size ]
+
+        except OSError:
+            return None
+
+    def _load(self, hostname):
+        """Load the index file of a host.
+
+        Returns:
+            _HostIndex: The index, or None if there is no usable file
+        """
+
+        try:
+            with open(self._sdr_cache_path(hostname) + INDEX_SUFFIX) as f:
+                state = json.load(f)
+            if state.get('version') != _INDEX_VERSION:
+                return None
+            sensors = { r[0]: SensorMetadata(*r[1:]) for r in state['sensors'] }
+            return _HostIndex(state['flags'], state['stamp'], sensors)
+
+        except (OSError, ValueError, KeyError, TypeError, IndexError):
+            return None
+
+    def _save(self, hostname, host):
+        """Save the index file of a host.
+
+        The index is only a cache, so failing to write it is not an error.
+        """
+
+        state = {
+            'version': _INDEX_VERSION,
+            'hostname': hostname,
+            'flags': host.flags,
+            'stamp': host.stamp,
+            'sensors': [ (record_id,) + m.raw for record_id, m in sorted(host.sensors.items()) ],
+        }
+
+        path = self._sdr_cache_path(hostname) + INDEX_SUFFIX
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp, path)
+
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+    def lookup(self, hostname, reading_flags):
+        """Return the metadata of a host for a sweep.
+
+        Args:
+            hostname (str): Hostname, None for in-band
+            reading_flags (int): Sensor reading flags of the sweep
+
+        Returns:
+            dict: SensorMetadata by record ID, empty if nothing is
+                known, or None if the index can not be used with
+                reading_flags
+        """
+
+        if reading_flags & _SHARED_SENSORS:
+            return None
+
+        if reading_flags & _REREAD_SDR_CACHE:
+            self.invalidate(hostname)
+            return {}
+
+        with self._lock:
+            host = self._hosts.get(hostname)
+        if host is None and self.persist:
+            host = self._load(hostname)
+            if host is not None:
+                with self._lock:
+                    self._hosts.setdefault(hostname, host)
+
+        if host is None or host.flags != reading_flags or host.stamp != self.stamp(hostname):
+            return {}
+        return host.sensors
+
+    def update(self, hostname, reading_flags, sensors):
+        """Add metadata learnt in a sweep.
+
+        Args:
+            hostname (str): Hostname, None for in-band
+            reading_flags (int): Sensor reading flags of the sweep
+            sensors (dict): Tuples of the arguments for SensorMetadata
+                by record ID
+        """
+
+        if reading_flags & _SHARED_SENSORS:
+            return
+
+        sensors = { record_id: SensorMetadata(*raw) for record_id, raw in sensors.items() }
+
+        flags = reading_flags & ~_REREAD_SDR_CACHE
+        stamp = self.stamp(hostname)
+
+        with self._lock:
+            host = self._hosts.get(hostname)
+            if host is not None and host.flags == flags and host.stamp == stamp:
+                merged = dict(host.sensors)
+                merged.update(sensors)
+            else:
+                merged = dict(sensors)
+            host = self._hosts[hostname] = _HostIndex(flags, stamp, merged)
+
+        if self.persist:
+            self._save(hostname, host)
+
+    def invalidate(self, hostname):
+        """Discard the index of a host.
+
+        Args:
+            hostname (str): Hostname, None for in-band
+        """
+
+        with self._lock:
+            self._hosts.pop(hostname, None)
+
+        if self.persist:
+            try:
+                os.unlink(self._sdr_cache_path(hostname) + INDEX_SUFFIX)
+            except OSError:
+                pass
+
+    def clear(self):
+        """Discard the in-memory index of all hosts."""
+
+        with self._lock:
+            self._hosts.clear()
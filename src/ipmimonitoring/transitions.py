@@ -0,0 +1,319 @@
+"""State transitions of sensors.
+
+A sensor whose reading hovers around a threshold flips between NOMINAL
+and WARNING from one sweep to the next.  TransitionDetector turns
+sweeps into StateTransition events and only reports a new state once
+it has been seen in confirm of the last window sweeps of the sensor:
+
+    detector = TransitionDetector(confirm = 3, window = 5, hysteresis = {
+        IpmiMonitoringSensorUnits.CELSIUS: 2.0,
+    })
+
+    for tick in Scheduler(10).ticks():
+        for event in detector.update(ctx.read_sensors(snapshot = True)):
+            print(event.sensor_name, event.old_state, event.new_state,
+                  event.duration)
+
+A sensor which has gone into WARNING or CRITICAL is in addition only
+reported to recover once its reading has moved back the hysteresis
+margin past the reading where the alarm was first seen.
+
+The first sweep of a sensor sets its state without an event.  The
+state of each sensor is kept in array.array columns indexed by a slot
+number, and the slots of each host in an array indexed by record ID,
+so a detector needs about 45 bytes per sensor for hosts with densely
+numbered record IDs, see benchmarks/bench_transitions.py.
+"""
+
+import math
+import array
+from dataclasses import dataclass
+
+from .enums import *
+
+_WARNING = IpmiMonitoringState.WARNING.value
+_CRITICAL = IpmiMonitoringState.CRITICAL.value
+
+# Each state in the history of a sensor takes two bits
+_STATE_BITS = 2
+_STATE_MASK = (1 << _STATE_BITS) - 1
+_MAX_WINDOW = 16
+
+# Confirmed state of a sensor which has not been seen yet
+_UNSEEN = -1
+
+# Slot of a record ID without a sensor
+_NO_SLOT = -1
+
+def _is_recovery(old, new):
+    """Check if going from state old to state new lowers an alarm."""
+
+    return (old == _WARNING or old == _CRITICAL) and new < old
+
+@dataclass
+class StateTransition:
+    """A confirmed change of the state of a sensor.
+
+    Attributes:
+        hostname: Hostname the sensor was read from
+        record_id: Record ID of the sensor
+        sensor_name: Name of the sensor
+        old_state: IpmiMonitoringState before the change
+        new_state: IpmiMonitoringState after the change
+        reading: Reading of the sweep which confirmed the change
+        since: Time when old_state was confirmed
+        timestamp: Time of the sweep which confirmed the change
+    """
+
+    __slots__ = ('hostname', 'record_id', 'sensor_name', 'old_state', 'new_state',
+                 'reading', 'since', 'timestamp')
+
+    hostname : str
+    record_id : int
+    sensor_name : str
+    old_state : IpmiMonitoringState
+    new_state : IpmiMonitoringState
+    reading : object
+    since : float
+    timestamp : float
+
+    @property
+    def duration(self):
+        """Time in seconds the sensor was in old_state."""
+
+        return self.timestamp - self.since
+
+@dataclass
+class TransitionStats:
+    """Statistics for a transition detector.
+
+    Attributes:
+        sweeps: Number of sweeps
+        records: Number of sensor records
+        changes: Number of records whose state differed from the
+            confirmed state of the sensor
+        transitions: Number of transitions reported
+        held: Number of recoveries held back by hysteresis
+    """
+
+    __slots__ = ('sweeps', 'records', 'changes', 'transitions', 'held')
+
+    sweeps : int
+    records : int
+    changes : int
+    transitions : int
+    held : int
+
+class TransitionDetector:
+    """Report debounced state transitions of sensors.
+
+    The detector keeps state for each hostname and record ID, so one
+    detector can be used for the sweeps of many hosts, for example
+    from a FleetPoller.
+
+    Attributes:
+        confirm: Number of sweeps in the window a new state must be
+            seen in
+        window: Number of most recent sweeps of a sensor considered
+        hysteresis: Hysteresis margin by IpmiMonitoringSensorUnits
+        default_hysteresis: Hysteresis margin for units not in hysteresis
+        stats: TransitionStats
+    """
+
+    def __init__(self, confirm = 1, window = 1, hysteresis = None, default_hysteresis = 0.0):
+        """Initialize a transition detector.
+
+        Args:
+            confirm (int): Number of sweeps in the window a new state
+                must be seen in
+            window (int): Number of most recent sweeps of a sensor
+                considered, at most 16
+            hysteresis (dict, optional): Hysteresis margin by
+                IpmiMonitoringSensorUnits, in the units of the sensor
+            default_hysteresis (float): Hysteresis margin for other units
+        """
+
+        if not 1 <= confirm <= window <= _MAX_WINDOW:
+            raise ValueError(f"need 1 <= confirm <= window <= {_MAX_WINDOW}")
+
+        self.confirm = confirm
+        self.window = window
+        self.hysteresis = dict(hysteresis or {})
+        self.default_hysteresis = default_hysteresis
+        self.stats = TransitionStats(sweeps = 0, records = 0, changes = 0,
+                                     transitions = 0, held = 0)
+
+        self._history_mask = (1 << (_STATE_BITS * window)) - 1
+
+        # Slot of each sensor by hostname, in an array indexed by record ID
+        self._hosts = {}
+
+        # Columns indexed by slot
+        self._state = array.array('b')       # Confirmed state
+        self._history = array.array('I')     # Last window states, newest lowest
+        self._since = array.array('d')       # Time the state was confirmed
+        self._last = array.array('d')        # Reading of the last sweep
+        self._edge = array.array('d')        # Reading where the alarm was first seen
+        self._direction = array.array('b')   # Direction the reading crossed the edge
+        self._margin = array.array('d')      # Hysteresis of the sensor, NaN for default
+
+    def __len__(self):
+        return len(self._state)
+
+    def _slot(self, hostname, record_id):
+        """Return the slot of a sensor, adding it if needed."""
+
+        index = self._hosts.get(hostname)
+        if index is None:
+            index = self._hosts[hostname] = array.array('i')
+        if record_id >= len(index):
+            index.extend(array.array('i', [ _NO_SLOT ]) * (record_id + 1 - len(index)))
+        slot = index[record_id]
+        if slot == _NO_SLOT:
+            slot = index[record_id] = len(self._state)
+            self._state.append(_UNSEEN)
+            self._history.append(0)
+            self._since.append(0.0)
+            self._last.append(math.nan)
+            self._edge.append(math.nan)
+            self._direction.append(0)
+            self._margin.append(math.nan)
+        return slot
+
+    def set_hysteresis(self, hostname, record_id, margin):
+        """Set the hysteresis margin of one sensor.
+
+        Args:
+            hostname (str): Hostname of the sensor
+            record_id (int): Record ID of the sensor
+            margin (float): Hysteresis margin, None for the margin of
+                the units of the sensor
+        """
+
+        self._margin[self._slot(hostname, record_id)] = math.nan if margin is None else margin
+
+    def state(self, hostname, record_id):
+        """Return the confirmed state of a sensor.
+
+        Args:
+            hostname (str): Hostname of the sensor
+            record_id (int): Record ID of the sensor
+
+        Returns:
+            IpmiMonitoringState: The state, or None if the sensor has
+                not been seen
+        """
+
+        index = self._hosts.get(hostname)
+        if index is None or record_id >= len(index) or index[record_id] == _NO_SLOT:
+            return None
+        slot = index[record_id]
+        if self._state[slot] == _UNSEEN:
+            return None
+        return IPMI_MONITORING_STATE_TABLE.get(self._state[slot])
+
+    def _held(self, slot, record, reading):
+        """Check if hysteresis holds back the recovery of a sensor."""
+
+        edge = self._edge[slot]
+        direction = self._direction[slot]
+        if math.isnan(edge) or math.isnan(reading) or not direction:
+            return False
+
+        margin = self._margin[slot]
+        if math.isnan(margin):
+            margin = self.hysteresis.get(record.sensor_units, self.default_hysteresis)
+        return (edge - reading) * direction < margin
+
+    def update(self, sweep):
+        """Process a sweep.
+
+        Args:
+            sweep (IpmiMonitoringSweep): A sweep of a host
+
+        Returns:
+            list: StateTransition events confirmed by the sweep
+        """
+
+        confirm = self.confirm
+        window = self.window
+        history_mask = self._history_mask
+        states = self._state
+        history = self._history
+        last = self._last
+
+        hostname = sweep.hostname
+        timestamp = sweep.timestamp
+        index = self._hosts.get(hostname) or array.array('i')
+
+        events = []
+        changes = 0
+        for record in sweep:
+            record_id = record.record_id
+            slot = index[record_id] if record_id < len(index) else _NO_SLOT
+            if slot == _NO_SLOT:
+                slot = self._slot(hostname, record_id)
+                index = self._hosts[hostname]
+
+            new = record.sensor_state.value
+            reading = record.sensor_reading
+            reading = float(reading) if isinstance(reading, (int, float)) else math.nan
+
+            old = states[slot]
+            if old == _UNSEEN:
+                states[slot] = new
+                history[slot] = self._fill(new)
+                self._since[slot] = timestamp
+                last[slot] = reading
+                continue
+
+            previous = history[slot] & _STATE_MASK
+            h = history[slot] = ((history[slot] << _STATE_BITS) | new) & history_mask
+
+            if new != old:
+                changes += 1
+
+                # Remember where an alarm started, for the hysteresis
+                if previous == old and not _is_recovery(old, new):
+                    self._edge[slot] = reading
+                    d = reading - last[slot]
+                    self._direction[slot] = 0 if math.isnan(d) else (d > 0) - (d < 0)
+
+                seen = 0
+                for _ in range(window):
+                    seen += (h & _STATE_MASK) == new
+                    h >>= _STATE_BITS
+
+                if seen >= confirm:
+                    if _is_recovery(old, new) and self._held(slot, record, reading):
+                        self.stats.held += 1
+                    else:
+                        events.append(StateTransition(
+                            hostname = hostname,
+                            record_id = record.record_id,
+                            sensor_name = record.sensor_name,
+                            old_state = IPMI_MONITORING_STATE_TABLE.get(old),
+                            new_state = record.sensor_state,
+                            reading = record.sensor_reading,
+                            since = self._since[slot],
+                            timestamp = timestamp))
+                        states[slot] = new
+                        history[slot] = self._fill(new)
+                        self._since[slot] = timestamp
+
+            last[slot] = reading
+
+        self.stats.sweeps += 1
+        self.stats.records += len(sweep)
+        self.stats.changes += changes
+        self.stats.transitions += len(events)
+
+        return events
+
+    def _fill(self, state):
+        """Return a history where all sweeps in the window had state."""
+
+        h = 0
+        for _ in range(self.window):
+            h = (h << _STATE_BITS) | state
+        return h
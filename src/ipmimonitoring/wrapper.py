@@ -2,143 +2,226 @@
 Python CFFI wrapper for the libipmimonitoring library.
 """
 
+import os
+import time
+import hashlib
+import datetime
 import cffi
+import threading
 from dataclasses import dataclass
 
 from ._cffi_helper import CffiStructWrapper, cffi_encode_string
+from ._cdef import CDEF
 
 from .enums import *
 from .bitmasks import *
-
-ffi = cffi.FFI()
-
-# C structures from ipmi_monitoring.h
-ffi.cdef("""
-    // IPMI config structure
-    struct ipmi_monitoring_ipmi_config {
-        int driver_type;
-        int disable_auto_probe;
-        unsigned int driver_address;
-        unsigned int register_spacing;
-        char *driver_device;
-
-        int protocol_version;
-        char *username;
-        char *password;
-        unsigned char *k_g;
-        unsigned int k_g_len;
-        int privilege_level;
-        int authentication_type;
-        int cipher_suite_id;
-        int session_timeout_len;
-        int retransmission_timeout_len;
-
-        unsigned int workaround_flags;
-    };
-
-    // Opaque context type
-    typedef struct ipmi_monitoring_ctx *ipmi_monitoring_ctx_t;
-
-    // Callback function type
-    typedef int (*Ipmi_Monitoring_Callback)(ipmi_monitoring_ctx_t c, void *callback_data);
-
-    // Library initialization
-    int ipmi_monitoring_init(unsigned int flags, int *errnum);
-
-    // Context management
-    ipmi_monitoring_ctx_t ipmi_monitoring_ctx_create(void);
-    void ipmi_monitoring_ctx_destroy(ipmi_monitoring_ctx_t c);
-    int ipmi_monitoring_ctx_errnum(ipmi_monitoring_ctx_t c);
-    char *ipmi_monitoring_ctx_strerror(int errnum);
-    char *ipmi_monitoring_ctx_errormsg(ipmi_monitoring_ctx_t c);
-
-    // Configuration functions
-    int ipmi_monitoring_ctx_sel_config_file(ipmi_monitoring_ctx_t c, const char *sel_config_file);
-    int ipmi_monitoring_ctx_sensor_config_file(ipmi_monitoring_ctx_t c, const char *sensor_config_file);
-    int ipmi_monitoring_ctx_sdr_cache_directory(ipmi_monitoring_ctx_t c, const char *dir);
-    int ipmi_monitoring_ctx_sdr_cache_filenames(ipmi_monitoring_ctx_t c, const char *format);
-
-    // SEL functions
-    int ipmi_monitoring_sel_by_record_id(ipmi_monitoring_ctx_t c, const char *hostname,
-                                        struct ipmi_monitoring_ipmi_config *config,
-                                        unsigned int sel_flags, unsigned int *record_ids,
-                                        unsigned int record_ids_len, Ipmi_Monitoring_Callback callback,
-                                        void *callback_data);
-    int ipmi_monitoring_sel_by_sensor_type(ipmi_monitoring_ctx_t c, const char *hostname,
-                                          struct ipmi_monitoring_ipmi_config *config,
-                                          unsigned int sel_flags, unsigned int *sensor_types,
-                                          unsigned int sensor_types_len, Ipmi_Monitoring_Callback callback,
-                                          void *callback_data);
-    int ipmi_monitoring_sel_by_date_range(ipmi_monitoring_ctx_t c, const char *hostname,
-                                         struct ipmi_monitoring_ipmi_config *config,
-                                         unsigned int sel_flags, const char *date_begin,
-                                         const char *date_end, Ipmi_Monitoring_Callback callback,
-                                         void *callback_data);
-
-    // SEL iterator functions
-    int ipmi_monitoring_sel_iterator_first(ipmi_monitoring_ctx_t c);
-    int ipmi_monitoring_sel_iterator_next(ipmi_monitoring_ctx_t c);
-    void ipmi_monitoring_sel_iterator_destroy(ipmi_monitoring_ctx_t c);
-    int ipmi_monitoring_sel_read_record_id(ipmi_monitoring_ctx_t c);
-    int ipmi_monitoring_sel_read_record_type(ipmi_monitoring_ctx_t c);
-    int ipmi_monitoring_sel_read_record_type_class(ipmi_monitoring_ctx_t c);
-    int ipmi_monitoring_sel_read_sel_state(ipmi_monitoring_ctx_t c);
-    int ipmi_monitoring_sel_read_timestamp(ipmi_monitoring_ctx_t c, unsigned int *timestamp);
-    int ipmi_monitoring_sel_read_sensor_type(ipmi_monitoring_ctx_t c);
-    int ipmi_monitoring_sel_read_sensor_number(ipmi_monitoring_ctx_t c);
-    char *ipmi_monitoring_sel_read_sensor_name(ipmi_monitoring_ctx_t c);
-    int ipmi_monitoring_sel_read_event_direction(ipmi_monitoring_ctx_t c);
-    int ipmi_monitoring_sel_read_event_offset_type(ipmi_monitoring_ctx_t c);
-    int ipmi_monitoring_sel_read_event_offset(ipmi_monitoring_ctx_t c);
-    char *ipmi_monitoring_sel_read_event_offset_string(ipmi_monitoring_ctx_t c);
-    int ipmi_monitoring_sel_read_event_type_code(ipmi_monitoring_ctx_t c);
-    int ipmi_monitoring_sel_read_event_data(ipmi_monitoring_ctx_t c,
-                                           unsigned int *event_data1,
-                                           unsigned int *event_data2,
-                                           unsigned int *event_data3);
-    int ipmi_monitoring_sel_read_manufacturer_id(ipmi_monitoring_ctx_t c);
-    int ipmi_monitoring_sel_read_oem_data(ipmi_monitoring_ctx_t c, void *oem_data,
-                                         unsigned int oem_data_len);
-
-    // Sensor reading functions
-    int ipmi_monitoring_sensor_readings_by_record_id(ipmi_monitoring_ctx_t c, const char *hostname,
-                                                    struct ipmi_monitoring_ipmi_config *config,
-                                                    unsigned int sensor_reading_flags,
-                                                    unsigned int *record_ids,
-                                                    unsigned int record_ids_len,
-                                                    Ipmi_Monitoring_Callback callback,
-                                                    void *callback_data);
-    int ipmi_monitoring_sensor_readings_by_sensor_type(ipmi_monitoring_ctx_t c, const char *hostname,
-                                                      struct ipmi_monitoring_ipmi_config *config,
-                                                      unsigned int sensor_reading_flags,
-                                                      unsigned int *sensor_types,
-                                                      unsigned int sensor_types_len,
-                                                      Ipmi_Monitoring_Callback callback,
-                                                      void *callback_data);
-
-    // Sensor iterator functions
-    int ipmi_monitoring_sensor_iterator_first(ipmi_monitoring_ctx_t c);
-    int ipmi_monitoring_sensor_iterator_next(ipmi_monitoring_ctx_t c);
-    void ipmi_monitoring_sensor_iterator_destroy(ipmi_monitoring_ctx_t c);
-    int ipmi_monitoring_sensor_read_record_id(ipmi_monitoring_ctx_t c);
-    int ipmi_monitoring_sensor_read_sensor_number(ipmi_monitoring_ctx_t c);
-    int ipmi_monitoring_sensor_read_sensor_type(ipmi_monitoring_ctx_t c);
-    char *ipmi_monitoring_sensor_read_sensor_name(ipmi_monitoring_ctx_t c);
-    int ipmi_monitoring_sensor_read_sensor_state(ipmi_monitoring_ctx_t c);
-    int ipmi_monitoring_sensor_read_sensor_units(ipmi_monitoring_ctx_t c);
-    int ipmi_monitoring_sensor_read_sensor_reading_type(ipmi_monitoring_ctx_t c);
-    void *ipmi_monitoring_sensor_read_sensor_reading(ipmi_monitoring_ctx_t c);
-    int ipmi_monitoring_sensor_read_sensor_bitmask_type(ipmi_monitoring_ctx_t c);
-    int ipmi_monitoring_sensor_read_sensor_bitmask(ipmi_monitoring_ctx_t c);
-    char **ipmi_monitoring_sensor_read_sensor_bitmask_strings(ipmi_monitoring_ctx_t c);
-    int ipmi_monitoring_sensor_read_event_reading_type_code(ipmi_monitoring_ctx_t c);
-""")
+from .offsets import IpmiMonitoringEventOffsetType, IPMI_MONITORING_EVENT_OFFSET_TYPE_TABLE
+
+LIBRARY_NAME = "libipmimonitoring.so.6"
+
+# Plain ints so that the reading type does not have to be looked up
+# in the enum for every record
+_READING_TYPE_BOOL = IpmiMonitoringSensorReadingType.UNSIGNED_INTEGER8_BOOL.value
+_READING_TYPE_UINT32 = IpmiMonitoringSensorReadingType.UNSIGNED_INTEGER32.value
+_READING_TYPE_DOUBLE = IpmiMonitoringSensorReadingType.DOUBLE.value
+
+# SEL record type classes as plain ints
+_SEL_SYSTEM_EVENT_RECORD = IpmiMonitoringSelRecordTypeClass.SYSTEM_EVENT_RECORD.value
+_SEL_TIMESTAMPED_OEM_RECORD = IpmiMonitoringSelRecordTypeClass.TIMESTAMPED_OEM_RECORD.value
+_SEL_NON_TIMESTAMPED_OEM_RECORD = IpmiMonitoringSelRecordTypeClass.NON_TIMESTAMPED_OEM_RECORD.value
+
+# Large enough for the OEM data of any SEL record (13 bytes)
+_SEL_OEM_DATA_LEN = 16
+
+_REREAD_SDR_CACHE = IpmiMonitoringSensorReadingFlags.REREAD_SDR_CACHE.value
+
+# Reading flags which make the library return sensor names which are
+# not the ID strings of the SDR records
+_SDR_NAME_FLAGS = (IpmiMonitoringSensorReadingFlags.SHARED_SENSORS.value |
+                   IpmiMonitoringSensorReadingFlags.ENTITY_SENSOR_NAMES.value)
+
+# Number of reads a name selection resolved without an SDR cache file
+# is used for, since a change of the SDR can not be noticed without it
+_UNSTAMPED_SELECTION_READS = 60
+
+# Bitmask strings for these types can differ between sensors with the
+# same bitmask, so they are not cached
+_UNCACHED_BITMASK_TYPES = (
+    IpmiMonitoringSensorBitmaskType.OEM.value,
+    IpmiMonitoringSensorBitmaskType.UNKNOWN.value,
+)
+
+try:
+    # Use the compiled API mode bindings if they have been built, see
+    # _build_ffi.py.  These call straight into libipmimonitoring
+    # instead of going through libffi.
+    from ._ipmimonitoring_cffi import ffi, lib as _api_lib
+
+except ImportError:
+    # Fall back to ABI mode and dlopen the library at runtime
+    ffi = cffi.FFI()
+    ffi.cdef(CDEF)
+    _api_lib = None
+
+# Pointer types for casting readings, looked up once
+_UINT8_P = ffi.typeof('uint8_t *')
+_UINT32_P = ffi.typeof('uint32_t *')
+_DOUBLE_P = ffi.typeof('double *')
 
 class IpmiMonitoringError(RuntimeError):
-    """Custom exception class for IPMI monitoring errors."""
+    """Custom exception class for IPMI monitoring errors.
+
+    Errors reported by libipmimonitoring are raised as one of the
+    subclasses below, depending on the error code.
+
+    Attributes:
+        errnum: IpmiMonitoringErrorCodes value of the error, or None
+            if the error did not come from the library
+    """
+
+    def __init__(self, message, errnum = None):
+        super().__init__(message)
+        self.errnum = errnum
+
+    def __reduce__(self):
+        return (self.__class__, (str(self), self.errnum))
+
+class IpmiMonitoringConnectionError(IpmiMonitoringError):
+    """The BMC did not answer, a connection or session timeout."""
+
+    pass
+
+class IpmiMonitoringBusyError(IpmiMonitoringError):
+    """The BMC is busy."""
+
+    pass
+
+class IpmiMonitoringAuthError(IpmiMonitoringError):
+    """Authentication with the BMC failed.
+
+    Retrying will not help until the configuration has been fixed.
+    """
 
     pass
 
+# Exception class for library error codes, others raise IpmiMonitoringError
+_ERROR_CLASSES = {
+    IpmiMonitoringErrorCodes.CONNECTION_TIMEOUT: IpmiMonitoringConnectionError,
+    IpmiMonitoringErrorCodes.SESSION_TIMEOUT: IpmiMonitoringConnectionError,
+    IpmiMonitoringErrorCodes.BMC_BUSY: IpmiMonitoringBusyError,
+    IpmiMonitoringErrorCodes.USERNAME_INVALID: IpmiMonitoringAuthError,
+    IpmiMonitoringErrorCodes.PASSWORD_INVALID: IpmiMonitoringAuthError,
+    IpmiMonitoringErrorCodes.PASSWORD_VERIFICATION_TIMEOUT: IpmiMonitoringAuthError,
+    IpmiMonitoringErrorCodes.K_G_INVALID: IpmiMonitoringAuthError,
+    IpmiMonitoringErrorCodes.PRIVILEGE_LEVEL_INSUFFICIENT: IpmiMonitoringAuthError,
+    IpmiMonitoringErrorCodes.PRIVILEGEL_LEVEL_CANNOT_BE_OBTAINED: IpmiMonitoringAuthError,
+    IpmiMonitoringErrorCodes.AUTHENTICATION_TYPE_UNAVAILABLE: IpmiMonitoringAuthError,
+    IpmiMonitoringErrorCodes.IPMI_2_0_UNAVAILABLE: IpmiMonitoringAuthError,
+    IpmiMonitoringErrorCodes.CIPHER_SUITE_ID_UNAVAILABLE: IpmiMonitoringAuthError,
+}
+
+def make_error(message, errnum):
+    """Create the exception for a libipmimonitoring error code.
+
+    Args:
+        message (str): Error message
+        errnum (int): Error code from the library
+
+    Returns:
+        IpmiMonitoringError: Exception of the matching subclass
+    """
+
+    try:
+        errnum = IpmiMonitoringErrorCodes(errnum)
+    except ValueError:
+        errnum = IpmiMonitoringErrorCodes.ERRNUMRANGE
+    return _ERROR_CLASSES.get(errnum, IpmiMonitoringError)(message, errnum)
+
+# Process wide library handle, see get_library()
+_lib = None
+_lib_lock = threading.Lock()
+
+def get_library(init_flags = 0):
+    """Get the process wide libipmimonitoring handle.
+
+    The first call loads the library and runs ipmi_monitoring_init,
+    later calls return the same handle.  Initialization flags are
+    global to the library, so only the flags passed on the first
+    successful call take effect.
+
+    Args:
+        init_flags (int): Initialization flags for the library
+
+    Returns:
+        The cffi library object
+    """
+
+    global _lib
+
+    if _lib is not None:
+        return _lib
+
+    with _lib_lock:
+        if _lib is None:
+            if _api_lib is not None:
+                lib = _api_lib
+            else:
+                lib = ffi.dlopen(LIBRARY_NAME)
+
+            errnum = ffi.new("int *")
+            result = lib.ipmi_monitoring_init(init_flags, errnum)
+            if result != 0:
+                errstr = ffi.string(lib.ipmi_monitoring_ctx_strerror(errnum[0])).decode('utf-8')
+                raise make_error(f"Failed to initialize libipmimonitoring: {errstr}", errnum[0])
+
+            _lib = lib
+
+    return _lib
+
+def _sensor_callback(c, callback_data):
+    """Callback from libipmimonitoring for each sensor in a sweep.
+
+    Args:
+        c: ipmi_monitoring_ctx_t
+        callback_data: Handle to the IpmiMonitoringContext
+
+    Returns:
+        int: 0 to continue, -1 to stop the sweep
+    """
+
+    self = ffi.from_handle(callback_data)
+    try:
+        return self._deliver_sensor_record()
+
+    except BaseException as e:
+        # Exceptions can not propagate through C, pass it on to the
+        # caller of the read function instead
+        self._callback_error = e
+        return -1
+
+# C function pointer for _sensor_callback, see _get_sensor_callback()
+_sensor_callback_ptr = None
+
+def _get_sensor_callback():
+    """Get a C function pointer which calls _sensor_callback.
+
+    Returns:
+        cdata: Ipmi_Monitoring_Callback
+    """
+
+    global _sensor_callback_ptr
+
+    if _sensor_callback_ptr is None:
+        lib = get_library()
+        if hasattr(lib, 'pyipmimonitoring_sensor_callback'):
+            # API mode, use the extern "Python" function
+            ffi.def_extern(name = 'pyipmimonitoring_sensor_callback')(_sensor_callback)
+            _sensor_callback_ptr = lib.pyipmimonitoring_sensor_callback
+        else:
+            _sensor_callback_ptr = ffi.callback("Ipmi_Monitoring_Callback", _sensor_callback)
+
+    return _sensor_callback_ptr
+
 class IpmiMonitoringConfig(CffiStructWrapper):
     """Configuration class for IPMI monitoring settings.
 
@@ -181,6 +264,49 @@ class IpmiMonitoringConfig(CffiStructWrapper):
         for k, v in kwargs.items():
             setattr(self, k, v)
 
+    def to_dict(self):
+        """Return the configuration as plain Python values.
+
+        Strings are returned as str, k_g as bytes and NULL pointers as
+        None, so the result can be pickled or passed back to
+        IpmiMonitoringConfig(**d).
+
+        Returns:
+            dict: Value of each field of the configuration
+        """
+
+        d = {}
+        for k, field in self._ffi.typeof(self._obj[0]).fields:
+            v = getattr(self._obj, k)
+            if field.type.kind == 'pointer':
+                if not v:
+                    v = None
+                elif k == 'k_g':
+                    v = self._ffi.buffer(v, self._obj.k_g_len)[:]
+                else:
+                    v = self._ffi.string(v).decode('utf-8')
+            d[k] = v
+        return d
+
+    def fingerprint(self):
+        """Return a digest of the configuration.
+
+        Two configs with the same values have the same fingerprint.
+
+        Returns:
+            str: Hex digest
+        """
+
+        return hashlib.sha256(repr(sorted(self.to_dict().items())).encode('utf-8')).hexdigest()
+
+    def __setstate__(self, state):
+        for k, v in state.items():
+            setattr(self, k, v)
+
+    def __reduce__(self):
+        # The cffi struct can not be pickled, pass the values instead
+        return (self.__class__, (), self.to_dict())
+
 @dataclass
 class IpmiMonitoringSensorData:
     """Data class representing sensor reading information.
@@ -200,9 +326,27 @@ class IpmiMonitoringSensorData:
         sensor_units: Units of the sensor reading
         sensor_bitmask_type: Type of bitmask used for sensor
         sensor_bitmask: Bitmask value for sensor
-        sensor_bitmask_strings: List of bitmask string representations
+        sensor_bitmask_strings: Tuple of bitmask string representations
+
+    The class uses __slots__ so that records do not carry a __dict__,
+    which keeps memory use down when holding on to many sweeps.
     """
 
+    __slots__ = (
+        'record_id',
+        'event_reading_type_code',
+        'sensor_number',
+        'sensor_name',
+        'sensor_type',
+        'sensor_state',
+        'sensor_reading_type',
+        'sensor_reading',
+        'sensor_units',
+        'sensor_bitmask_type',
+        'sensor_bitmask',
+        'sensor_bitmask_strings',
+    )
+
     record_id : int
     event_reading_type_code : int
     sensor_number :int
@@ -214,7 +358,114 @@ class IpmiMonitoringSensorData:
     sensor_units : IpmiMonitoringSensorUnits
     sensor_bitmask_type : IpmiMonitoringSensorBitmaskType
     sensor_bitmask : int
-    sensor_bitmask_strings : list
+    sensor_bitmask_strings : tuple
+
+@dataclass
+class IpmiMonitoringSelData:
+    """Data class representing a System Event Log record.
+
+    Fields which do not apply to the class of the record are None.
+    System event records have the sensor and event fields, timestamped
+    OEM records have a manufacturer ID and OEM data and non-timestamped
+    OEM records only have OEM data.
+
+    Attributes:
+        record_id: Record ID of the SEL entry
+        record_type: Raw record type
+        record_type_class: Class of the record
+        sel_state: State of the SEL entry
+        timestamp: Timestamp in seconds since the epoch
+        sensor_type: Type of the sensor which generated the event
+        sensor_number: Sensor number of the sensor
+        sensor_name: Name of the sensor
+        event_direction: Assertion or deassertion event
+        event_offset_type: Type of the event offset
+        event_offset: Event offset
+        event_offset_string: Event offset as a string
+        event_type_code: Event type code
+        event_data: Tuple with event data 1, 2 and 3
+        manufacturer_id: Manufacturer ID of an OEM record
+        oem_data: OEM data bytes
+    """
+
+    __slots__ = (
+        'record_id',
+        'record_type',
+        'record_type_class',
+        'sel_state',
+        'timestamp',
+        'sensor_type',
+        'sensor_number',
+        'sensor_name',
+        'event_direction',
+        'event_offset_type',
+        'event_offset',
+        'event_offset_string',
+        'event_type_code',
+        'event_data',
+        'manufacturer_id',
+        'oem_data',
+    )
+
+    record_id : int
+    record_type : int
+    record_type_class : IpmiMonitoringSelRecordTypeClass
+    sel_state : IpmiMonitoringState
+    timestamp : object
+    sensor_type : object
+    sensor_number : object
+    sensor_name : object
+    event_direction : object
+    event_offset_type : object
+    event_offset : object
+    event_offset_string : object
+    event_type_code : object
+    event_data : object
+    manufacturer_id : object
+    oem_data : object
+
+class IpmiMonitoringSweep:
+    """Immutable snapshot of a complete sensor sweep.
+
+    A sweep is a read-only sequence of IpmiMonitoringSensorData records
+    which does not depend on the context it was read with, so the
+    context can be used for the next read straight away.
+
+    Attributes:
+        hostname: Hostname the sweep was read from
+        timestamp: Time when the sweep was completed, as from time.time()
+        records: Tuple of IpmiMonitoringSensorData records
+    """
+
+    __slots__ = ('hostname', 'timestamp', 'records')
+
+    def __init__(self, hostname, records, timestamp = None):
+        """Initialize a sweep.
+
+        Args:
+            hostname (str): Hostname the sweep was read from
+            records (iterable): IpmiMonitoringSensorData records
+            timestamp (float, optional): Completion time, defaults to now
+        """
+
+        object.__setattr__(self, 'hostname', hostname)
+        object.__setattr__(self, 'timestamp', time.time() if timestamp is None else timestamp)
+        object.__setattr__(self, 'records', tuple(records))
+
+    def __setattr__(self, k, v):
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __getitem__(self, i):
+        return self.records[i]
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self.hostname!r} {len(self.records)} records>"
 
 class IpmiMonitoringContext:
     """Main context class for IPMI monitoring operations.
@@ -232,7 +483,8 @@ class IpmiMonitoringContext:
             init_flags = 0,
             sdr_cache_directory = None,
             sdr_cache_filenames = None,
-            sensor_config_file = None):
+            sensor_config_file = None,
+            metadata_index = None):
         """Initialize the IPMI monitoring context.
 
         Args:
@@ -240,26 +492,71 @@ class IpmiMonitoringContext:
             username (str, optional): Username for out-of-band communication
             password (str, optional): Password for out-of-band communication
             config (IpmiMonitoringConfig, optional): IPMI configuration settings
-            init_flags (int): Initialization flags for the library
+            init_flags (int): Initialization flags for the library, only
+                used by the first context created in the process
             sdr_cache_directory (str, optional): Directory for SDR cache files
             sdr_cache_filenames (str, optional): Filename format for SDR cache files
             sensor_config_file (str, optional): Path to sensor configuration file
+            metadata_index (SensorMetadataIndex or bool, optional): Index
+                of static sensor metadata, so that sweeps only read the
+                state, reading and bitmask of known sensors.  True
+                creates an index for the SDR cache settings of this
+                context.  See sensorindex.
         """
-        self.lib = ffi.dlopen("libipmimonitoring.so.6")
-        errnum = ffi.new("int *")
-        result = self.lib.ipmi_monitoring_init(init_flags, errnum)
-        if result != 0:
-            errstr = lib.ipmi_monitoring_ctx_strerror(errnum[0])
-            raise IpmiMonitoringError(f"Failed to initialize libipmimonitoring: {errstr}")
+        self.lib = get_library(init_flags)
 
         self.ctx = self.lib.ipmi_monitoring_ctx_create()
         if not self.ctx:
             raise IpmiMonitoringError("Failed to create IPMI context")
 
+        # The API mode extension can extract a whole sweep with a
+        # single call into a preallocated array of records
+        self._read_records = getattr(self.lib, 'pyipmimonitoring_sensor_read_records', None)
+        self._sensor_records = None
+        self._read_record = getattr(self.lib, 'pyipmimonitoring_sensor_read_record', None)
+
+        # Buffers reused for every SEL record
+        self._sel_timestamp = ffi.new("unsigned int *")
+        self._sel_event_data = ffi.new("unsigned int[3]")
+        self._sel_oem_data = ffi.new("unsigned char[]", _SEL_OEM_DATA_LEN)
+
+        # Incremented for every sensor read, so that a lazy read can
+        # detect that another read has taken over the iterator
+        self._sweep = 0
+
+        # State for streaming records with a callback, see read_sensors
+        self._on_record = None
+        self._callback_count = 0
+        self._callback_aborted = False
+        self._callback_error = None
+
+        # Sensor names by record ID and bitmask strings by bitmask type
+        # and bitmask, reused between sweeps
+        self._sensor_names = {}
+        self._bitmask_strings = {}
+
+        if metadata_index is True:
+            from .sensorindex import SensorMetadataIndex
+            metadata_index = SensorMetadataIndex(sdr_cache_directory, sdr_cache_filenames)
+        self.metadata_index = metadata_index or None
+
+        # Metadata of the current sweep by record ID and the metadata
+        # learnt from it, see _start_sweep
+        self._metadata = None
+        self._metadata_flags = 0
+        self._metadata_stamp = None
+        self._learned = None
+
+        # Record IDs which name selectors resolved to, see _resolve_names
+        self._selections = {}
+
         self.config = config or IpmiMonitoringConfig()
 
         self.hostname = hostname
 
+        self._sdr_cache_directory = None
+        self._sdr_cache_filenames = None
+
         # Override username and password in the config
         if username is not None:
             self.config.username = username
@@ -269,6 +566,9 @@ class IpmiMonitoringContext:
         if sdr_cache_directory:
             self.set_sdr_cache_directory(sdr_cache_directory)
 
+        if sdr_cache_filenames:
+            self.set_sdr_cache_filenames(sdr_cache_filenames)
+
         if sensor_config_file:
             self.set_sensor_config_file(sensor_config_file)
 
@@ -286,7 +586,7 @@ class IpmiMonitoringContext:
         config_file_ptr = cffi_encode_string(ffi, config_file)
         result = self.lib.ipmi_monitoring_ctx_sel_config_file(self.ctx, config_file_ptr)
         if result != 0:
-            raise IpmiMonitoringError(f"Failed to set SEL config file: {self._get_error()}")
+            raise self._error("Failed to set SEL config file")
 
     def set_sensor_config_file(self, path):
         """Set sensor configuration file.
@@ -298,7 +598,7 @@ class IpmiMonitoringContext:
         path_ptr = cffi_encode_string(ffi, path)
         result = self.lib.ipmi_monitoring_ctx_sensor_config_file(self.ctx, path_ptr)
         if result != 0:
-            raise IpmiMonitoringError(f"Failed to set sensor config file: {self._get_error()}")
+            raise self._error("Failed to set sensor config file")
 
     def set_sdr_cache_directory(self, path):
         """Set SDR cache directory.
@@ -309,7 +609,8 @@ class IpmiMonitoringContext:
         path_ptr = cffi_encode_string(ffi, path)
         result = self.lib.ipmi_monitoring_ctx_sdr_cache_directory(self.ctx, path_ptr)
         if result != 0:
-            raise IpmiMonitoringError(f"Failed to set SDR cache directory: {self._get_error()}")
+            raise self._error("Failed to set SDR cache directory")
+        self._sdr_cache_directory = path
 
     def set_sdr_cache_filenames(self, format):
         """Set SDR cache filename format.
@@ -321,7 +622,8 @@ class IpmiMonitoringContext:
         format_ptr = cffi_encode_string(ffi, format)
         result = self.lib.ipmi_monitoring_ctx_sdr_cache_filenames(self.ctx, format_ptr)
         if result != 0:
-            raise IpmiMonitoringError(f"Failed to set SDR cache filename formats: {self._get_error()}")
+            raise self._error("Failed to set SDR cache filename formats")
+        self._sdr_cache_filenames = format
 
     def _get_error(self):
         """Get the last error message.
@@ -332,6 +634,19 @@ class IpmiMonitoringContext:
 
         return ffi.string(self.lib.ipmi_monitoring_ctx_errormsg(self.ctx)).decode('utf-8')
 
+    def _error(self, message):
+        """Create an exception for the last error of the context.
+
+        Args:
+            message (str): Description of what failed
+
+        Returns:
+            IpmiMonitoringError: Exception with the error code
+        """
+
+        return make_error(f"{message}: {self._get_error()}",
+                          self.lib.ipmi_monitoring_ctx_errnum(self.ctx))
+
     def _process_sensor_data(self):
         """Process sensor data and return a IpmiMonitoringSensorData object.
 
@@ -340,82 +655,759 @@ class IpmiMonitoringContext:
         """
 
         record_id = self.lib.ipmi_monitoring_sensor_read_record_id(self.ctx)
+
+        if self._metadata is not None:
+            # The reading is cast by the reading type of the metadata,
+            # so a sensor whose reading type has changed is read in full
+            metadata = self._metadata.get(record_id)
+            if (metadata is not None and metadata.reading_type ==
+                self.lib.ipmi_monitoring_sensor_read_sensor_reading_type(self.ctx)):
+                return self._process_sensor_dynamic(record_id, metadata)
+
         sensor_number = self.lib.ipmi_monitoring_sensor_read_sensor_number(self.ctx)
         sensor_type = self.lib.ipmi_monitoring_sensor_read_sensor_type(self.ctx)
-        sensor_name = ffi.string(self.lib.ipmi_monitoring_sensor_read_sensor_name(self.ctx)).decode('utf-8')
+        sensor_name = self._decode_sensor_name(record_id, self.lib.ipmi_monitoring_sensor_read_sensor_name(self.ctx))
         sensor_state = self.lib.ipmi_monitoring_sensor_read_sensor_state(self.ctx)
         sensor_units = self.lib.ipmi_monitoring_sensor_read_sensor_units(self.ctx)
         sensor_reading_type = self.lib.ipmi_monitoring_sensor_read_sensor_reading_type(self.ctx)
         sensor_reading_ptr = self.lib.ipmi_monitoring_sensor_read_sensor_reading(self.ctx)
         sensor_bitmask_type = self.lib.ipmi_monitoring_sensor_read_sensor_bitmask_type(self.ctx)
         sensor_bitmask = self.lib.ipmi_monitoring_sensor_read_sensor_bitmask(self.ctx)
-        sensor_bitmask_strings_ptr = self.lib.ipmi_monitoring_sensor_read_sensor_bitmask_strings(self.ctx)
         event_reading_type_code = self.lib.ipmi_monitoring_sensor_read_event_reading_type_code(self.ctx)
 
         if sensor_reading_ptr:
-            if sensor_reading_type == IpmiMonitoringSensorReadingType.UNSIGNED_INTEGER8_BOOL.value:
+            if sensor_reading_type == _READING_TYPE_BOOL:
                 sensor_reading = bool(ffi.cast('uint8_t*', sensor_reading_ptr)[0])
-            elif sensor_reading_type == IpmiMonitoringSensorReadingType.UNSIGNED_INTEGER32.value:
+            elif sensor_reading_type == _READING_TYPE_UINT32:
                 sensor_reading = ffi.cast('uint32_t*', sensor_reading_ptr)[0]
-            elif sensor_reading_type == IpmiMonitoringSensorReadingType.DOUBLE.value:
+            elif sensor_reading_type == _READING_TYPE_DOUBLE:
                 sensor_reading = ffi.cast('double*', sensor_reading_ptr)[0]
             else:
                 sensor_reading = f"unknown_type({sensor_reading_type})"
         else:
             sensor_reading = None
 
+        # Only ask the library for the bitmask strings if they are not cached
+        sensor_bitmask_strings = self._bitmask_strings.get((sensor_bitmask_type, sensor_bitmask))
+        if sensor_bitmask_strings is None:
+            sensor_bitmask_strings = self._decode_bitmask_strings(
+                sensor_bitmask_type, sensor_bitmask,
+                self.lib.ipmi_monitoring_sensor_read_sensor_bitmask_strings(self.ctx))
+
+        if self._learned is not None:
+            self._learned[record_id] = (event_reading_type_code, sensor_number, sensor_name,
+                                        sensor_type, sensor_reading_type, sensor_units,
+                                        sensor_bitmask_type)
+
+        return IpmiMonitoringSensorData(
+            record_id = record_id,
+            event_reading_type_code = event_reading_type_code,
+            sensor_number = sensor_number,
+            sensor_name = sensor_name,
+            sensor_type = IPMI_MONITORING_SENSOR_TYPE_TABLE.get(sensor_type),
+            sensor_state= IPMI_MONITORING_STATE_TABLE.get(sensor_state),
+            sensor_reading_type = IPMI_MONITORING_SENSOR_READING_TYPE_TABLE.get(sensor_reading_type),
+            sensor_reading = sensor_reading,
+            sensor_units = IPMI_MONITORING_SENSOR_UNITS_TABLE.get(sensor_units),
+            sensor_bitmask_type = IPMI_MONITORING_SENSOR_BITMASK_TYPE_TABLE.get(sensor_bitmask_type),
+            sensor_bitmask= sensor_bitmask,
+            sensor_bitmask_strings = sensor_bitmask_strings)
+
+    def _process_sensor_dynamic(self, record_id, metadata):
+        """Read the dynamic fields of a known sensor and join them with its metadata.
+
+        Args:
+            record_id (int): Record ID of the sensor
+            metadata (SensorMetadata): Static metadata of the sensor
+
+        Returns:
+            IpmiMonitoringSensorData: Processed sensor data
+        """
+
+        sensor_state = self.lib.ipmi_monitoring_sensor_read_sensor_state(self.ctx)
+        sensor_reading_ptr = self.lib.ipmi_monitoring_sensor_read_sensor_reading(self.ctx)
+        sensor_bitmask = self.lib.ipmi_monitoring_sensor_read_sensor_bitmask(self.ctx)
+
+        if sensor_reading_ptr:
+            sensor_reading_type = metadata.reading_type
+            if sensor_reading_type == _READING_TYPE_BOOL:
+                sensor_reading = bool(ffi.cast('uint8_t*', sensor_reading_ptr)[0])
+            elif sensor_reading_type == _READING_TYPE_UINT32:
+                sensor_reading = ffi.cast('uint32_t*', sensor_reading_ptr)[0]
+            elif sensor_reading_type == _READING_TYPE_DOUBLE:
+                sensor_reading = ffi.cast('double*', sensor_reading_ptr)[0]
+            else:
+                sensor_reading = f"unknown_type({sensor_reading_type})"
+        else:
+            sensor_reading = None
+
+        sensor_bitmask_type = metadata.bitmask_type
+        sensor_bitmask_strings = self._bitmask_strings.get((sensor_bitmask_type, sensor_bitmask))
+        if sensor_bitmask_strings is None:
+            sensor_bitmask_strings = self._decode_bitmask_strings(
+                sensor_bitmask_type, sensor_bitmask,
+                self.lib.ipmi_monitoring_sensor_read_sensor_bitmask_strings(self.ctx))
+
+        return IpmiMonitoringSensorData(
+            record_id = record_id,
+            event_reading_type_code = metadata.event_reading_type_code,
+            sensor_number = metadata.sensor_number,
+            sensor_name = metadata.sensor_name,
+            sensor_type = metadata.sensor_type,
+            sensor_state= IPMI_MONITORING_STATE_TABLE.get(sensor_state),
+            sensor_reading_type = metadata.sensor_reading_type,
+            sensor_reading = sensor_reading,
+            sensor_units = metadata.sensor_units,
+            sensor_bitmask_type = metadata.sensor_bitmask_type,
+            sensor_bitmask= sensor_bitmask,
+            sensor_bitmask_strings = sensor_bitmask_strings)
+
+    def _decode_sensor_name(self, record_id, sensor_name_ptr):
+        """Decode a sensor name, reusing the string from earlier sweeps.
+
+        The name is compared with the cached name of the record in
+        place, so nothing is copied or allocated for a sensor whose
+        name has not changed.
+
+        Args:
+            record_id (int): Record ID of the sensor
+            sensor_name_ptr: char * from libipmimonitoring
+
+        Returns:
+            str: Sensor name
+        """
+
+        cached = self._sensor_names.get(record_id)
+        if cached is not None and self.lib.strcmp(sensor_name_ptr, cached[0]) == 0:
+            return cached[1]
+
+        raw = ffi.string(sensor_name_ptr)
+        sensor_name = raw.decode('utf-8')
+        self._sensor_names[record_id] = (raw, sensor_name)
+        return sensor_name
+
+    def _decode_bitmask_strings(self, sensor_bitmask_type, sensor_bitmask, sensor_bitmask_strings_ptr):
+        """Decode a NULL terminated array of bitmask strings.
+
+        The strings for the standard bitmask types only depend on the
+        type and the bitmask, so the result is cached and shared
+        between records.
+
+        Args:
+            sensor_bitmask_type (int): Bitmask type of the sensor
+            sensor_bitmask (int): Bitmask of the sensor
+            sensor_bitmask_strings_ptr: char ** from libipmimonitoring
+
+        Returns:
+            tuple: Bitmask strings
+        """
+
         sensor_bitmask_strings = []
         if sensor_bitmask_strings_ptr:
             i = 0
             while sensor_bitmask_strings_ptr[i]:
                 sensor_bitmask_strings.append(ffi.string(sensor_bitmask_strings_ptr[i]).decode('utf-8'))
                 i += 1
+        sensor_bitmask_strings = tuple(sensor_bitmask_strings)
+
+        if sensor_bitmask_type not in _UNCACHED_BITMASK_TYPES:
+            self._bitmask_strings[(sensor_bitmask_type, sensor_bitmask)] = sensor_bitmask_strings
+        return sensor_bitmask_strings
+
+    def _process_sensor_record(self, record):
+        """Process a record filled in by the batched C helper.
+
+        Args:
+            record: struct pyipmimonitoring_sensor_record
+
+        Returns:
+            IpmiMonitoringSensorData: Processed sensor data
+        """
+
+        sensor_reading_type = record.sensor_reading_type
+        sensor_bitmask_type = record.sensor_bitmask_type
+        sensor_bitmask = record.sensor_bitmask
+
+        if record.has_reading:
+            if sensor_reading_type == _READING_TYPE_BOOL:
+                sensor_reading = bool(record.reading.bool_value)
+            elif sensor_reading_type == _READING_TYPE_UINT32:
+                sensor_reading = record.reading.uint32_value
+            elif sensor_reading_type == _READING_TYPE_DOUBLE:
+                sensor_reading = record.reading.double_value
+            else:
+                sensor_reading = f"unknown_type({sensor_reading_type})"
+        else:
+            sensor_reading = None
+
+        sensor_bitmask_strings = self._bitmask_strings.get((sensor_bitmask_type, sensor_bitmask))
+        if sensor_bitmask_strings is None:
+            sensor_bitmask_strings = self._decode_bitmask_strings(
+                sensor_bitmask_type, sensor_bitmask, record.sensor_bitmask_strings)
+
+        if self._metadata is not None:
+            # The batched helper has already fetched every field, but
+            # the metadata saves decoding the name and the enum lookups
+            metadata = self._metadata.get(record.record_id)
+            if metadata is not None:
+                return IpmiMonitoringSensorData(
+                    record_id = record.record_id,
+                    event_reading_type_code = metadata.event_reading_type_code,
+                    sensor_number = metadata.sensor_number,
+                    sensor_name = metadata.sensor_name,
+                    sensor_type = metadata.sensor_type,
+                    sensor_state= IPMI_MONITORING_STATE_TABLE.get(record.sensor_state),
+                    sensor_reading_type = metadata.sensor_reading_type,
+                    sensor_reading = sensor_reading,
+                    sensor_units = metadata.sensor_units,
+                    sensor_bitmask_type = metadata.sensor_bitmask_type,
+                    sensor_bitmask= sensor_bitmask,
+                    sensor_bitmask_strings = sensor_bitmask_strings)
+
+        sensor_name = self._decode_sensor_name(record.record_id, record.sensor_name)
+        if self._learned is not None:
+            self._learned[record.record_id] = (record.event_reading_type_code, record.sensor_number,
+                                               sensor_name, record.sensor_type, sensor_reading_type,
+                                               record.sensor_units, sensor_bitmask_type)
 
         return IpmiMonitoringSensorData(
-            record_id = record_id,
-            event_reading_type_code = event_reading_type_code,
-            sensor_number = sensor_number,
+            record_id = record.record_id,
+            event_reading_type_code = record.event_reading_type_code,
+            sensor_number = record.sensor_number,
             sensor_name = sensor_name,
-            sensor_type = IpmiMonitoringSensorType(sensor_type),
-            sensor_state= IpmiMonitoringState(sensor_state),
-            sensor_reading_type = IpmiMonitoringSensorReadingType(sensor_reading_type),
+            sensor_type = IPMI_MONITORING_SENSOR_TYPE_TABLE.get(record.sensor_type),
+            sensor_state= IPMI_MONITORING_STATE_TABLE.get(record.sensor_state),
+            sensor_reading_type = IPMI_MONITORING_SENSOR_READING_TYPE_TABLE.get(sensor_reading_type),
             sensor_reading = sensor_reading,
-            sensor_units = IpmiMonitoringSensorUnits(sensor_units),
-            sensor_bitmask_type = IpmiMonitoringSensorBitmaskType(sensor_bitmask_type),
+            sensor_units = IPMI_MONITORING_SENSOR_UNITS_TABLE.get(record.sensor_units),
+            sensor_bitmask_type = IPMI_MONITORING_SENSOR_BITMASK_TYPE_TABLE.get(sensor_bitmask_type),
             sensor_bitmask= sensor_bitmask,
             sensor_bitmask_strings = sensor_bitmask_strings)
 
+    def _get_sensor_records(self, sensor_count):
+        """Get a record array for the batched C helper.
+
+        The array is kept between sweeps and only reallocated when a
+        sweep returns more sensors than it can hold.
+
+        Args:
+            sensor_count (int): Number of records needed
+
+        Returns:
+            cdata: struct pyipmimonitoring_sensor_record[]
+        """
+
+        if self._sensor_records is None or len(self._sensor_records) < sensor_count:
+            self._sensor_records = ffi.new("struct pyipmimonitoring_sensor_record[]", max(sensor_count, 1))
+        return self._sensor_records
+
     DEFAULT_READING_FLAGS = IpmiMonitoringSensorReadingFlags.IGNORE_NON_INTERPRETABLE_SENSORS.value
 
-    def _read_common(self, sensor_count):
+    def _start_sweep(self, reading_flags = None):
+        """Start a new sensor read on the context.
+
+        Args:
+            reading_flags (int, optional): Sensor reading flags of the
+                read, None if the read does not use the metadata index
+
+        Returns:
+            int: Sweep number used to detect interleaved reads
+        """
+
+        self._sweep += 1
+
+        self._metadata = None
+        self._learned = None
+        if self.metadata_index is not None and reading_flags is not None:
+            # The stamp is taken before the lookup, so that any change
+            # of the SDR cache file after it is seen by _check_metadata
+            self._metadata_stamp = self.metadata_index.stamp(self.hostname)
+            self._metadata = self.metadata_index.lookup(self.hostname, reading_flags)
+            if self._metadata is not None:
+                self._metadata_flags = reading_flags
+                self._learned = {}
+
+        return self._sweep
+
+    def _check_metadata(self):
+        """Drop the metadata of the sweep if the SDR cache has changed.
+
+        The library re-reads the SDR in the readings call when it finds
+        that the SDR has changed, so the metadata looked up before the
+        call may not match the sensors read.  Called once the readings
+        call has returned, or from the first callback.
+        """
+
+        if self._metadata and self.metadata_index.stamp(self.hostname) != self._metadata_stamp:
+            self._metadata = {}
+
+    def _finish_sweep(self):
+        """Free the sensor iterator and save what was learnt about the sensors."""
+
+        self.lib.ipmi_monitoring_sensor_iterator_destroy(self.ctx)
+
+        learned = self._learned
+        self._metadata = None
+        self._learned = None
+        if learned:
+            self.metadata_index.update(self.hostname, self._metadata_flags, learned)
+
+    def _check_sweep(self, sweep):
+        """Check that no other read has started since sweep.
+
+        Args:
+            sweep (int): Sweep number from _start_sweep
+        """
+
+        if sweep != self._sweep:
+            raise IpmiMonitoringError("Sensor read interrupted by another read on the same context")
+
+    def _read_common(self, sensor_count, sweep):
         """Common helper method whichs reads sensor records.
 
         Args:
             sensor_count (int): Number of sensors to read
+            sweep (int): Sweep number from _start_sweep
 
         Yields:
             IpmiMonitoringSensorData: Processed sensor data
         """
 
         if sensor_count < 0:
-            raise IpmiMonitoringError(f"Failed to read sensor data: {self._get_error()}")
+            raise self._error("Failed to read sensor data")
+
+        if self._read_records is not None:
+            # Extract the whole sweep with a single call into C
+            self._check_sweep(sweep)
+            records = self._get_sensor_records(sensor_count)
+            count = self._read_records(self.ctx, records, sensor_count)
+            for i in range(count):
+                self._check_sweep(sweep)
+                yield self._process_sensor_record(records[i])
 
+        else:
+            for _ in range(sensor_count):
+                self._check_sweep(sweep)
+                record = self._process_sensor_data()
+                yield record
+
+                self.lib.ipmi_monitoring_sensor_iterator_next(self.ctx)
+
+        self._check_sweep(sweep)
+        self._finish_sweep()
+
+    def _read_snapshot(self, sensor_count):
+        """Read all sensor records into a sweep and free the iterator.
+
+        Args:
+            sensor_count (int): Number of sensors to read
+
+        Returns:
+            IpmiMonitoringSweep: The sensor records
+        """
+
+        if sensor_count < 0:
+            raise self._error("Failed to read sensor data")
+
+        if self._read_records is not None:
+            records = self._get_sensor_records(sensor_count)
+            count = self._read_records(self.ctx, records, sensor_count)
+            process = self._process_sensor_record
+            result = [ process(records[i]) for i in range(count) ]
+
+        else:
+            result = self._read_snapshot_fields(sensor_count)
+
+        self._finish_sweep()
+
+        return IpmiMonitoringSweep(self.hostname, result)
+
+    def _read_snapshot_fields(self, sensor_count):
+        """Read the records of a sweep with one library call per field.
+
+        Does the same as _process_sensor_data for every record, but
+        with the library functions, caches and tables bound to locals
+        once for the sweep instead of looked up again for every record.
+
+        Args:
+            sensor_count (int): Number of sensors to read
+
+        Returns:
+            list: IpmiMonitoringSensorData records
+        """
+
+        c = self.ctx
+        lib = self.lib
+        read_record_id = lib.ipmi_monitoring_sensor_read_record_id
+        read_sensor_number = lib.ipmi_monitoring_sensor_read_sensor_number
+        read_sensor_type = lib.ipmi_monitoring_sensor_read_sensor_type
+        read_sensor_name = lib.ipmi_monitoring_sensor_read_sensor_name
+        read_sensor_state = lib.ipmi_monitoring_sensor_read_sensor_state
+        read_sensor_units = lib.ipmi_monitoring_sensor_read_sensor_units
+        read_sensor_reading_type = lib.ipmi_monitoring_sensor_read_sensor_reading_type
+        read_sensor_reading = lib.ipmi_monitoring_sensor_read_sensor_reading
+        read_sensor_bitmask_type = lib.ipmi_monitoring_sensor_read_sensor_bitmask_type
+        read_sensor_bitmask = lib.ipmi_monitoring_sensor_read_sensor_bitmask
+        read_event_reading_type_code = lib.ipmi_monitoring_sensor_read_event_reading_type_code
+        iterator_next = lib.ipmi_monitoring_sensor_iterator_next
+
+        cast = ffi.cast
+        decode_sensor_name = self._decode_sensor_name
+        bitmask_strings_cache = self._bitmask_strings
+        sensor_type_table = IPMI_MONITORING_SENSOR_TYPE_TABLE.get
+        state_table = IPMI_MONITORING_STATE_TABLE.get
+        reading_type_table = IPMI_MONITORING_SENSOR_READING_TYPE_TABLE.get
+        units_table = IPMI_MONITORING_SENSOR_UNITS_TABLE.get
+        bitmask_type_table = IPMI_MONITORING_SENSOR_BITMASK_TYPE_TABLE.get
+        metadata = self._metadata
+        learned = self._learned
+
+        result = []
+        append = result.append
         for _ in range(sensor_count):
+            record_id = read_record_id(c)
+            sensor_reading_type = read_sensor_reading_type(c)
+
+            if metadata:
+                # The reading is cast by the reading type of the
+                # metadata, so a sensor whose reading type has changed
+                # is read in full
+                m = metadata.get(record_id)
+                if m is not None and m.reading_type == sensor_reading_type:
+                    append(self._process_sensor_dynamic(record_id, m))
+                    iterator_next(c)
+                    continue
+
+            sensor_number = read_sensor_number(c)
+            sensor_type = read_sensor_type(c)
+            sensor_name = decode_sensor_name(record_id, read_sensor_name(c))
+            sensor_state = read_sensor_state(c)
+            sensor_units = read_sensor_units(c)
+            sensor_reading_ptr = read_sensor_reading(c)
+            sensor_bitmask_type = read_sensor_bitmask_type(c)
+            sensor_bitmask = read_sensor_bitmask(c)
+            event_reading_type_code = read_event_reading_type_code(c)
+
+            if sensor_reading_ptr:
+                if sensor_reading_type == _READING_TYPE_DOUBLE:
+                    sensor_reading = cast(_DOUBLE_P, sensor_reading_ptr)[0]
+                elif sensor_reading_type == _READING_TYPE_BOOL:
+                    sensor_reading = bool(cast(_UINT8_P, sensor_reading_ptr)[0])
+                elif sensor_reading_type == _READING_TYPE_UINT32:
+                    sensor_reading = cast(_UINT32_P, sensor_reading_ptr)[0]
+                else:
+                    sensor_reading = f"unknown_type({sensor_reading_type})"
+            else:
+                sensor_reading = None
+
+            sensor_bitmask_strings = bitmask_strings_cache.get((sensor_bitmask_type, sensor_bitmask))
+            if sensor_bitmask_strings is None:
+                sensor_bitmask_strings = self._decode_bitmask_strings(
+                    sensor_bitmask_type, sensor_bitmask,
+                    lib.ipmi_monitoring_sensor_read_sensor_bitmask_strings(c))
+
+            if learned is not None:
+                learned[record_id] = (event_reading_type_code, sensor_number, sensor_name,
+                                      sensor_type, sensor_reading_type, sensor_units,
+                                      sensor_bitmask_type)
+
+            append(IpmiMonitoringSensorData(
+                record_id = record_id,
+                event_reading_type_code = event_reading_type_code,
+                sensor_number = sensor_number,
+                sensor_name = sensor_name,
+                sensor_type = sensor_type_table(sensor_type),
+                sensor_state= state_table(sensor_state),
+                sensor_reading_type = reading_type_table(sensor_reading_type),
+                sensor_reading = sensor_reading,
+                sensor_units = units_table(sensor_units),
+                sensor_bitmask_type = bitmask_type_table(sensor_bitmask_type),
+                sensor_bitmask= sensor_bitmask,
+                sensor_bitmask_strings = sensor_bitmask_strings))
+
+            iterator_next(c)
+
+        return result
+
+    def _read_result(self, sensor_count, sweep, on_record, snapshot):
+        """Return the result of a sensor readings call in the requested form.
+
+        Args:
+            sensor_count (int): Return value from the readings function
+            sweep (int): Sweep number from _start_sweep
+            on_record (callable): Callback passed to the read function or None
+            snapshot (bool): Return an IpmiMonitoringSweep
+
+        Returns:
+            See read_sensors
+        """
+
+        if on_record is not None:
+            return self._read_callback(sensor_count)
+
+        self._check_metadata()
+        if snapshot:
+            return self._read_snapshot(sensor_count)
+        return self._read_common(sensor_count, sweep)
+
+    def _deliver_sensor_record(self):
+        """Pass the current sensor to the on_record callback.
+
+        Called from the library callback while a sweep is in progress.
+
+        Returns:
+            int: 0 to continue, -1 to stop the sweep
+        """
+
+        if self._callback_count == 0:
+            self._check_metadata()
+
+        if self._read_record is not None:
+            records = self._get_sensor_records(1)
+            self._read_record(self.ctx, records)
+            record = self._process_sensor_record(records[0])
+        else:
             record = self._process_sensor_data()
-            yield record
 
-            self.lib.ipmi_monitoring_sensor_iterator_next(self.ctx)
+        self._callback_count += 1
+        if self._on_record(record):
+            self._callback_aborted = True
+            return -1
+        return 0
+
+    def _callback_args(self, on_record):
+        """Get the callback arguments for a sensor readings function.
+
+        Args:
+            on_record (callable): Function to call for each record or None
+
+        Returns:
+            tuple: callback and callback_data for libipmimonitoring
+        """
+
+        if on_record is None:
+            return ffi.NULL, ffi.NULL
+
+        self._on_record = on_record
+        self._callback_count = 0
+        self._callback_aborted = False
+        self._callback_error = None
+        return _get_sensor_callback(), ffi.new_handle(self)
+
+    def _read_callback(self, sensor_count):
+        """Finish a sweep where records were delivered with a callback.
+
+        Args:
+            sensor_count (int): Return value from the readings function
+
+        Returns:
+            int: Number of records delivered to the callback
+        """
+
+        self._on_record = None
+
+        error = self._callback_error
+        if error is not None:
+            self._callback_error = None
+            raise error
+
+        if sensor_count < 0 and not self._callback_aborted:
+            raise self._error("Failed to read sensor data")
 
-    def read_sensors(self, reading_flags = DEFAULT_READING_FLAGS):
+        # All records have already been delivered, the library does not
+        # need to keep them around
+        self._finish_sweep()
+
+        return self._callback_count
+
+    def read_sensors(self, reading_flags = DEFAULT_READING_FLAGS, on_record = None, snapshot = False,
+                     names = None):
         """Read sensor data.
 
+        By default the records are returned by a generator which reads
+        them from the library as it is consumed.  The context must not
+        be used for another read until the generator is exhausted,
+        doing so makes the generator raise IpmiMonitoringError.
+
+        With snapshot set, all records are read into an
+        IpmiMonitoringSweep before returning and the context can be
+        reused immediately.
+
+        If on_record is given, each record is passed to it as soon as
+        the library has read the sensor, instead of after the whole
+        sweep has completed.  Returning a true value from on_record
+        stops the sweep early.
+
+        If names is given, only the sensors whose name matches are
+        read, see selector.SensorSelector.  The names are resolved to
+        record IDs from the SDR cache file of the host if possible,
+        otherwise from a full sweep, and only those record IDs are
+        read from then on.  The record IDs are resolved again when the
+        SDR cache file changes or the SDR cache is re-read, and every
+        60 reads if there is no SDR cache file.
+
+        Args:
+            reading_flags (int): Sensor reading flags to use
+            on_record (callable, optional): Function called with each
+                IpmiMonitoringSensorData object
+            snapshot (bool): Return an IpmiMonitoringSweep
+            names (optional): Glob pattern, compiled regular expression,
+                a list of them or a SensorSelector
+
+        Returns:
+            generator: Generator yielding IpmiMonitoringSensorData objects,
+                an IpmiMonitoringSweep if snapshot is set, or if on_record
+                is given the number of records delivered
+        """
+
+        if names is not None:
+            return self._read_sensors_by_name(names, reading_flags, on_record, snapshot)
+
+        sweep = self._start_sweep(reading_flags)
+        callback, callback_data = self._callback_args(on_record)
+        sensor_count = self.lib.ipmi_monitoring_sensor_readings_by_record_id(
+            self.ctx,
+            cffi_encode_string(ffi, self.hostname),
+            self.config._obj,
+            reading_flags,
+            ffi.NULL, 0,
+            callback, callback_data
+        )
+        return self._read_result(sensor_count, sweep, on_record, snapshot)
+
+    def _sdr_cache_stamp(self):
+        """Return the modification time and size of the SDR cache file of the host.
+
+        Returns:
+            tuple: (st_mtime_ns, st_size), or None if there is no file
+        """
+
+        from .sdrcache import sdr_cache_path
+
+        try:
+            st = os.stat(sdr_cache_path(self.hostname, self._sdr_cache_directory,
+                                        self._sdr_cache_filenames))
+            return (st.st_mtime_ns, st.st_size)
+
+        except OSError:
+            return None
+
+    def _resolve_names(self, selector, reading_flags):
+        """Resolve a name selector to record IDs without reading sensors.
+
+        Args:
+            selector (SensorSelector): The selector
+            reading_flags (int): Sensor reading flags of the read
+
+        Returns:
+            list: Record IDs, or None if they are not known
+        """
+
+        from .sdrcache import SdrCache, IpmiMonitoringSdrCacheError
+
+        if reading_flags & _REREAD_SDR_CACHE:
+            return None
+
+        key = (self.hostname, selector, reading_flags)
+        stamp = self._sdr_cache_stamp()
+        cached = self._selections.get(key)
+        if cached is not None and cached[0] == stamp:
+            reads = cached[2]
+            if reads is None:
+                return cached[1]
+            if reads > 0:
+                cached[2] = reads - 1
+                return cached[1]
+
+        record_ids = None
+
+        # The library builds other names than those in the SDR with these flags
+        if stamp is not None and not reading_flags & _SDR_NAME_FLAGS:
+            try:
+                with SdrCache.open_host(self.hostname, self._sdr_cache_directory,
+                                        self._sdr_cache_filenames) as cache:
+                    record_ids = selector.select((s.record_id, s.sensor_name) for s in cache)
+
+            except (OSError, IpmiMonitoringSdrCacheError):
+                pass
+
+        if record_ids is not None:
+            self._selections[key] = [ stamp, record_ids, None ]
+        return record_ids
+
+    def _read_sensors_by_name(self, names, reading_flags, on_record, snapshot):
+        """Read the sensors selected by name, see read_sensors."""
+
+        from .selector import SensorSelector
+
+        selector = names if isinstance(names, SensorSelector) else SensorSelector(names)
+
+        record_ids = self._resolve_names(selector, reading_flags)
+        if record_ids:
+            # With SHARED_SENSORS several sensors can have the same
+            # record ID, so the records are filtered by name as well
+            match = selector.match
+            if on_record is not None:
+                count = 0
+                def on_selected(record):
+                    nonlocal count
+                    if not match(record.sensor_name):
+                        return False
+                    count += 1
+                    return on_record(record)
+                self.read_sensors_by_record_id(record_ids, reading_flags, on_selected)
+                return count
+
+            records = self.read_sensors_by_record_id(record_ids, reading_flags, snapshot = snapshot)
+            if snapshot:
+                return IpmiMonitoringSweep(self.hostname,
+                                           [ r for r in records if match(r.sensor_name) ],
+                                           records.timestamp)
+            return (r for r in records if match(r.sensor_name))
+
+        if record_ids is None:
+            # Read all sensors once and remember which were selected
+            sweep = self.read_sensors(reading_flags, snapshot = True)
+            records = [ r for r in sweep if selector.match(r.sensor_name) ]
+            key = (self.hostname, selector, reading_flags & ~_REREAD_SDR_CACHE)
+            stamp = self._sdr_cache_stamp()
+            self._selections[key] = [ stamp, [ r.record_id for r in records ],
+                                      None if stamp is not None else _UNSTAMPED_SELECTION_READS ]
+        else:
+            # Nothing matches, reading by an empty list of record IDs
+            # would read all sensors
+            sweep = None
+            records = []
+
+        if on_record is not None:
+            count = 0
+            for record in records:
+                count += 1
+                if on_record(record):
+                    break
+            return count
+        if snapshot:
+            return IpmiMonitoringSweep(self.hostname, records,
+                                       sweep.timestamp if sweep is not None else None)
+        return iter(records)
+
+    def read_sensors_frame(self, reading_flags = DEFAULT_READING_FLAGS):
+        """Read sensor data into a columnar SensorFrame.
+
+        The sweep is extracted straight into NumPy arrays without
+        creating an IpmiMonitoringSensorData object per sensor.
+        Requires NumPy.
+
         Args:
             reading_flags (int): Sensor reading flags to use
 
         Returns:
-            generator: Generator yielding IpmiMonitoringSensorData objects
+            SensorFrame: The sensor data
         """
 
+        from .frame import read_frame
+
+        self._start_sweep()
         sensor_count = self.lib.ipmi_monitoring_sensor_readings_by_record_id(
             self.ctx,
             cffi_encode_string(ffi, self.hostname),
@@ -424,48 +1416,268 @@ class IpmiMonitoringContext:
             ffi.NULL, 0,
             ffi.NULL, ffi.NULL
         )
-        return self._read_common(sensor_count)
+        if sensor_count < 0:
+            raise self._error("Failed to read sensor data")
 
-    def read_sensors_by_record_id(self, record_ids, reading_flags = DEFAULT_READING_FLAGS):
+        frame = read_frame(self, ffi, sensor_count)
+        self.lib.ipmi_monitoring_sensor_iterator_destroy(self.ctx)
+        return frame
+
+    def read_sensors_by_record_id(self, record_ids, reading_flags = DEFAULT_READING_FLAGS,
+                                  on_record = None, snapshot = False):
         """Read sensor data.  Only return recoreds matching record IDs.
 
         Args:
             record_ids (list): List of record IDs to match
             reading_flags (int): Sensor reading flags to use
+            on_record (callable, optional): Function called with each
+                record, see read_sensors
+            snapshot (bool): Return an IpmiMonitoringSweep, see read_sensors
 
         Returns:
-            generator: Generator yielding IpmiMonitoringSensorData objects
+            generator: Generator yielding IpmiMonitoringSensorData objects,
+                an IpmiMonitoringSweep if snapshot is set, or if on_record
+                is given the number of records delivered
         """
 
         record_ids_array = ffi.new("unsigned int[]", record_ids)
+        sweep = self._start_sweep(reading_flags)
+        callback, callback_data = self._callback_args(on_record)
         sensor_count = self.lib.ipmi_monitoring_sensor_readings_by_record_id(
             self.ctx,
             cffi_encode_string(ffi, self.hostname),
             self.config._obj,
             reading_flags,
             record_ids_array, len(record_ids),
-            ffi.NULL, ffi.NULL
+            callback, callback_data
         )
-        return self._read_common(sensor_count)
+        return self._read_result(sensor_count, sweep, on_record, snapshot)
 
-    def read_sensors_by_sensor_type(self, sensor_types, reading_flags = DEFAULT_READING_FLAGS):
+    def read_sensors_by_sensor_type(self, sensor_types, reading_flags = DEFAULT_READING_FLAGS,
+                                    on_record = None, snapshot = False):
         """Read sensor data.  Only return matching sensor types.
 
         Args:
             sensor_types (list): List of sensor types to match
             reading_flags (int): Sensor reading flags to use
+            on_record (callable, optional): Function called with each
+                record, see read_sensors
+            snapshot (bool): Return an IpmiMonitoringSweep, see read_sensors
 
         Returns:
-            generator: Generator yielding IpmiMonitoringSensorData objects
+            generator: Generator yielding IpmiMonitoringSensorData objects,
+                an IpmiMonitoringSweep if snapshot is set, or if on_record
+                is given the number of records delivered
         """
 
         sensor_types_array = ffi.new("unsigned int[]", sensor_types)
+        sweep = self._start_sweep(reading_flags)
+        callback, callback_data = self._callback_args(on_record)
         sensor_count = self.lib.ipmi_monitoring_sensor_readings_by_sensor_type(
             self.ctx,
             cffi_encode_string(ffi, self.hostname),
             self.config._obj,
             reading_flags,
             sensor_types_array, len(sensor_types),
+            callback, callback_data
+        )
+        return self._read_result(sensor_count, sweep, on_record, snapshot)
+
+    DEFAULT_SEL_FLAGS = 0
+
+    def _process_sel_data(self):
+        """Process the current SEL record.
+
+        Only the fields which apply to the class of the record are read
+        from the library.
+
+        Returns:
+            IpmiMonitoringSelData: Processed SEL data
+        """
+
+        lib = self.lib
+        c = self.ctx
+
+        record_id = lib.ipmi_monitoring_sel_read_record_id(c)
+        record_type = lib.ipmi_monitoring_sel_read_record_type(c)
+        record_type_class = lib.ipmi_monitoring_sel_read_record_type_class(c)
+        sel_state = lib.ipmi_monitoring_sel_read_sel_state(c)
+
+        timestamp = None
+        sensor_type = None
+        sensor_number = None
+        sensor_name = None
+        event_direction = None
+        event_offset_type = None
+        event_offset = None
+        event_offset_string = None
+        event_type_code = None
+        event_data = None
+        manufacturer_id = None
+        oem_data = None
+
+        if record_type_class != _SEL_NON_TIMESTAMPED_OEM_RECORD:
+            if lib.ipmi_monitoring_sel_read_timestamp(c, self._sel_timestamp) >= 0:
+                timestamp = self._sel_timestamp[0]
+
+        if record_type_class == _SEL_SYSTEM_EVENT_RECORD:
+            sensor_type = IPMI_MONITORING_SENSOR_TYPE_TABLE.get(lib.ipmi_monitoring_sel_read_sensor_type(c))
+            sensor_number = lib.ipmi_monitoring_sel_read_sensor_number(c)
+            name_ptr = lib.ipmi_monitoring_sel_read_sensor_name(c)
+            if name_ptr:
+                sensor_name = ffi.string(name_ptr).decode('utf-8')
+            event_direction = IPMI_MONITORING_SEL_EVENT_DIRECTION_TABLE.get(
+                lib.ipmi_monitoring_sel_read_event_direction(c))
+            event_offset_type = IPMI_MONITORING_EVENT_OFFSET_TYPE_TABLE.get(
+                lib.ipmi_monitoring_sel_read_event_offset_type(c))
+            event_offset = lib.ipmi_monitoring_sel_read_event_offset(c)
+            string_ptr = lib.ipmi_monitoring_sel_read_event_offset_string(c)
+            if string_ptr:
+                event_offset_string = ffi.string(string_ptr).decode('utf-8')
+            event_type_code = lib.ipmi_monitoring_sel_read_event_type_code(c)
+            d = self._sel_event_data
+            if lib.ipmi_monitoring_sel_read_event_data(c, d, d + 1, d + 2) >= 0:
+                event_data = (d[0], d[1], d[2])
+
+        else:
+            if record_type_class == _SEL_TIMESTAMPED_OEM_RECORD:
+                manufacturer_id = lib.ipmi_monitoring_sel_read_manufacturer_id(c)
+            n = lib.ipmi_monitoring_sel_read_oem_data(c, self._sel_oem_data, _SEL_OEM_DATA_LEN)
+            if n >= 0:
+                oem_data = ffi.buffer(self._sel_oem_data, n)[:]
+
+        return IpmiMonitoringSelData(
+            record_id = record_id,
+            record_type = record_type,
+            record_type_class = IPMI_MONITORING_SEL_RECORD_TYPE_CLASS_TABLE.get(record_type_class),
+            sel_state = IPMI_MONITORING_STATE_TABLE.get(sel_state),
+            timestamp = timestamp,
+            sensor_type = sensor_type,
+            sensor_number = sensor_number,
+            sensor_name = sensor_name,
+            event_direction = event_direction,
+            event_offset_type = event_offset_type,
+            event_offset = event_offset,
+            event_offset_string = event_offset_string,
+            event_type_code = event_type_code,
+            event_data = event_data,
+            manufacturer_id = manufacturer_id,
+            oem_data = oem_data)
+
+    def _read_sel_common(self, record_count):
+        """Common helper method which reads all SEL records.
+
+        Args:
+            record_count (int): Number of SEL records to read
+
+        Returns:
+            list: IpmiMonitoringSelData records
+        """
+
+        if record_count < 0:
+            raise self._error("Failed to read SEL data")
+
+        process = self._process_sel_data
+        iterator_next = self.lib.ipmi_monitoring_sel_iterator_next
+        records = []
+        for _ in range(record_count):
+            records.append(process())
+            iterator_next(self.ctx)
+
+        self.lib.ipmi_monitoring_sel_iterator_destroy(self.ctx)
+
+        return records
+
+    def read_sel(self, sel_flags = DEFAULT_SEL_FLAGS):
+        """Read all System Event Log records.
+
+        Args:
+            sel_flags (int): SEL flags to use
+
+        Returns:
+            list: IpmiMonitoringSelData records
+        """
+
+        record_count = self.lib.ipmi_monitoring_sel_by_record_id(
+            self.ctx,
+            cffi_encode_string(ffi, self.hostname),
+            self.config._obj,
+            sel_flags,
+            ffi.NULL, 0,
+            ffi.NULL, ffi.NULL
+        )
+        return self._read_sel_common(record_count)
+
+    def read_sel_by_record_id(self, record_ids, sel_flags = DEFAULT_SEL_FLAGS):
+        """Read System Event Log records.  Only return records matching record IDs.
+
+        Args:
+            record_ids (list): List of record IDs to match
+            sel_flags (int): SEL flags to use
+
+        Returns:
+            list: IpmiMonitoringSelData records
+        """
+
+        record_ids_array = ffi.new("unsigned int[]", record_ids)
+        record_count = self.lib.ipmi_monitoring_sel_by_record_id(
+            self.ctx,
+            cffi_encode_string(ffi, self.hostname),
+            self.config._obj,
+            sel_flags,
+            record_ids_array, len(record_ids),
+            ffi.NULL, ffi.NULL
+        )
+        return self._read_sel_common(record_count)
+
+    def read_sel_by_sensor_type(self, sensor_types, sel_flags = DEFAULT_SEL_FLAGS):
+        """Read System Event Log records.  Only return matching sensor types.
+
+        Args:
+            sensor_types (list): List of sensor types to match
+            sel_flags (int): SEL flags to use
+
+        Returns:
+            list: IpmiMonitoringSelData records
+        """
+
+        sensor_types_array = ffi.new("unsigned int[]", sensor_types)
+        record_count = self.lib.ipmi_monitoring_sel_by_sensor_type(
+            self.ctx,
+            cffi_encode_string(ffi, self.hostname),
+            self.config._obj,
+            sel_flags,
+            sensor_types_array, len(sensor_types),
+            ffi.NULL, ffi.NULL
+        )
+        return self._read_sel_common(record_count)
+
+    def read_sel_by_date_range(self, date_begin = None, date_end = None, sel_flags = DEFAULT_SEL_FLAGS):
+        """Read System Event Log records.  Only return records in a date range.
+
+        Args:
+            date_begin (str or datetime.date, optional): First date, as
+                MM/DD/YYYY if a string, or None for no lower bound
+            date_end (str or datetime.date, optional): Last date, as
+                MM/DD/YYYY if a string, or None for no upper bound
+            sel_flags (int): SEL flags to use
+
+        Returns:
+            list: IpmiMonitoringSelData records
+        """
+
+        def encode_date(date):
+            if isinstance(date, datetime.date):
+                date = date.strftime('%m/%d/%Y')
+            return cffi_encode_string(ffi, date)
+
+        record_count = self.lib.ipmi_monitoring_sel_by_date_range(
+            self.ctx,
+            cffi_encode_string(ffi, self.hostname),
+            self.config._obj,
+            sel_flags,
+            encode_date(date_begin),
+            encode_date(date_end),
             ffi.NULL, ffi.NULL
         )
-        return self._read_common(sensor_count)
+        return self._read_sel_common(record_count)
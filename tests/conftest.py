@@ -0,0 +1,57 @@
+"""Shared fixtures for the tests.
+
+Most tests only exercise pure Python code.  Tests which need
+libipmimonitoring use the fakelib fixture, which builds and preloads
+the fake library from benchmarks/fakelib, and are skipped if there is
+no C compiler.
+"""
+
+import os
+import sys
+import shutil
+import dataclasses
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from ipmimonitoring import *
+
+@pytest.fixture(scope = 'session')
+def fakelib():
+    """Build and preload the fake libipmimonitoring."""
+
+    if shutil.which('cc') is None:
+        pytest.skip("no C compiler to build the fake libipmimonitoring")
+
+    from _fakelib import load_fakelib
+    load_fakelib()
+
+@pytest.fixture
+def make_record():
+    """Return a function creating IpmiMonitoringSensorData records.
+
+    Fields which are not given get the values of a nominal temperature
+    sensor.
+    """
+
+    def make(**kwargs):
+        fields = dict(
+            record_id = 1,
+            event_reading_type_code = 0x01,
+            sensor_number = 0,
+            sensor_name = 'CPU0_TEMP',
+            sensor_type = IpmiMonitoringSensorType.TEMPERATURE,
+            sensor_state = IpmiMonitoringState.NOMINAL,
+            sensor_reading_type = IpmiMonitoringSensorReadingType.DOUBLE,
+            sensor_reading = 40.0,
+            sensor_units = IpmiMonitoringSensorUnits.CELSIUS,
+            sensor_bitmask_type = IpmiMonitoringSensorBitmaskType.THRESHOLD,
+            sensor_bitmask = 0xc0,
+            sensor_bitmask_strings = ('OK',))
+        fields.update(kwargs)
+        return IpmiMonitoringSensorData(**fields)
+
+    return make
@@ -0,0 +1,60 @@
+from ipmimonitoring import *
+from ipmimonitoring.adaptive import AdaptiveSampler
+
+class FakeContext:
+    hostname = 'bmc1'
+
+    def __init__(self, records):
+        self.records = records
+        self.requests = []
+
+    def read_sensors(self, reading_flags, snapshot = True):
+        self.requests.append(None)
+        return IpmiMonitoringSweep(self.hostname, self.records.values())
+
+    def read_sensors_by_record_id(self, record_ids, reading_flags, snapshot = True):
+        self.requests.append(list(record_ids))
+        return IpmiMonitoringSweep(self.hostname, [ self.records[i] for i in record_ids
+                                                    if i in self.records ])
+
+class FakeClock:
+    now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_string_readings_back_off(make_record):
+    ctx = FakeContext({ 1: make_record(record_id = 1, sensor_reading = 'unknown_type(7)') })
+    clock = FakeClock()
+    sampler = AdaptiveSampler(ctx, min_interval = 5, max_staleness = 300, clock = clock)
+
+    for _ in range(6):
+        sampler.poll()
+        clock.now += 5
+
+    assert sampler._sensors[1].interval > 5
+
+def test_full_sweep_finds_new_sensors_and_drops_missing(make_record):
+    ctx = FakeContext({ i: make_record(record_id = i, sensor_reading = None) for i in (1, 2) })
+    clock = FakeClock()
+    sampler = AdaptiveSampler(ctx, min_interval = 5, max_staleness = 60, clock = clock)
+
+    sampler.poll()
+    assert ctx.requests == [ None ]
+
+    del ctx.records[2]
+    ctx.records[3] = make_record(record_id = 3, sensor_reading = None)
+    clock.now += 5
+    sampler.poll()
+    assert ctx.requests[-1] == [ 1, 2 ]
+    assert set(sampler.latest()) == { 1 }
+
+    for _ in range(5):
+        clock.now += 5
+        sampler.poll()
+    assert all(2 not in request for request in ctx.requests[2:] if request)
+
+    clock.now = 65
+    sampler.poll()
+    assert ctx.requests[-1] is None
+    assert set(sampler.latest()) == { 1, 3 }
@@ -0,0 +1,70 @@
+import gc
+import time
+import asyncio
+
+from ipmimonitoring import *
+from ipmimonitoring.aio import AsyncIpmiMonitoringContext, AsyncLimits, get_default_limits
+
+async def sweep_concurrently():
+    ctxs = [ AsyncIpmiMonitoringContext(hostname = 'bmc1') for _ in range(3) ]
+    sweeps = await asyncio.gather(*(ctx.aread_sweep() for ctx in ctxs))
+    return [ len(sweep) for sweep in sweeps ], get_default_limits()
+
+def test_default_limits_across_event_loops(fakelib):
+    counts1, limits1 = asyncio.run(sweep_concurrently())
+    counts2, limits2 = asyncio.run(sweep_concurrently())
+
+    assert counts1 == counts2
+    assert counts1[0] > 0
+    assert limits1 is not limits2
+
+def test_aread_sel_returns_list(fakelib):
+    async def main():
+        ctx = AsyncIpmiMonitoringContext(hostname = 'bmc1')
+        return await ctx.aread_sel(), await ctx.aread_sel_by_record_id([ 1, 2 ])
+
+    records, by_record_id = asyncio.run(main())
+    assert isinstance(records, list)
+    assert isinstance(by_record_id, list)
+
+def test_busy_context_does_not_hold_total_limit(fakelib):
+    async def main():
+        limits = AsyncLimits(total = 2, per_host = 2)
+        a = AsyncIpmiMonitoringContext(hostname = 'bmc1', limits = limits)
+        b = AsyncIpmiMonitoringContext(hostname = 'bmc2', limits = limits)
+
+        # A call left running on a, and another read waiting for it
+        await a._start(time.sleep, 0.5)
+        waiting = asyncio.ensure_future(a._call(lambda: 'a'))
+        await asyncio.sleep(0.05)
+
+        result = await asyncio.wait_for(b._call(lambda: 'b'), 0.3)
+        return result, await waiting
+
+    assert asyncio.run(main()) == ('b', 'a')
+
+def test_error_after_early_stop_is_retrieved(fakelib):
+    errors = []
+
+    def read_sensors(reading_flags, on_record):
+        on_record('record')
+        time.sleep(0.1)
+        raise IpmiMonitoringConnectionError("timeout")
+
+    async def main():
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: errors.append(context))
+
+        ctx = AsyncIpmiMonitoringContext(hostname = 'bmc1')
+        ctx.ctx.read_sensors = read_sensors
+        agen = ctx.aread_sensors()
+        async for record in agen:
+            break
+        await agen.aclose()
+
+        await ctx.wait_idle()
+        del agen
+        gc.collect()
+        await asyncio.sleep(0)
+
+    asyncio.run(main())
+    assert errors == []
@@ -0,0 +1,105 @@
+import pickle
+
+import pytest
+
+from ipmimonitoring import *
+from ipmimonitoring.breaker import (CircuitBreaker, CircuitBreakers, CircuitState,
+                                    IpmiMonitoringCircuitOpenError)
+
+class FakeClock:
+    now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def fail(error):
+    def read():
+        raise error
+    return read
+
+def test_backoff_doubles_and_probe_closes():
+    clock = FakeClock()
+    breaker = CircuitBreaker('bmc1', base_backoff = 1.0, max_backoff = 10.0, clock = clock)
+
+    with pytest.raises(IpmiMonitoringConnectionError):
+        breaker.call(fail(IpmiMonitoringConnectionError("timeout")))
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.retry_after() == 1.0
+
+    with pytest.raises(IpmiMonitoringCircuitOpenError) as e:
+        breaker.call(lambda: 'sweep')
+    assert isinstance(e.value.cause, IpmiMonitoringConnectionError)
+
+    clock.now = 1.0
+    with pytest.raises(IpmiMonitoringConnectionError):
+        breaker.call(fail(IpmiMonitoringConnectionError("timeout")))
+    assert breaker.retry_after() == 2.0
+
+    clock.now = 3.0
+    assert breaker.call(lambda: 'sweep') == 'sweep'
+    assert breaker.state == CircuitState.CLOSED and breaker.failures == 0
+
+def test_auth_error_opens_for_max_backoff():
+    clock = FakeClock()
+    breaker = CircuitBreaker('bmc1', max_backoff = 300.0, clock = clock)
+
+    with pytest.raises(IpmiMonitoringAuthError):
+        breaker.call(fail(IpmiMonitoringAuthError("bad password")))
+    assert breaker.retry_after() == 300.0
+
+def test_other_errors_do_not_count():
+    breaker = CircuitBreaker('bmc1')
+    with pytest.raises(ValueError):
+        breaker.call(fail(ValueError("bug")))
+    assert breaker.state == CircuitState.CLOSED
+
+def test_failure_threshold():
+    breaker = CircuitBreaker('bmc1', failure_threshold = 3, clock = FakeClock())
+    for _ in range(2):
+        breaker.failure(IpmiMonitoringBusyError("busy"))
+        assert breaker.state == CircuitState.CLOSED
+    breaker.failure(IpmiMonitoringBusyError("busy"))
+    assert breaker.state == CircuitState.OPEN
+
+def test_only_one_probe_at_a_time():
+    clock = FakeClock()
+    breaker = CircuitBreaker('bmc1', clock = clock)
+    breaker.failure(IpmiMonitoringConnectionError("timeout"))
+
+    clock.now = 10.0
+    assert breaker.allow()
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert not breaker.allow()
+
+@pytest.mark.parametrize('error', [ KeyboardInterrupt(), SystemExit(1), ValueError("bug") ])
+def test_probe_ended_by_other_error_stays_half_open(error):
+    clock = FakeClock()
+    breaker = CircuitBreaker('bmc1', failure_threshold = 2, clock = clock)
+    breaker.failure(IpmiMonitoringConnectionError("timeout"))
+    breaker.failure(IpmiMonitoringConnectionError("timeout"))
+    assert breaker.state == CircuitState.OPEN
+
+    clock.now = 10.0
+    with pytest.raises(type(error)):
+        breaker.call(fail(error))
+
+    # The probe is over, the next read is the probe
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    # A timeout of the new probe backs off from where the breaker was
+    breaker.failure(IpmiMonitoringConnectionError("timeout"))
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.failures == 3 and breaker.retry_after() == 2.0
+
+def test_breakers_by_host():
+    breakers = CircuitBreakers(clock = FakeClock())
+    assert breakers.get('bmc1') is breakers.get('bmc1')
+    breakers.get('bmc2').failure(IpmiMonitoringConnectionError("timeout"))
+    assert breakers.open_hosts() == [ 'bmc2' ]
+
+def test_circuit_open_error_pickles():
+    error = IpmiMonitoringCircuitOpenError("open", 5.0, IpmiMonitoringBusyError("busy"))
+    copy = pickle.loads(pickle.dumps(error))
+    assert copy.retry_after == 5.0 and isinstance(copy.cause, IpmiMonitoringBusyError)
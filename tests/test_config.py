@@ -0,0 +1,24 @@
+import pickle
+
+from ipmimonitoring import *
+
+def test_to_dict_round_trip_with_k_g():
+    config = IpmiMonitoringConfig(username = 'admin', password = 'secret',
+                                  k_g = b'\x01\x00key', k_g_len = 5,
+                                  privilege_level = IpmiMonitoringPrivilege.ADMIN)
+    d = config.to_dict()
+    assert d['k_g'] == b'\x01\x00key'
+    assert d['username'] == 'admin'
+
+    copy = IpmiMonitoringConfig(**d)
+    assert copy.to_dict() == d
+    assert copy.fingerprint() == config.fingerprint()
+
+def test_pickle_with_k_g():
+    config = IpmiMonitoringConfig(k_g = b'abc', k_g_len = 3)
+    assert pickle.loads(pickle.dumps(config)).to_dict() == config.to_dict()
+
+def test_without_k_g():
+    d = IpmiMonitoringConfig().to_dict()
+    assert d['k_g'] is None
+    assert IpmiMonitoringConfig(**d).to_dict() == d
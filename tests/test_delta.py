@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+from ipmimonitoring import *
+from ipmimonitoring.delta import Deadband, DeltaFilter
+
+def sweep(*records):
+    return IpmiMonitoringSweep('bmc1', records, 0.0)
+
+def ids(delta_sweep):
+    return [ record.record_id for record in delta_sweep ]
+
+@pytest.mark.parametrize('keyframe_every', [ 0, -1 ])
+def test_invalid_keyframe_every(keyframe_every):
+    with pytest.raises(ValueError):
+        DeltaFilter(keyframe_every = keyframe_every)
+
+def test_keyframes(make_record):
+    delta = DeltaFilter(keyframe_every = 3)
+    results = [ delta.update(sweep(make_record())) for _ in range(7) ]
+
+    assert [ r.keyframe for r in results ] == [ True, False, False, True, False, False, True ]
+    assert [ len(r) for r in results ] == [ 1, 0, 0, 1, 0, 0, 1 ]
+    assert delta.stats.keyframes == 3
+
+def test_only_first_keyframe(make_record):
+    delta = DeltaFilter(keyframe_every = None)
+    results = [ delta.update(sweep(make_record())) for _ in range(100) ]
+    assert sum(r.keyframe for r in results) == 1
+
+def test_deadband_from_last_emitted_reading(make_record):
+    delta = DeltaFilter({ IpmiMonitoringSensorUnits.CELSIUS: Deadband(absolute = 1.0) })
+
+    emitted = [ len(delta.update(sweep(make_record(sensor_reading = v))))
+                for v in (40.0, 40.5, 40.9, 41.1, 41.5) ]
+    assert emitted == [ 1, 0, 0, 1, 0 ]
+
+def test_relative_deadband(make_record):
+    delta = DeltaFilter(default_deadband = Deadband(relative = 0.1))
+
+    emitted = [ len(delta.update(sweep(make_record(sensor_reading = v))))
+                for v in (100.0, 109.0, 111.0) ]
+    assert emitted == [ 1, 0, 1 ]
+
+def test_deadband_applies_to_integer_readings(make_record):
+    delta = DeltaFilter({ IpmiMonitoringSensorUnits.RPM: Deadband(absolute = 1000) })
+
+    def fan(v):
+        return make_record(sensor_reading = v, sensor_units = IpmiMonitoringSensorUnits.RPM,
+                           sensor_reading_type = IpmiMonitoringSensorReadingType.UNSIGNED_INTEGER32)
+
+    emitted = [ len(delta.update(sweep(fan(v)))) for v in (2400, 2900, 3300, 3500) ]
+    assert emitted == [ 1, 0, 0, 1 ]
+
+def test_state_bool_and_string_changes(make_record):
+    delta = DeltaFilter(default_deadband = Deadband(absolute = 100))
+    delta.update(sweep(make_record(sensor_reading = True), make_record(record_id = 2,
+                                                                       sensor_reading = 'unknown_type(9)')))
+
+    assert ids(delta.update(sweep(make_record(sensor_reading = False),
+                                  make_record(record_id = 2, sensor_reading = 'unknown_type(9)')))) == [ 1 ]
+    assert ids(delta.update(sweep(make_record(sensor_reading = False,
+                                              sensor_state = IpmiMonitoringState.WARNING),
+                                  make_record(record_id = 2, sensor_reading = 'unknown_type(9)')))) == [ 1 ]
+
+def test_removed_sensors(make_record):
+    delta = DeltaFilter()
+    delta.update(sweep(make_record(record_id = 1), make_record(record_id = 2)))
+
+    result = delta.update(sweep(make_record(record_id = 1)))
+    assert len(result) == 0
+    assert result.removed == (2,)
+
+    result = delta.update(sweep(make_record(record_id = 1), make_record(record_id = 2)))
+    assert ids(result) == [ 2 ] and result.removed == ()
+
+def test_cli_outputs_removed_sensors(make_record):
+    from ipmimonitoring.__main__ import make_json
+
+    a = json.loads(make_json([ make_record() ], None, removed = (7,)))
+    assert a[0]['sensor_name'] == 'CPU0_TEMP'
+    assert a[1] == { 'record_id': 7, 'removed': True }
+
+def test_cli_keyframe_every_zero_means_first_only():
+    from ipmimonitoring.__main__ import make_delta_filter, parse_deadband
+
+    class Args:
+        deadband = [ parse_deadband('CELSIUS:1'), parse_deadband('CELSIUS:5%'), parse_deadband('2') ]
+        keyframe_every = 0
+
+    delta = make_delta_filter(Args)
+    assert delta.keyframe_every is None
+    assert delta.deadbands[IpmiMonitoringSensorUnits.CELSIUS] == Deadband(absolute = 1.0, relative = 0.05)
+    assert delta.default_deadband == Deadband(absolute = 2.0)
@@ -0,0 +1,64 @@
+import pickle
+
+import pytest
+
+from ipmimonitoring import *
+from ipmimonitoring import fleet
+from ipmimonitoring.fleet import CompactSweep
+
+def test_compact_sweep_round_trip(make_record):
+    records = [
+        make_record(record_id = 1, sensor_reading = 41.5),
+        make_record(record_id = 2, sensor_reading = None),
+        make_record(record_id = 3, sensor_reading = True,
+                    sensor_reading_type = IpmiMonitoringSensorReadingType.UNSIGNED_INTEGER8_BOOL),
+        make_record(record_id = 4, sensor_reading = 2400,
+                    sensor_reading_type = IpmiMonitoringSensorReadingType.UNSIGNED_INTEGER32),
+        make_record(record_id = 5, sensor_reading = 'unknown_type(7)',
+                    sensor_reading_type = IpmiMonitoringSensorReadingType.UNKNOWN),
+    ]
+    compact = CompactSweep.from_sweep(IpmiMonitoringSweep('bmc1', records, 1.0))
+    compact = pickle.loads(pickle.dumps(compact))
+
+    assert compact.records() == records
+    assert [ type(r.sensor_reading) for r in compact.records() ] == [
+        float, type(None), bool, int, str ]
+
+def test_scan_shard_conversion_error_fails_only_that_host(fakelib, monkeypatch):
+    from_sweep = CompactSweep.from_sweep
+
+    def failing(sweep):
+        if sweep.hostname == 'bmc2':
+            raise TypeError("can not convert")
+        return from_sweep(sweep)
+
+    monkeypatch.setattr(CompactSweep, 'from_sweep', staticmethod(failing))
+    monkeypatch.setattr(fleet, '_worker_poller', None)
+
+    results = fleet._scan_shard([ ('bmc1', None), ('bmc2', None), ('bmc3', None) ], 2,
+                                IpmiMonitoringContext.DEFAULT_READING_FLAGS, {})
+    by_host = { result.hostname: result for result in results }
+
+    assert by_host['bmc1'].ok and isinstance(by_host['bmc1'].sweep, CompactSweep)
+    assert by_host['bmc3'].ok
+    assert not by_host['bmc2'].ok
+    assert by_host['bmc2'].sweep is None
+    assert isinstance(by_host['bmc2'].error, TypeError)
+
+def test_worker_poller_replaced_when_threads_change(fakelib):
+    hosts = [ ('bmc1', None) ]
+    flags = IpmiMonitoringContext.DEFAULT_READING_FLAGS
+    try:
+        fleet._scan_shard(hosts, 2, flags, {})
+        old = fleet._worker_poller
+        results = fleet._scan_shard(hosts, 4, flags, {})
+
+        assert fleet._worker_poller is not old
+        assert fleet._worker_poller.concurrency == 4
+        assert old._executor._shutdown
+        assert results[0].ok
+
+    finally:
+        if fleet._worker_poller is not None:
+            fleet._worker_poller.close()
+        fleet._worker_poller = None
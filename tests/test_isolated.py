@@ -0,0 +1,50 @@
+import warnings
+
+import pytest
+
+from ipmimonitoring import fleet
+from ipmimonitoring.fleet import FleetPoller
+from ipmimonitoring.isolated import IsolatedContext, IpmiMonitoringDeadlineError
+
+def test_default_start_method_is_not_fork():
+    ctx = IsolatedContext(hostname = 'bmc1')
+    assert ctx._mp.get_start_method() in ('forkserver', 'spawn')
+
+def test_deadline_kills_hung_read(fakelib):
+    with IsolatedContext(hostname = 'hang1', deadline = 0.5) as ctx:
+        with pytest.raises(IpmiMonitoringDeadlineError):
+            ctx.read_sensors()
+        assert ctx.recycled == 1
+
+        ctx.hostname = 'bmc1'
+        assert len(ctx.read_sensors()) > 0
+
+def test_worker_start_does_not_count_against_deadline(fakelib, monkeypatch):
+    import time
+
+    with IsolatedContext(hostname = 'bmc1', deadline = 2.0) as ctx:
+        start = ctx._start
+
+        def slow_start():
+            start()
+            time.sleep(2.5)
+
+        monkeypatch.setattr(ctx, '_start', slow_start)
+        assert len(ctx.read_sensors()) > 0
+
+def test_fleet_poller_deadline_without_fork_warning(fakelib):
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', DeprecationWarning)
+        with FleetPoller([ ('bmc1', None), ('bmc2', None), ('hang1', None) ],
+                         concurrency = 3, deadline = 1.0) as poller:
+            results = { result.hostname: result for result in poller.sweep() }
+
+    assert results['bmc1'].ok and results['bmc2'].ok
+    assert isinstance(results['hang1'].error, IpmiMonitoringDeadlineError)
+
+def test_fleet_poller_passes_mp_context():
+    import multiprocessing
+
+    mp_context = multiprocessing.get_context('spawn')
+    with FleetPoller([], deadline = 1.0, mp_context = mp_context) as poller:
+        assert poller._get_context()._mp is mp_context
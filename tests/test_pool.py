@@ -0,0 +1,60 @@
+import pytest
+
+from ipmimonitoring import *
+from ipmimonitoring.pool import ContextPool
+
+def test_context_keeps_copy_of_config(fakelib):
+    pool = ContextPool(max_contexts = 4)
+    config = IpmiMonitoringConfig(username = 'alice')
+
+    ctx = pool.acquire('bmc1', config)
+    pool.release(ctx)
+    config.username = 'bob'
+
+    # The idle context still has the config it was created with, so it
+    # is not handed out for the changed config
+    assert ctx.config.to_dict()['username'] == 'alice'
+    other = pool.acquire('bmc1', config)
+    assert other is not ctx
+    assert other.config.to_dict()['username'] == 'bob'
+    pool.release(other)
+
+    assert pool.acquire('bmc1', IpmiMonitoringConfig(username = 'alice')) is ctx
+
+def test_reuses_most_recently_used_context_of_key(fakelib):
+    pool = ContextPool(max_contexts = 4)
+
+    a = pool.acquire('bmc1')
+    b = pool.acquire('bmc1')
+    c = pool.acquire('bmc2')
+    pool.release(a)
+    pool.release(c)
+    pool.release(b)
+
+    assert pool.acquire('bmc1') is b
+    assert pool.acquire('bmc1') is a
+    assert pool.acquire('bmc2') is c
+    assert pool.stats.reused == 3 and pool.stats.created == 3
+
+def test_evicts_least_recently_used_idle_context(fakelib):
+    pool = ContextPool(max_contexts = 2)
+
+    a = pool.acquire('bmc1')
+    b = pool.acquire('bmc2')
+    pool.release(a)
+    pool.release(b)
+
+    pool.acquire('bmc3', timeout = 1)
+    assert pool.stats.evicted == 1
+    assert len(pool) == 2
+    assert pool.acquire('bmc2', timeout = 1) is b
+
+def test_release_of_foreign_context(fakelib):
+    pool = ContextPool()
+    ctx = pool.acquire('bmc1')
+    pool.release(ctx)
+
+    with pytest.raises(ValueError):
+        pool.release(ctx)
+    with pytest.raises(ValueError):
+        pool.release(IpmiMonitoringContext(hostname = 'bmc1'))
@@ -0,0 +1,99 @@
+import os
+import sys
+import time
+import subprocess
+
+import pytest
+
+from ipmimonitoring.schedule import Scheduler, jitter_offset
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+def test_default_clocks():
+    assert Scheduler(1)._clock is time.monotonic
+    assert Scheduler(1, align = True)._clock is time.time
+
+def test_ticks_on_absolute_deadlines():
+    clock = FakeClock(100.0)
+    scheduler = Scheduler(10, clock = clock, sleep = clock.sleep)
+
+    deadlines = []
+    for tick in scheduler.ticks(3):
+        deadlines.append(tick.deadline)
+        clock.now += 3
+    assert deadlines == [ 100.0, 110.0, 120.0 ]
+    assert clock.sleeps == [ 7.0, 7.0 ]
+
+def test_overrun_skips_ticks():
+    clock = FakeClock(0.0)
+    scheduler = Scheduler(10, clock = clock, sleep = clock.sleep)
+
+    scheduler.wait()
+    clock.now = 25.0
+    tick = scheduler.wait()
+    assert tick.index == 3 and tick.skipped == 2
+    assert tick.deadline == 30.0
+    assert scheduler.stats.skipped == 2
+
+def test_aligned_clock_set_back_sleeps_at_most_one_period():
+    clock = FakeClock(1000.0)
+    scheduler = Scheduler(10, align = True, clock = clock, sleep = clock.sleep)
+
+    assert scheduler.wait().deadline == 1000.0
+    clock.now -= 3595
+    tick = scheduler.wait()
+
+    assert clock.sleeps == [ 5.0 ]
+    assert tick.deadline == -2590.0
+
+def test_zero_period_does_not_sleep():
+    clock = FakeClock(5.0)
+    scheduler = Scheduler(0, clock = clock, sleep = clock.sleep)
+
+    ticks = []
+    for tick in scheduler.ticks(3):
+        ticks.append(tick)
+        clock.now += 1
+    assert [ tick.index for tick in ticks ] == [ 0, 1, 2 ]
+    assert [ tick.lag for tick in ticks ] == [ 0.0, 0.0, 0.0 ]
+    assert clock.sleeps == []
+    assert scheduler.stats.ticks == 3 and scheduler.stats.skipped == 0
+
+def test_invalid_periods():
+    with pytest.raises(ValueError):
+        Scheduler(-1)
+    with pytest.raises(ValueError):
+        Scheduler(0, align = True)
+
+def test_jitter_offset_is_deterministic():
+    assert jitter_offset('bmc1', 10) == jitter_offset('bmc1', 10)
+    assert 0 <= jitter_offset('bmc1', 10) < 10
+    assert jitter_offset('bmc1', 0) == 0.0
+
+@pytest.mark.parametrize('args, message', [
+    ([ '--align' ], 'follow'),
+    ([ '--follow', '0', '--align' ], 'period'),
+    ([ '--follow', '-1' ], 'negative'),
+    ([ '--changes-only' ], 'follow'),
+    ([ '--follow', '--deadband', '1' ], 'changes-only'),
+    ([ '--follow', '--keyframe-every', '5' ], 'changes-only'),
+    ([ '--follow', '--changes-only', '--keyframe-every', '-1' ], 'negative'),
+])
+def test_main_rejects_arguments(args, message):
+    result = subprocess.run([ sys.executable, '-m', 'ipmimonitoring', *args ],
+                            capture_output = True, text = True,
+                            env = dict(os.environ, PYTHONPATH = SRC))
+    assert result.returncode != 0
+    assert message in result.stderr
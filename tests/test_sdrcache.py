@@ -0,0 +1,54 @@
+import os
+import socket
+
+import pytest
+
+from ipmimonitoring import *
+from ipmimonitoring.sdrcache import (SdrCache, IpmiMonitoringSdrCacheError, sdr_cache_path,
+                                     _decode_id_string, DEFAULT_SDR_CACHE_DIRECTORY)
+
+def test_sdr_cache_path():
+    local = socket.gethostname().split('.')[0] or 'localhost'
+
+    assert sdr_cache_path('bmc1') == os.path.join(DEFAULT_SDR_CACHE_DIRECTORY,
+                                                  f'sdr-cache-{local}.bmc1')
+    assert sdr_cache_path(None, '/tmp/sdr', '%H-100%%') == '/tmp/sdr/localhost-100%'
+    assert sdr_cache_path('bmc1', '/tmp/sdr', 'x%Qy') == '/tmp/sdr/x%Qy'
+
+def test_decode_id_string():
+    assert _decode_id_string(0xc0 | 5, b'FAN1\0junk') == 'FAN1'
+    assert _decode_id_string(0x40 | 2, bytes([ 0x12, 0x3b ])) == '123-'
+    # "AB" in 6-bit packed ASCII, A = 0x21 and B = 0x22
+    bits = 0x21 | (0x22 << 6)
+    assert _decode_id_string(0x80 | 3, bits.to_bytes(3, 'little')) == 'AB'
+
+@pytest.mark.parametrize('data, message', [
+    (b'', 'too short'),
+    (b'\0' * 21, 'not an SDR cache file'),
+    (b'\x7a\xb8\x2e\x90\x12\0\0\0\x51\x02\0\0\0\0\0\0\0\0\0\0\0', 'truncated'),
+])
+def test_bad_files(tmp_path, data, message):
+    path = tmp_path / 'sdr'
+    path.write_bytes(data)
+
+    with pytest.raises(IpmiMonitoringSdrCacheError, match = message):
+        SdrCache.open(str(path))
+
+def test_matches_library_records(fakelib, tmp_path):
+    ctx = IpmiMonitoringContext(hostname = 'bmc1', sdr_cache_directory = str(tmp_path))
+    sweep = ctx.read_sensors(snapshot = True)
+
+    with SdrCache.open_host('bmc1', str(tmp_path)) as cache:
+        assert len(cache) == len(sweep)
+        assert sorted(cache.record_ids()) == sorted(r.record_id for r in sweep)
+
+        for record in sweep:
+            sensor = cache[record.record_id]
+            assert sensor.sensor_name == record.sensor_name
+            assert sensor.sensor_number == record.sensor_number
+            assert sensor.event_reading_type_code == record.event_reading_type_code
+            assert cache.by_name(record.sensor_name) == [ sensor ]
+
+        assert cache.get(0xfffe) is None
+        with pytest.raises(KeyError):
+            cache[0xfffe]
@@ -0,0 +1,87 @@
+import re
+import dataclasses
+
+import pytest
+
+from ipmimonitoring import *
+from ipmimonitoring.selector import SensorSelector
+
+def test_glob_and_regex_match_whole_name():
+    selector = SensorSelector([ 'CPU*_TEMP', re.compile(r'FAN\d+') ])
+
+    assert selector.match('CPU0_TEMP')
+    assert selector.match('FAN12')
+    assert not selector.match('CPU0_TEMP2')
+    assert not selector.match('XFAN1')
+    assert selector.select([ (1, 'CPU0_TEMP'), (2, 'P_0V'), (3, 'FAN0') ]) == [ 1, 3 ]
+
+def test_selectors_compare_by_pattern():
+    assert SensorSelector('CPU*') == SensorSelector([ 'CPU*' ])
+    assert hash(SensorSelector('CPU*')) == hash(SensorSelector([ 'CPU*' ]))
+    assert SensorSelector('CPU*') != SensorSelector('FAN*')
+
+def names(records):
+    return [ record.sensor_name for record in records ]
+
+def test_read_by_name_is_stable(fakelib):
+    ctx = IpmiMonitoringContext(hostname = 'bmc1')
+
+    first = ctx.read_sensors(names = 'CPU1*_TEMP', snapshot = True)
+    second = ctx.read_sensors(names = 'CPU1*_TEMP', snapshot = True)
+    assert names(first) == names(second)
+    assert names(first) and all(re.fullmatch(r'CPU1\d*_TEMP', n) for n in names(first))
+
+    assert names(ctx.read_sensors(names = 'CPU1*_TEMP')) == names(first)
+
+    got = []
+    count = ctx.read_sensors(names = 'CPU1*_TEMP', on_record = got.append)
+    assert count == len(got)
+    assert names(got) == names(first)
+
+def test_read_by_name_filters_shared_record_ids(fakelib, monkeypatch):
+    ctx = IpmiMonitoringContext(hostname = 'bmc1')
+    ctx.read_sensors(names = 'CPU0_TEMP', snapshot = True)
+
+    read_by_record_id = ctx.read_sensors_by_record_id
+
+    def shared(record_ids, reading_flags, on_record = None, snapshot = False):
+        # Add a sensor which shares the record ID but has another name
+        sweep = read_by_record_id(record_ids, reading_flags, snapshot = True)
+        records = list(sweep) + [ dataclasses.replace(sweep[0], sensor_name = 'CPU0_Status') ]
+        if on_record is not None:
+            for record in records:
+                on_record(record)
+            return len(records)
+        if snapshot:
+            return IpmiMonitoringSweep(sweep.hostname, records, sweep.timestamp)
+        return iter(records)
+
+    monkeypatch.setattr(ctx, 'read_sensors_by_record_id', shared)
+
+    assert names(ctx.read_sensors(names = 'CPU0_TEMP', snapshot = True)) == [ 'CPU0_TEMP' ]
+    assert names(ctx.read_sensors(names = 'CPU0_TEMP')) == [ 'CPU0_TEMP' ]
+
+    got = []
+    assert ctx.read_sensors(names = 'CPU0_TEMP', on_record = got.append) == 1
+    assert names(got) == [ 'CPU0_TEMP' ]
+
+def test_selection_without_sdr_cache_file_expires(fakelib, monkeypatch):
+    from ipmimonitoring import wrapper
+
+    monkeypatch.setattr(wrapper, '_UNSTAMPED_SELECTION_READS', 2)
+    ctx = IpmiMonitoringContext(hostname = 'bmc1')
+    monkeypatch.setattr(ctx, '_sdr_cache_stamp', lambda: None)
+
+    full_sweeps = []
+    read_sensors = ctx.read_sensors
+
+    def counting(reading_flags = IpmiMonitoringContext.DEFAULT_READING_FLAGS, names = None, **kwargs):
+        if names is None:
+            full_sweeps.append(reading_flags)
+        return read_sensors(reading_flags, names = names, **kwargs)
+
+    monkeypatch.setattr(ctx, 'read_sensors', counting)
+
+    for _ in range(7):
+        assert names(ctx.read_sensors(names = 'CPU0_TEMP', snapshot = True)) == [ 'CPU0_TEMP' ]
+    assert len(full_sweeps) == 3
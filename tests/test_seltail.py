@@ -0,0 +1,50 @@
+import json
+import threading
+
+from ipmimonitoring.seltail import SelTail
+
+class FakeContext:
+    def __init__(self, hostname):
+        self.hostname = hostname
+
+def test_shared_state_file_concurrent_saves(tmp_path):
+    path = str(tmp_path / 'sel.state')
+    tails = [ SelTail(FakeContext(f'bmc{i}'), path) for i in range(8) ]
+    errors = []
+
+    def run(tail, i):
+        try:
+            for n in range(50):
+                tail._state = { 'record_id': n, 'timestamp': i }
+                tail._save_state()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [ threading.Thread(target = run, args = (tail, i)) for i, tail in enumerate(tails) ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    with open(path) as f:
+        states = json.load(f)
+    assert states == { f'bmc{i}': { 'record_id': 49, 'timestamp': i } for i in range(8) }
+    assert sorted(p.name for p in tmp_path.iterdir()) == [ 'sel.state', 'sel.state.lock' ]
+
+def test_corrupt_state_file_is_treated_as_missing(tmp_path):
+    path = tmp_path / 'sel.state'
+    path.write_text('{"bmc1": {"record_id": 3, "tim')
+
+    tail = SelTail(FakeContext('bmc1'), str(path))
+    assert tail.high_water is None
+
+    tail._state = { 'record_id': 7, 'timestamp': 100 }
+    tail._save_state()
+    assert SelTail(FakeContext('bmc1'), str(path)).high_water == (7, 100)
+
+def test_state_file_which_is_not_an_object(tmp_path):
+    path = tmp_path / 'sel.state'
+    path.write_text('[1, 2, 3]')
+
+    assert SelTail(FakeContext('bmc1'), str(path)).high_water is None
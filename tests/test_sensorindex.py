@@ -0,0 +1,79 @@
+import os
+
+import pytest
+
+from ipmimonitoring import *
+from ipmimonitoring.sensorindex import SensorMetadataIndex
+
+FLAGS = IpmiMonitoringContext.DEFAULT_READING_FLAGS
+
+# Metadata of record 1, the CPU0_TEMP sensor, from an older SDR where
+# it had another name, and where it was also a boolean sensor
+RENAMED = { 1: (0x01, 0, 'OLD_NAME', 0x01, 0x02, 0x01, 0x00) }
+RETYPED = { 1: (0x6f, 0, 'OLD_NAME', 0x07, 0x00, 0x00, 0x0e) }
+
+class SdrChangingLib:
+    """Library whose readings calls rewrite the SDR cache file first,
+    as the real library does when it finds that the SDR has changed."""
+
+    def __init__(self, lib, path):
+        self._lib = lib
+        self._path = path
+
+    def __getattr__(self, name):
+        return getattr(self._lib, name)
+
+    def ipmi_monitoring_sensor_readings_by_record_id(self, *args):
+        st = os.stat(self._path)
+        os.utime(self._path, ns = (st.st_atime_ns, st.st_mtime_ns + 10**9))
+        return self._lib.ipmi_monitoring_sensor_readings_by_record_id(*args)
+
+def make_context(tmp_path, stale):
+    index = SensorMetadataIndex(sdr_cache_directory = str(tmp_path), persist = False)
+    ctx = IpmiMonitoringContext(hostname = 'bmc1', sdr_cache_directory = str(tmp_path),
+                                metadata_index = index)
+
+    # Create the SDR cache file, then plant stale metadata for it
+    ctx.read_sensors(snapshot = True)
+    index.clear()
+    index.update('bmc1', FLAGS, stale)
+    assert index.lookup('bmc1', FLAGS)[1].sensor_name == 'OLD_NAME'
+    return ctx, index
+
+def check(record):
+    assert record.record_id == 1
+    assert record.sensor_name == 'CPU0_TEMP'
+    assert record.sensor_reading_type == IpmiMonitoringSensorReadingType.DOUBLE
+    assert isinstance(record.sensor_reading, float)
+
+@pytest.mark.parametrize('mode', [ 'snapshot', 'lazy', 'callback' ])
+def test_sdr_change_during_read_drops_metadata(fakelib, tmp_path, mode):
+    ctx, index = make_context(tmp_path, RENAMED)
+    path = index._sdr_cache_path('bmc1')
+    ctx.lib = SdrChangingLib(ctx.lib, path)
+
+    if mode == 'snapshot':
+        records = list(ctx.read_sensors(snapshot = True))
+    elif mode == 'lazy':
+        records = list(ctx.read_sensors())
+    else:
+        records = []
+        ctx.read_sensors(on_record = records.append)
+
+    check(records[0])
+
+    # The index has learnt the sensors again for the new SDR cache file
+    assert index.lookup('bmc1', FLAGS)[1].sensor_name == 'CPU0_TEMP'
+
+@pytest.mark.parametrize('mode', [ 'snapshot', 'callback' ])
+def test_changed_reading_type_reads_sensor_in_full(fakelib, tmp_path, mode):
+    ctx, index = make_context(tmp_path, RETYPED)
+
+    if mode == 'snapshot':
+        records = list(ctx.read_sensors(snapshot = True))
+    else:
+        records = []
+        ctx.read_sensors(on_record = records.append)
+
+    check(records[0])
+    assert index.lookup('bmc1', FLAGS)[1].sensor_name == 'CPU0_TEMP'
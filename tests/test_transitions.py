@@ -0,0 +1,82 @@
+import pytest
+
+from ipmimonitoring import *
+from ipmimonitoring.transitions import TransitionDetector
+
+NOMINAL = IpmiMonitoringState.NOMINAL
+WARNING = IpmiMonitoringState.WARNING
+
+def run(detector, make_record, sequence, record_id = 1):
+    events = []
+    for t, (state, reading) in enumerate(sequence):
+        sweep = IpmiMonitoringSweep('bmc1', [ make_record(record_id = record_id, sensor_state = state,
+                                                          sensor_reading = reading) ], float(t))
+        events.extend((t, event) for event in detector.update(sweep))
+    return events
+
+@pytest.mark.parametrize('confirm, window', [ (0, 1), (2, 1), (1, 17) ])
+def test_invalid_window(confirm, window):
+    with pytest.raises(ValueError):
+        TransitionDetector(confirm = confirm, window = window)
+
+def test_first_sweep_sets_state_without_event(make_record):
+    detector = TransitionDetector()
+    assert run(detector, make_record, [ (WARNING, 80.0) ]) == []
+    assert detector.state('bmc1', 1) == WARNING
+    assert detector.state('bmc1', 2) is None
+    assert detector.state('bmc2', 1) is None
+
+def test_single_sweep_flaps_are_debounced(make_record):
+    detector = TransitionDetector(confirm = 2, window = 3)
+    sequence = [ (NOMINAL, 40.0), (WARNING, 80.0), (NOMINAL, 40.0), (NOMINAL, 40.0),
+                 (WARNING, 80.0), (NOMINAL, 40.0) ]
+    assert run(detector, make_record, sequence) == []
+    assert detector.stats.changes == 2
+
+def test_n_of_m_confirmation_and_event_fields(make_record):
+    detector = TransitionDetector(confirm = 2, window = 3)
+    sequence = [ (NOMINAL, 70.0), (WARNING, 76.0), (NOMINAL, 74.0), (WARNING, 77.0) ]
+    (t, event), = run(detector, make_record, sequence)
+
+    assert t == 3
+    assert event.hostname == 'bmc1' and event.record_id == 1
+    assert event.sensor_name == 'CPU0_TEMP'
+    assert event.old_state == NOMINAL and event.new_state == WARNING
+    assert event.reading == 77.0
+    assert event.since == 0.0 and event.timestamp == 3.0 and event.duration == 3.0
+
+def test_hysteresis_holds_recovery(make_record):
+    detector = TransitionDetector(confirm = 2, window = 3,
+                                  hysteresis = { IpmiMonitoringSensorUnits.CELSIUS: 2.0 })
+    sequence = [ (NOMINAL, 70.0), (NOMINAL, 74.0), (WARNING, 76.0), (NOMINAL, 74.5),
+                 (WARNING, 76.0), (WARNING, 77.0), (NOMINAL, 74.9), (NOMINAL, 74.5),
+                 (NOMINAL, 73.5) ]
+    events = run(detector, make_record, sequence)
+
+    assert [ (t, e.new_state) for t, e in events ] == [ (4, WARNING), (8, NOMINAL) ]
+    assert detector.stats.held == 1
+
+def test_per_sensor_hysteresis(make_record):
+    detector = TransitionDetector(hysteresis = { IpmiMonitoringSensorUnits.CELSIUS: 100.0 })
+    detector.set_hysteresis('bmc1', 1, 0.5)
+    sequence = [ (NOMINAL, 74.0), (WARNING, 76.0), (NOMINAL, 75.0) ]
+    assert [ t for t, e in run(detector, make_record, sequence) ] == [ 1, 2 ]
+
+def test_non_numeric_readings(make_record):
+    detector = TransitionDetector(default_hysteresis = 1.0)
+    sequence = [ (NOMINAL, 'unknown_type(9)'), (WARNING, 'unknown_type(9)'),
+                 (NOMINAL, None), (WARNING, True), (NOMINAL, False) ]
+    events = run(detector, make_record, sequence)
+    assert [ t for t, e in events ] == [ 1, 2, 3, 4 ]
+    assert events[0][1].reading == 'unknown_type(9)'
+
+def test_sparse_record_ids_and_hosts(make_record):
+    detector = TransitionDetector()
+    for hostname in ('bmc1', 'bmc2'):
+        sweep = IpmiMonitoringSweep(hostname, [ make_record(record_id = r) for r in (5, 0xfffe, 1) ], 0.0)
+        detector.update(sweep)
+
+    assert len(detector) == 6
+    assert detector.state('bmc2', 0xfffe) == NOMINAL
+    assert detector.state('bmc2', 2) is None
+    assert detector.state('bmc2', 0xffff) is None
@@ -0,0 +1,45 @@
+from ipmimonitoring import *
+from ipmimonitoring.wrapper import ffi
+
+def test_sensor_name_reused_without_copy(fakelib, monkeypatch):
+    ctx = IpmiMonitoringContext(hostname = 'bmc1')
+
+    first = ctx._decode_sensor_name(1, ffi.new("char[]", b"CPU0_TEMP"))
+    assert first == 'CPU0_TEMP'
+
+    # Same name at another address
+    name_ptr = ffi.new("char[]", b"CPU0_TEMP")
+    assert ctx._decode_sensor_name(1, name_ptr) is first
+
+    copies = []
+    string = ffi.string
+    monkeypatch.setattr(ffi, 'string', lambda *args: copies.append(args) or string(*args))
+    for _ in range(10):
+        assert ctx._decode_sensor_name(1, name_ptr) is first
+    assert copies == []
+
+def test_changed_sensor_name_is_decoded(fakelib):
+    ctx = IpmiMonitoringContext(hostname = 'bmc1')
+
+    assert ctx._decode_sensor_name(1, ffi.new("char[]", b"CPU0_TEMP")) == 'CPU0_TEMP'
+    assert ctx._decode_sensor_name(1, ffi.new("char[]", b"CPU0_TEMP2")) == 'CPU0_TEMP2'
+    assert ctx._decode_sensor_name(1, ffi.new("char[]", b"CPU0")) == 'CPU0'
+    assert ctx._decode_sensor_name(2, ffi.new("char[]", b"CPU0")) == 'CPU0'
+
+def test_snapshot_matches_lazy_read(fakelib, tmp_path):
+    from ipmimonitoring.sensorindex import SensorMetadataIndex
+
+    def make():
+        index = SensorMetadataIndex(sdr_cache_directory = str(tmp_path), persist = False)
+        return IpmiMonitoringContext(hostname = 'bmc1', sdr_cache_directory = str(tmp_path),
+                                     metadata_index = index)
+
+    a = make()
+    b = make()
+
+    # The second sweeps use the metadata learnt from the first
+    for _ in range(3):
+        snapshot = a.read_sensors(snapshot = True)
+        lazy = list(b.read_sensors())
+        assert len(snapshot) > 0
+        assert list(snapshot) == lazy